@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.database import Base
 from app.core.config import settings
+from app.core.partitions import is_partition_table
 from app.models import *  # 导入所有模型
 
 # this is the Alembic Config object, which provides
@@ -34,6 +35,17 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(obj, name, type_, reflected, compare_to):
+    """自动生成时跳过限定了其他数据库方言的对象（如仅PostgreSQL使用的pg_trgm索引）与健康记录的月份分区"""
+    if type_ == "table" and reflected and is_partition_table(name):
+        return False
+    ddl_if = getattr(obj, "_ddl_if", None)
+    if ddl_if is not None and ddl_if.dialect:
+        dialects = (ddl_if.dialect,) if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+        return context.get_context().dialect.name in dialects
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -52,6 +64,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -73,7 +86,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,194 @@
+"""初始表结构
+
+Revision ID: 20261017_0900
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_0900'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('patients',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.String(length=20), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('gender', sa.Enum('MALE', 'FEMALE', 'OTHER', name='gender'), nullable=False),
+    sa.Column('birth_date', sa.Date(), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('email', sa.String(length=100), nullable=True),
+    sa.Column('id_card', sa.String(length=18), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('emergency_contact', sa.String(length=100), nullable=True),
+    sa.Column('emergency_phone', sa.String(length=20), nullable=True),
+    sa.Column('height', sa.Float(), nullable=True),
+    sa.Column('weight', sa.Float(), nullable=True),
+    sa.Column('blood_type', sa.String(length=10), nullable=True),
+    sa.Column('allergies', sa.Text(), nullable=True),
+    sa.Column('medical_history', sa.Text(), nullable=True),
+    sa.Column('current_medications', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id_card')
+    )
+    op.create_index(op.f('ix_patients_id'), 'patients', ['id'], unique=False)
+    op.create_index(op.f('ix_patients_patient_id'), 'patients', ['patient_id'], unique=True)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=50), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=False),
+    sa.Column('full_name', sa.String(length=100), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('role', sa.Enum('ADMIN', 'DOCTOR', 'NURSE', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('specialty', sa.String(length=100), nullable=True),
+    sa.Column('license_number', sa.String(length=50), nullable=True),
+    sa.Column('department', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_username'), 'users', ['username'], unique=True)
+    op.create_table('health_plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('plan_type', sa.Enum('DIET', 'EXERCISE', 'MEDICATION', 'LIFESTYLE', 'REHABILITATION', name='plantype'), nullable=False),
+    sa.Column('status', sa.Enum('DRAFT', 'ACTIVE', 'PAUSED', 'COMPLETED', 'CANCELLED', name='planstatus'), nullable=False),
+    sa.Column('objectives', sa.Text(), nullable=True),
+    sa.Column('instructions', sa.Text(), nullable=False),
+    sa.Column('duration_days', sa.Integer(), nullable=True),
+    sa.Column('frequency', sa.String(length=100), nullable=True),
+    sa.Column('target_conditions', sa.Text(), nullable=True),
+    sa.Column('contraindications', sa.Text(), nullable=True),
+    sa.Column('age_range_min', sa.Integer(), nullable=True),
+    sa.Column('age_range_max', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('is_template', sa.Boolean(), nullable=True),
+    sa.Column('is_public', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_health_plans_id'), 'health_plans', ['id'], unique=False)
+    op.create_table('patient_health_plans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('health_plan_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_by', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('ASSIGNED', 'IN_PROGRESS', 'COMPLETED', 'PAUSED', 'CANCELLED', name='assignmentstatus'), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('actual_end_date', sa.Date(), nullable=True),
+    sa.Column('custom_instructions', sa.Text(), nullable=True),
+    sa.Column('custom_objectives', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('completion_percentage', sa.Integer(), nullable=True),
+    sa.Column('last_check_date', sa.Date(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['health_plan_id'], ['health_plans.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_patient_health_plans_id'), 'patient_health_plans', ['id'], unique=False)
+    op.create_table('appointments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('patient_health_plan_id', sa.Integer(), nullable=True),
+    sa.Column('appointment_type', sa.Enum('CONSULTATION', 'FOLLOW_UP', 'EXAMINATION', 'TREATMENT', 'EMERGENCY', name='appointmenttype'), nullable=False),
+    sa.Column('status', sa.Enum('SCHEDULED', 'CONFIRMED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', 'NO_SHOW', name='appointmentstatus'), nullable=False),
+    sa.Column('scheduled_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('scheduled_end', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('actual_start', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('actual_end', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('reason', sa.Text(), nullable=True),
+    sa.Column('chief_complaint', sa.Text(), nullable=True),
+    sa.Column('location', sa.String(length=100), nullable=True),
+    sa.Column('room_number', sa.String(length=20), nullable=True),
+    sa.Column('estimated_cost', sa.String(length=50), nullable=True),
+    sa.Column('actual_cost', sa.String(length=50), nullable=True),
+    sa.Column('reminder_sent', sa.Boolean(), nullable=True),
+    sa.Column('reminder_time', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('doctor_notes', sa.Text(), nullable=True),
+    sa.Column('patient_notes', sa.Text(), nullable=True),
+    sa.Column('cancellation_reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['patient_health_plan_id'], ['patient_health_plans.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_appointments_id'), 'appointments', ['id'], unique=False)
+    op.create_table('health_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_by', sa.Integer(), nullable=False),
+    sa.Column('patient_health_plan_id', sa.Integer(), nullable=True),
+    sa.Column('record_type', sa.Enum('VITAL_SIGNS', 'LAB_RESULT', 'EXAMINATION', 'MEDICATION', 'SYMPTOM', 'PROGRESS', name='recordtype'), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('systolic_pressure', sa.Float(), nullable=True),
+    sa.Column('diastolic_pressure', sa.Float(), nullable=True),
+    sa.Column('heart_rate', sa.Float(), nullable=True),
+    sa.Column('temperature', sa.Float(), nullable=True),
+    sa.Column('respiratory_rate', sa.Float(), nullable=True),
+    sa.Column('blood_glucose', sa.Float(), nullable=True),
+    sa.Column('weight', sa.Float(), nullable=True),
+    sa.Column('height', sa.Float(), nullable=True),
+    sa.Column('test_name', sa.String(length=100), nullable=True),
+    sa.Column('test_value', sa.String(length=100), nullable=True),
+    sa.Column('test_unit', sa.String(length=20), nullable=True),
+    sa.Column('reference_range', sa.String(length=100), nullable=True),
+    sa.Column('severity_level', sa.Integer(), nullable=True),
+    sa.Column('medication_name', sa.String(length=100), nullable=True),
+    sa.Column('dosage', sa.String(length=50), nullable=True),
+    sa.Column('frequency', sa.String(length=50), nullable=True),
+    sa.Column('record_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('event_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['patient_health_plan_id'], ['patient_health_plans.id'], ),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ),
+    sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_health_records_id'), 'health_records', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_health_records_id'), table_name='health_records')
+    op.drop_table('health_records')
+    op.drop_index(op.f('ix_appointments_id'), table_name='appointments')
+    op.drop_table('appointments')
+    op.drop_index(op.f('ix_patient_health_plans_id'), table_name='patient_health_plans')
+    op.drop_table('patient_health_plans')
+    op.drop_index(op.f('ix_health_plans_id'), table_name='health_plans')
+    op.drop_table('health_plans')
+    op.drop_index(op.f('ix_users_username'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_patients_patient_id'), table_name='patients')
+    op.drop_index(op.f('ix_patients_id'), table_name='patients')
+    op.drop_table('patients')
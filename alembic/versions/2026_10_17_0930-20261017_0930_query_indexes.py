@@ -0,0 +1,55 @@
+"""按实际查询条件添加复合索引与部分索引
+
+Revision ID: 20261017_0930
+Revises: 20261017_0900
+Create Date: 2026-10-17 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_0930'
+down_revision = '20261017_0900'
+branch_labels = None
+depends_on = None
+
+
+# 部分索引条件，须与查询中的条件写法一致（Enum列存储的是成员名称）
+PATIENT_ACTIVE = sa.column('is_active').is_(True)
+ASSIGNMENT_ACTIVE = sa.text("status IN ('ASSIGNED', 'IN_PROGRESS')")
+
+INDEXES = [
+    # (索引名, 表名, 列, 部分索引条件)
+    ('ix_patients_active_created_at', 'patients', ['created_at', 'id'], PATIENT_ACTIVE),
+    ('ix_health_plans_template_public_type', 'health_plans', ['is_template', 'is_public', 'plan_type'], None),
+    ('ix_health_plans_public_type', 'health_plans', ['is_public', 'plan_type'], None),
+    ('ix_health_plans_created_by', 'health_plans', ['created_by'], None),
+    ('ix_patient_health_plans_patient_status', 'patient_health_plans', ['patient_id', 'status'], None),
+    ('ix_patient_health_plans_plan_status', 'patient_health_plans', ['health_plan_id', 'status'], None),
+    ('ix_patient_health_plans_assigned_by', 'patient_health_plans', ['assigned_by'], None),
+    ('ix_patient_health_plans_active', 'patient_health_plans', ['patient_id', 'health_plan_id'], ASSIGNMENT_ACTIVE),
+    ('ix_health_records_patient_record_date', 'health_records', ['patient_id', 'record_date'], None),
+    ('ix_health_records_recorded_by', 'health_records', ['recorded_by'], None),
+    ('ix_health_records_patient_health_plan_id', 'health_records', ['patient_health_plan_id'], None),
+    ('ix_appointments_patient_scheduled_start', 'appointments', ['patient_id', 'scheduled_start'], None),
+    ('ix_appointments_doctor_scheduled_start', 'appointments', ['doctor_id', 'scheduled_start'], None),
+    ('ix_appointments_patient_health_plan_id', 'appointments', ['patient_health_plan_id'], None),
+]
+
+
+def upgrade() -> None:
+    # PostgreSQL上并发建索引，避免对已有数据的表加写锁（CONCURRENTLY不能在事务中执行）
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_where=where, sqlite_where=where, postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
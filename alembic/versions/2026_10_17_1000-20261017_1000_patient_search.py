@@ -0,0 +1,118 @@
+"""患者搜索索引：手机号索引、pg_trgm索引与患者编号前缀索引（PostgreSQL）、n-gram倒排表
+
+PostgreSQL的倒排表只包含汉字的单字与双字gram（1~2个字的输入pg_trgm无法使用索引）。
+
+Revision ID: 20261017_1000
+Revises: 20261017_0930
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1000'
+down_revision = '20261017_0930'
+branch_labels = None
+depends_on = None
+
+
+TRGM_COLUMNS = ('name', 'patient_id', 'phone', 'id_card')
+GRAM_SIZE = 3
+BACKFILL_BATCH_SIZE = 1000
+
+# 迁移时的表结构快照：回填不依赖应用模型，模型后续变化不影响本迁移
+patients_table = sa.table('patients', sa.column('id', sa.Integer),
+                          *(sa.column(column, sa.String) for column in TRGM_COLUMNS))
+grams_table = sa.table('patient_search_grams', sa.column('gram', sa.String), sa.column('patient_id', sa.Integer))
+
+
+def _is_cjk(char):
+    return '\u4e00' <= char <= '\u9fff' or '\u3400' <= char <= '\u4dbf'
+
+
+def _text_grams(text, short_only):
+    """与本迁移创建时 app.utils.patient_search.text_grams 的规则一致"""
+    text = text.lower()
+    grams = set()
+    for index, char in enumerate(text):
+        if _is_cjk(char):
+            grams.add(char)
+            grams.add(text[index:index + 2])
+        if short_only:
+            continue
+        gram = text[index:index + GRAM_SIZE]
+        if len(gram) < GRAM_SIZE:
+            continue
+        if gram.isdigit():
+            gram = text[index:index + GRAM_SIZE + 1]
+            if len(gram) <= GRAM_SIZE:
+                continue
+        grams.add(gram)
+    return grams
+
+
+def _backfill_grams(bind, short_only=False):
+    """为已有患者回填gram索引，按主键分批读取"""
+    last_id = 0
+    while True:
+        patients = bind.execute(
+            sa.select(patients_table).where(patients_table.c.id > last_id)
+            .order_by(patients_table.c.id).limit(BACKFILL_BATCH_SIZE)
+        ).fetchall()
+        if not patients:
+            return
+        rows = []
+        for patient in patients:
+            grams = set()
+            for value in patient[1:]:
+                if value:
+                    grams |= _text_grams(value, short_only)
+            rows.extend({'gram': gram, 'patient_id': patient[0]} for gram in grams)
+        if rows:
+            op.bulk_insert(grams_table, rows)
+        last_id = patients[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table('patient_search_grams',
+    sa.Column('gram', sa.String(length=16), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('gram', 'patient_id'),
+    sqlite_with_rowid=False
+    )
+    op.create_index('ix_patient_search_grams_patient_id', 'patient_search_grams', ['patient_id'])
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        with op.get_context().autocommit_block():
+            op.create_index('ix_patients_phone', 'patients', ['phone'], postgresql_concurrently=True)
+            op.create_index(
+                'ix_patients_patient_id_pattern', 'patients', ['patient_id'],
+                postgresql_ops={'patient_id': 'varchar_pattern_ops'}, postgresql_concurrently=True,
+            )
+            for column in TRGM_COLUMNS:
+                op.create_index(
+                    f'ix_patients_{column}_trgm', 'patients', [column],
+                    postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                )
+    else:
+        op.create_index('ix_patients_phone', 'patients', ['phone'])
+    _backfill_grams(bind, short_only=bind.dialect.name == 'postgresql')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for column in reversed(TRGM_COLUMNS):
+                op.drop_index(f'ix_patients_{column}_trgm', table_name='patients', postgresql_concurrently=True)
+            op.drop_index('ix_patients_patient_id_pattern', table_name='patients', postgresql_concurrently=True)
+            op.drop_index('ix_patients_phone', table_name='patients', postgresql_concurrently=True)
+    else:
+        op.drop_index('ix_patients_phone', table_name='patients')
+    op.drop_index('ix_patient_search_grams_patient_id', table_name='patient_search_grams')
+    op.drop_table('patient_search_grams')
@@ -0,0 +1,51 @@
+"""患者姓名拼音：全拼/首字母列与姓名自动补全前缀索引
+
+已有患者的拼音由 scripts/backfill_pinyin.py 回填（可在线分批执行）。
+
+Revision ID: 20261017_1030
+Revises: 20261017_1000
+Create Date: 2026-10-17 10:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1030'
+down_revision = '20261017_1000'
+branch_labels = None
+depends_on = None
+
+
+PREFIX_COLUMNS = ('name', 'name_pinyin', 'name_initials')
+PATIENT_ACTIVE = sa.column('is_active').is_(True)
+
+
+def upgrade() -> None:
+    op.add_column('patients', sa.Column('name_pinyin', sa.String(length=300), nullable=True))
+    op.add_column('patients', sa.Column('name_initials', sa.String(length=50), nullable=True))
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for column in PREFIX_COLUMNS:
+                op.create_index(
+                    f'ix_patients_active_{column}', 'patients', [column],
+                    postgresql_where=PATIENT_ACTIVE, postgresql_ops={column: 'varchar_pattern_ops'},
+                    postgresql_concurrently=True,
+                )
+    else:
+        for column in PREFIX_COLUMNS:
+            op.create_index(f'ix_patients_active_{column}', 'patients', [column], sqlite_where=PATIENT_ACTIVE)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for column in reversed(PREFIX_COLUMNS):
+                op.drop_index(f'ix_patients_active_{column}', table_name='patients', postgresql_concurrently=True)
+    else:
+        for column in reversed(PREFIX_COLUMNS):
+            op.drop_index(f'ix_patients_active_{column}', table_name='patients')
+    with op.batch_alter_table('patients') as batch_op:
+        batch_op.drop_column('name_initials')
+        batch_op.drop_column('name_pinyin')
@@ -0,0 +1,48 @@
+"""健康方案全文检索：倒排表与文档长度表
+
+已有方案的倒排索引由 scripts/rebuild_plan_search_index.py 建立（分词方式取决于是否安装 jieba，
+随应用代码演进，不在迁移中固化）。
+
+Revision ID: 20261017_1100
+Revises: 20261017_1030
+Create Date: 2026-10-17 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1100'
+down_revision = '20261017_1030'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('plan_search_documents',
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['plan_id'], ['health_plans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('plan_id')
+    )
+    op.create_table('plan_search_postings',
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=32), nullable=False),
+    sa.Column('tf', sa.Integer(), nullable=False),
+    sa.Column('doc_length', sa.Integer(), nullable=False),
+    sa.Column('is_public', sa.Boolean(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('impact', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['plan_id'], ['health_plans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('plan_id', 'term'),
+    sqlite_with_rowid=False
+    )
+    op.create_index('ix_plan_search_postings_term_impact', 'plan_search_postings',
+                    ['term', 'impact', 'is_public', 'created_by', 'plan_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_plan_search_postings_term_impact', table_name='plan_search_postings')
+    op.drop_table('plan_search_postings')
+    op.drop_table('plan_search_documents')
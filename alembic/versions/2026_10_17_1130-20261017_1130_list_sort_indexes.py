@@ -0,0 +1,33 @@
+"""列表游标分页：方案与分配记录的(created_at, id)索引
+
+Revision ID: 20261017_1130
+Revises: 20261017_1100
+Create Date: 2026-10-17 11:30:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1130'
+down_revision = '20261017_1100'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_health_plans_created_at', 'health_plans'),
+    ('ix_patient_health_plans_created_at', 'patient_health_plans'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in INDEXES:
+            op.create_index(name, table, ['created_at', 'id'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,52 @@
+"""进行中的方案分配唯一：同一患者同一方案最多一条已分配/进行中的记录
+
+Revision ID: 20261017_1200
+Revises: 20261017_1130
+Create Date: 2026-10-17 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1200'
+down_revision = '20261017_1130'
+branch_labels = None
+depends_on = None
+
+
+# 部分索引条件（Enum列存储的是成员名称）
+ASSIGNMENT_ACTIVE = sa.text("status IN ('ASSIGNED', 'IN_PROGRESS')")
+
+
+def upgrade() -> None:
+    # 已有的重复分配只保留最早的一条，其余标记为已取消
+    op.execute(
+        "UPDATE patient_health_plans SET status = 'CANCELLED' "
+        "WHERE status IN ('ASSIGNED', 'IN_PROGRESS') AND id > ("
+        "  SELECT MIN(other.id) FROM patient_health_plans AS other"
+        "  WHERE other.patient_id = patient_health_plans.patient_id"
+        "    AND other.health_plan_id = patient_health_plans.health_plan_id"
+        "    AND other.status IN ('ASSIGNED', 'IN_PROGRESS'))"
+    )
+    # 先建唯一索引再删除原索引，期间查询始终有索引可用
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patient_health_plans_active_unique', 'patient_health_plans', ['patient_id', 'health_plan_id'],
+            unique=True, postgresql_where=ASSIGNMENT_ACTIVE, sqlite_where=ASSIGNMENT_ACTIVE,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_patient_health_plans_active', table_name='patient_health_plans',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_patient_health_plans_active', 'patient_health_plans', ['patient_id', 'health_plan_id'],
+            postgresql_where=ASSIGNMENT_ACTIVE, sqlite_where=ASSIGNMENT_ACTIVE,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_patient_health_plans_active_unique', table_name='patient_health_plans',
+                      postgresql_concurrently=True)
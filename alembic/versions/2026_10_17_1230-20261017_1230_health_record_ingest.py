@@ -0,0 +1,40 @@
+"""健康记录批量上报：幂等键与列表分页索引
+
+Revision ID: 20261017_1230
+Revises: 20261017_1200
+Create Date: 2026-10-17 12:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1230'
+down_revision = '20261017_1200'
+branch_labels = None
+depends_on = None
+
+
+HAS_IDEMPOTENCY_KEY = sa.text("idempotency_key IS NOT NULL")
+
+
+def upgrade() -> None:
+    op.add_column('health_records', sa.Column('idempotency_key', sa.String(length=64), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_health_records_idempotency_key', 'health_records', ['recorded_by', 'idempotency_key'],
+            unique=True, postgresql_where=HAS_IDEMPOTENCY_KEY, sqlite_where=HAS_IDEMPOTENCY_KEY,
+            postgresql_concurrently=True,
+        )
+        op.create_index('ix_health_records_record_date', 'health_records', ['record_date', 'id'],
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_health_records_record_date', table_name='health_records', postgresql_concurrently=True)
+        op.drop_index('ix_health_records_idempotency_key', table_name='health_records',
+                      postgresql_concurrently=True)
+    with op.batch_alter_table('health_records') as batch_op:
+        batch_op.drop_column('idempotency_key')
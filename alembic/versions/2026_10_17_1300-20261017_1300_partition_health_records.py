@@ -0,0 +1,135 @@
+"""健康记录按月分区（PostgreSQL）
+
+Revision ID: 20261017_1300
+Revises: 20261017_1230
+Create Date: 2026-10-17 13:00:00
+
+PostgreSQL 上把 health_records 转换为按 record_date 范围分区的分区表：现有数据覆盖的每个UTC月份、
+当月及之后3个月各建一个分区，另建默认分区兜底，然后复制现有数据并删除原表。分区表的主键与唯一索引
+必须包含分区键，主键改为 (id, record_date)，幂等键唯一索引改为 (recorded_by, idempotency_key, record_date)。
+转换期间表被锁定，记录很多时应在维护窗口执行。
+
+其他数据库不分区，只调整幂等键唯一索引。
+"""
+import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1300'
+down_revision = '20261017_1230'
+branch_labels = None
+depends_on = None
+
+
+HAS_IDEMPOTENCY_KEY = sa.text("idempotency_key IS NOT NULL")
+MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = [
+    ('patient_id', 'patients'),
+    ('recorded_by', 'users'),
+    ('patient_health_plan_id', 'patient_health_plans'),
+]
+INDEXES = [
+    ('ix_health_records_id', ['id']),
+    ('ix_health_records_patient_record_date', ['patient_id', 'record_date']),
+    ('ix_health_records_recorded_by', ['recorded_by']),
+    ('ix_health_records_patient_health_plan_id', ['patient_health_plan_id']),
+    ('ix_health_records_record_date', ['record_date', 'id']),
+]
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _create_table_constraints(table, primary_key, idempotency_columns):
+    """为 health_records 建主键、外键与索引（数据复制之后执行）"""
+    op.create_primary_key('health_records_pkey', table, primary_key)
+    for column, referent in FOREIGN_KEYS:
+        op.create_foreign_key(f'health_records_{column}_fkey', table, referent, [column], ['id'])
+    for name, columns in INDEXES:
+        op.create_index(name, table, columns)
+    op.create_index('ix_health_records_idempotency_key', table, idempotency_columns, unique=True,
+                    postgresql_where=HAS_IDEMPOTENCY_KEY)
+
+
+def _drop_old_table_names(table):
+    """原表改名后释放主键与索引名，新表沿用原来的名称"""
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT health_records_pkey TO {table}_pkey")
+    for name, _ in INDEXES + [('ix_health_records_idempotency_key', None)]:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER SEQUENCE health_records_id_seq OWNED BY NONE")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_health_records_idempotency_key', table_name='health_records')
+            op.create_index(
+                'ix_health_records_idempotency_key', 'health_records',
+                ['recorded_by', 'idempotency_key', 'record_date'],
+                unique=True, postgresql_where=HAS_IDEMPOTENCY_KEY, sqlite_where=HAS_IDEMPOTENCY_KEY,
+            )
+        return
+
+    op.execute("ALTER TABLE health_records RENAME TO health_records_unpartitioned")
+    _drop_old_table_names('health_records_unpartitioned')
+    op.execute(
+        "CREATE TABLE health_records (LIKE health_records_unpartitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (record_date)"
+    )
+    op.execute("ALTER SEQUENCE health_records_id_seq OWNED BY health_records.id")
+
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    first = bind.execute(sa.text(
+        "SELECT min(record_date AT TIME ZONE 'UTC') FROM health_records_unpartitioned"
+    )).scalar()
+    month = datetime.date((first or today).year, (first or today).month, 1)
+    last = _add_months(datetime.date(today.year, today.month, 1), MONTHS_AHEAD)
+    if first is not None:
+        newest = bind.execute(sa.text(
+            "SELECT max(record_date AT TIME ZONE 'UTC') FROM health_records_unpartitioned"
+        )).scalar()
+        last = max(last, datetime.date(newest.year, newest.month, 1))
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE health_records_{month.year:04d}_{month.month:02d} PARTITION OF health_records "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{upper.isoformat()} 00:00:00+00')"
+        )
+        month = upper
+    op.execute("CREATE TABLE health_records_default PARTITION OF health_records DEFAULT")
+
+    op.execute("INSERT INTO health_records SELECT * FROM health_records_unpartitioned")
+    op.execute("DROP TABLE health_records_unpartitioned")
+    _create_table_constraints(
+        'health_records', ['id', 'record_date'], ['recorded_by', 'idempotency_key', 'record_date']
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index('ix_health_records_idempotency_key', table_name='health_records')
+            op.create_index(
+                'ix_health_records_idempotency_key', 'health_records', ['recorded_by', 'idempotency_key'],
+                unique=True, postgresql_where=HAS_IDEMPOTENCY_KEY, sqlite_where=HAS_IDEMPOTENCY_KEY,
+            )
+        return
+
+    op.execute("ALTER TABLE health_records RENAME TO health_records_partitioned")
+    _drop_old_table_names('health_records_partitioned')
+    op.execute(
+        "CREATE TABLE health_records (LIKE health_records_partitioned INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    )
+    op.execute("ALTER SEQUENCE health_records_id_seq OWNED BY health_records.id")
+    op.execute("INSERT INTO health_records SELECT * FROM health_records_partitioned")
+    # 分区随分区表一并删除（已分离的分区为独立表，不受影响）
+    op.execute("DROP TABLE health_records_partitioned")
+    _create_table_constraints('health_records', ['id'], ['recorded_by', 'idempotency_key'])
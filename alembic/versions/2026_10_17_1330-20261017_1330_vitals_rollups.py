@@ -0,0 +1,113 @@
+"""生命体征汇总表
+
+Revision ID: 20261017_1330
+Revises: 20261017_1300
+Create Date: 2026-10-17 13:30:00
+
+按已有健康记录回填汇总。回填SQL固定在本迁移中（不引用应用代码），每个指标、粒度一条 INSERT ... SELECT：
+时间段按UTC划分，周从周一开始；最新值取时间段内记录时间最晚的值。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1330'
+down_revision = '20261017_1300'
+branch_labels = None
+depends_on = None
+
+
+METRICS = {
+    'SYSTOLIC_PRESSURE': 'systolic_pressure',
+    'DIASTOLIC_PRESSURE': 'diastolic_pressure',
+    'HEART_RATE': 'heart_rate',
+    'TEMPERATURE': 'temperature',
+    'BLOOD_GLUCOSE': 'blood_glucose',
+    'WEIGHT': 'weight',
+}
+BUCKETS = ('HOUR', 'DAY', 'WEEK')
+
+health_records = sa.table(
+    'health_records',
+    sa.column('patient_id', sa.Integer),
+    sa.column('record_date', sa.DateTime(timezone=True)),
+    *[sa.column(column, sa.Float) for column in METRICS.values()],
+)
+vitals_rollups = sa.table(
+    'vitals_rollups',
+    *[sa.column(name) for name in ('patient_id', 'metric', 'bucket', 'bucket_start', 'count', 'min_value',
+                                   'max_value', 'sum_value', 'last_value', 'last_recorded_at')],
+)
+
+
+def _bucket_start(dialect_name, bucket):
+    """记录时间所在时间段的起点（UTC）"""
+    record_date = health_records.c.record_date
+    if dialect_name == 'postgresql':
+        utc = sa.func.timezone('UTC', record_date)
+        return sa.func.timezone('UTC', sa.func.date_trunc(bucket.lower(), utc))
+    # SQLite 中时间以不带时区的文本保存，按UTC处理
+    if bucket == 'HOUR':
+        return sa.func.strftime('%Y-%m-%d %H:00:00.000000', record_date)
+    if bucket == 'DAY':
+        return sa.func.strftime('%Y-%m-%d 00:00:00.000000', record_date)
+    return sa.func.strftime('%Y-%m-%d 00:00:00.000000', record_date, 'weekday 0', '-6 days')
+
+
+def _backfill(dialect_name):
+    for metric, column in METRICS.items():
+        value = health_records.c[column]
+        for bucket in BUCKETS:
+            start = _bucket_start(dialect_name, bucket)
+            window = dict(partition_by=[health_records.c.patient_id, start],
+                          order_by=health_records.c.record_date.desc())
+            records = sa.select(
+                health_records.c.patient_id,
+                start.label('bucket_start'),
+                value.label('value'),
+                health_records.c.record_date,
+                sa.func.first_value(value).over(**window).label('last_value'),
+            ).where(value.isnot(None)).subquery()
+            op.execute(vitals_rollups.insert().from_select(
+                ['patient_id', 'metric', 'bucket', 'bucket_start', 'count', 'min_value', 'max_value',
+                 'sum_value', 'last_value', 'last_recorded_at'],
+                sa.select(
+                    records.c.patient_id,
+                    sa.cast(sa.literal_column(f"'{metric}'"), sa.Enum(*METRICS, name='vitalmetric')).label('metric'),
+                    sa.cast(sa.literal_column(f"'{bucket}'"), sa.Enum(*BUCKETS, name='rollupbucket')).label('bucket'),
+                    records.c.bucket_start,
+                    sa.func.count(),
+                    sa.func.min(records.c.value),
+                    sa.func.max(records.c.value),
+                    sa.func.sum(records.c.value),
+                    sa.func.max(records.c.last_value),
+                    sa.func.max(records.c.record_date),
+                ).group_by(records.c.patient_id, records.c.bucket_start),
+            ))
+
+
+def upgrade() -> None:
+    op.create_table('vitals_rollups',
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('metric', sa.Enum('SYSTOLIC_PRESSURE', 'DIASTOLIC_PRESSURE', 'HEART_RATE', 'TEMPERATURE',
+                                'BLOOD_GLUCOSE', 'WEIGHT', name='vitalmetric'), nullable=False),
+    sa.Column('bucket', sa.Enum('HOUR', 'DAY', 'WEEK', name='rollupbucket'), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('min_value', sa.Float(), nullable=False),
+    sa.Column('max_value', sa.Float(), nullable=False),
+    sa.Column('sum_value', sa.Float(), nullable=False),
+    sa.Column('last_value', sa.Float(), nullable=False),
+    sa.Column('last_recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('patient_id', 'metric', 'bucket', 'bucket_start'),
+    sqlite_with_rowid=False
+    )
+    _backfill(op.get_bind().dialect.name)
+
+
+def downgrade() -> None:
+    op.drop_table('vitals_rollups')
+    sa.Enum(name='rollupbucket').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='vitalmetric').drop(op.get_bind(), checkfirst=True)
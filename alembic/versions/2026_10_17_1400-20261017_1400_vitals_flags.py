@@ -0,0 +1,56 @@
+"""生命体征异常提示表与日均值分析索引
+
+Revision ID: 20261017_1400
+Revises: 20261017_1330
+Create Date: 2026-10-17 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1400'
+down_revision = '20261017_1330'
+branch_labels = None
+depends_on = None
+
+
+DAILY_BUCKET = sa.text("bucket = 'DAY'")
+
+
+def upgrade() -> None:
+    op.create_table('vitals_flags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    # vitalmetric 类型已由汇总表迁移创建
+    sa.Column('metric', postgresql.ENUM('SYSTOLIC_PRESSURE', 'DIASTOLIC_PRESSURE', 'HEART_RATE', 'TEMPERATURE',
+                                        'BLOOD_GLUCOSE', 'WEIGHT', name='vitalmetric', create_type=False),
+              nullable=False),
+    sa.Column('flag_type', sa.Enum('TREND_UP', 'TREND_DOWN', 'SPIKE', 'CHANGE_POINT', name='vitalsflagtype'),
+              nullable=False),
+    sa.Column('event_date', sa.Date(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_vitals_flags_patient_event', 'vitals_flags',
+                    ['patient_id', 'metric', 'flag_type', 'event_date'], unique=True)
+    op.create_index('ix_vitals_flags_event_date', 'vitals_flags', ['event_date', 'id'])
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_vitals_rollups_daily', 'vitals_rollups', ['metric', 'patient_id', 'bucket_start', 'count', 'sum_value'],
+            postgresql_where=DAILY_BUCKET, sqlite_where=DAILY_BUCKET, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_vitals_rollups_daily', table_name='vitals_rollups', postgresql_concurrently=True)
+    op.drop_index('ix_vitals_flags_event_date', table_name='vitals_flags')
+    op.drop_index('ix_vitals_flags_patient_event', table_name='vitals_flags')
+    op.drop_table('vitals_flags')
+    sa.Enum(name='vitalsflagtype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,116 @@
+"""预约时间冲突：PostgreSQL 排他约束，占用时间段的预约部分索引与列表排序索引
+
+Revision ID: 20261017_1430
+Revises: 20261017_1400
+Create Date: 2026-10-17 14:30:00
+
+"""
+import bisect
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1430'
+down_revision = '20261017_1400'
+branch_labels = None
+depends_on = None
+
+
+# 占用医生时间段的预约（Enum列存储的是成员名称）
+BOOKED_NAMES = ('SCHEDULED', 'CONFIRMED', 'IN_PROGRESS', 'COMPLETED')
+BOOKED_STATUSES = "status IN ({})".format(", ".join(f"'{name}'" for name in BOOKED_NAMES))
+APPOINTMENT_BOOKED = sa.text(BOOKED_STATUSES)
+CANCELLATION_REASON = '时间段无效、超过12小时或与该医生的其他预约重叠（数据迁移时取消）'
+# 与 app.utils.appointment_booking.MAX_APPOINTMENT_DURATION 一致：重叠检查与可预约时间段查询按此限定开始时间下界，
+# 更长的预约不会被扫描到
+MAX_DURATION_HOURS = 12
+CANCEL_BATCH_SIZE = 500
+
+appointments_table = sa.table(
+    'appointments',
+    sa.column('id', sa.Integer),
+    sa.column('doctor_id', sa.Integer),
+    sa.column('status', sa.Enum(*BOOKED_NAMES, 'CANCELLED', 'NO_SHOW', name='appointmentstatus')),
+    sa.column('scheduled_start', sa.DateTime(timezone=True)),
+    sa.column('scheduled_end', sa.DateTime(timezone=True)),
+    sa.column('cancellation_reason', sa.Text),
+)
+
+
+def _overlapping_ids(bind):
+    """按医生、按创建顺序（id）贪心保留：与已保留的预约不重叠才保留，返回需要取消的预约id
+
+    只比较已保留的预约，A-B-C 连续重叠时取消B后C与A不重叠即保留，取消的预约尽量少。
+    只读取存在重叠的医生的预约。
+    """
+    other = appointments_table.alias('other')
+    overlapping_doctors = (
+        sa.select(appointments_table.c.doctor_id).distinct()
+        .select_from(appointments_table.join(other, sa.and_(
+            other.c.doctor_id == appointments_table.c.doctor_id,
+            other.c.id < appointments_table.c.id,
+            other.c.scheduled_start < appointments_table.c.scheduled_end,
+            other.c.scheduled_end > appointments_table.c.scheduled_start,
+        )))
+        .where(appointments_table.c.status.in_(BOOKED_NAMES), other.c.status.in_(BOOKED_NAMES))
+    )
+    rows = bind.execute(
+        sa.select(appointments_table.c.id, appointments_table.c.doctor_id,
+                  appointments_table.c.scheduled_start, appointments_table.c.scheduled_end)
+        .where(appointments_table.c.status.in_(BOOKED_NAMES), appointments_table.c.doctor_id.in_(overlapping_doctors))
+        .order_by(appointments_table.c.doctor_id, appointments_table.c.id)
+    )
+    cancelled = []
+    doctor_id = starts = ends = None
+    for appointment_id, row_doctor, start, end in rows:
+        if row_doctor != doctor_id:
+            # 已保留的预约互不重叠，按开始时间排序后结束时间同样有序
+            doctor_id, starts, ends = row_doctor, [], []
+        position = bisect.bisect_left(starts, start)
+        if (position > 0 and ends[position - 1] > start) or (position < len(starts) and starts[position] < end):
+            cancelled.append(appointment_id)
+            continue
+        starts.insert(position, start)
+        ends.insert(position, end)
+    return cancelled
+
+
+def upgrade() -> None:
+    # 已有的无效或超长时间段，以及与同一医生已保留的预约重叠的预约标记为已取消，否则无法建立约束
+    bind = op.get_bind()
+    cancel = appointments_table.update().values(status='CANCELLED', cancellation_reason=CANCELLATION_REASON)
+    start, end = appointments_table.c.scheduled_start, appointments_table.c.scheduled_end
+    if bind.dialect.name == 'postgresql':
+        too_long = end - start > sa.text(f"interval '{MAX_DURATION_HOURS} hours'")
+    else:
+        too_long = (sa.func.julianday(end) - sa.func.julianday(start)) * 24 > MAX_DURATION_HOURS
+    bind.execute(cancel.where(appointments_table.c.status.in_(BOOKED_NAMES), sa.or_(end <= start, too_long)))
+    cancelled = _overlapping_ids(bind)
+    for index in range(0, len(cancelled), CANCEL_BATCH_SIZE):
+        bind.execute(cancel.where(appointments_table.c.id.in_(cancelled[index:index + CANCEL_BATCH_SIZE])))
+    if bind.dialect.name == 'postgresql':
+        # btree_gist 提供 doctor_id 的等值比较；降级时保留扩展
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.execute(
+            "ALTER TABLE appointments ADD CONSTRAINT ex_appointments_doctor_overlap "
+            "EXCLUDE USING gist (doctor_id WITH =, tstzrange(scheduled_start, scheduled_end) WITH &&) "
+            f"WHERE ({BOOKED_STATUSES})"
+        )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_appointments_doctor_booked', 'appointments', ['doctor_id', 'scheduled_start', 'scheduled_end'],
+            postgresql_where=APPOINTMENT_BOOKED, sqlite_where=APPOINTMENT_BOOKED,
+            postgresql_concurrently=True,
+        )
+        op.create_index('ix_appointments_scheduled_start', 'appointments', ['scheduled_start', 'id'],
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_appointments_scheduled_start', table_name='appointments', postgresql_concurrently=True)
+        op.drop_index('ix_appointments_doctor_booked', table_name='appointments', postgresql_concurrently=True)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE appointments DROP CONSTRAINT ex_appointments_doctor_overlap")
@@ -0,0 +1,40 @@
+"""医生出诊时间表与按科室、专业查找医生的索引
+
+Revision ID: 20261017_1500
+Revises: 20261017_1430
+Create Date: 2026-10-17 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1500'
+down_revision = '20261017_1430'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('doctor_working_hours',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('doctor_id', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.ForeignKeyConstraint(['doctor_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_doctor_working_hours_doctor', 'doctor_working_hours',
+                    ['doctor_id', 'weekday', 'start_time'], unique=True)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_department_specialty', 'users', ['department', 'specialty'],
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_department_specialty', table_name='users', postgresql_concurrently=True)
+    op.drop_index('ix_doctor_working_hours_doctor', table_name='doctor_working_hours')
+    op.drop_table('doctor_working_hours')
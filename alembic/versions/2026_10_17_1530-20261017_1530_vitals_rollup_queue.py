@@ -0,0 +1,33 @@
+"""生命体征汇总队列：批量上报的记录在请求之外累加到汇总表
+
+Revision ID: 20261017_1530
+Revises: 20261017_1500
+Create Date: 2026-10-17 15:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1530'
+down_revision = '20261017_1500'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('vitals_rollup_queue',
+    sa.Column('record_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('patient_id', sa.Integer(), nullable=False),
+    sa.Column('record_date', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('record_id')
+    )
+    op.create_index('ix_vitals_rollup_queue_patient', 'vitals_rollup_queue', ['patient_id', 'record_date'])
+
+
+def downgrade() -> None:
+    # 降级前先运行 scripts/drain_vitals_rollups.py，否则队列中的记录需用 scripts/rebuild_vitals_rollups.py 重建汇总
+    op.drop_index('ix_vitals_rollup_queue_patient', table_name='vitals_rollup_queue')
+    op.drop_table('vitals_rollup_queue')
@@ -0,0 +1,29 @@
+"""患者搜索索引队列：批量导入的患者在请求之外写入gram索引
+
+Revision ID: 20261017_1600
+Revises: 20261017_1530
+Create Date: 2026-10-17 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '20261017_1600'
+down_revision = '20261017_1530'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('patient_search_queue',
+    sa.Column('patient_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('patient_id')
+    )
+
+
+def downgrade() -> None:
+    # 降级前先运行 scripts/drain_patient_search_index.py，否则队列中的患者需用 scripts/rebuild_patient_search_index.py 重建索引
+    op.drop_table('patient_search_queue')
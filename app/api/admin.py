@@ -0,0 +1,87 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.db_routing import read_router
+from app.core.hashing import password_executor
+from app.core.pool_metrics import pool_snapshots
+from app.core.revocation import revocation_list
+from app.core.security import token_cache
+from app.core.slow_queries import slow_query_log
+from app.core.statement_cache import statement_cache_snapshots
+from app.utils.deps import get_current_active_admin
+from app.utils.user_cache import user_cache
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/metrics/user-cache")
+def get_user_cache_metrics(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """获取认证用户缓存的命中/未命中统计"""
+    return user_cache.stats()
+
+
+@router.get("/metrics/password-hashing")
+def get_password_hashing_metrics(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """获取密码哈希线程池的排队与拒绝统计"""
+    return password_executor.stats()
+
+
+@router.get("/metrics/token-verification")
+def get_token_verification_metrics(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """获取令牌校验缓存与吊销检查统计"""
+    return {
+        "token_cache": token_cache.stats(),
+        "revocation": revocation_list.stats(),
+    }
+
+
+@router.get("/metrics/db-pool")
+def get_db_pool_metrics(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """获取数据库连接池状态：签出/空闲连接、溢出使用、等待时间分布与超时次数"""
+    return pool_snapshots()
+
+
+@router.get("/metrics/db-routing")
+def get_db_routing_metrics(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """获取读写分离路由决策统计"""
+    return read_router.stats()
+
+
+@router.get("/metrics/statement-cache")
+def get_statement_cache_metrics(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """获取各引擎SQL编译缓存的命中率与缓存条目数"""
+    return statement_cache_snapshots()
+
+
+@router.get("/metrics/slow-queries")
+def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total", pattern="^(total|count|p95|max)$"),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """获取慢查询排行：按语句指纹聚合的次数、总耗时、p95与采样的执行计划"""
+    return {
+        **slow_query_log.stats(),
+        "queries": slow_query_log.top(limit, order_by),
+    }
+
+
+@router.delete("/metrics/slow-queries")
+def reset_slow_queries(
+    current_user: User = Depends(get_current_active_admin)
+):
+    """清空慢查询统计"""
+    slow_query_log.reset()
+    return {"message": "慢查询统计已清空"}
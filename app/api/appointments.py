@@ -0,0 +1,290 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.utils.appointment_availability import (
+    MAX_AVAILABLE_SLOTS, MAX_SEARCH_RANGE, default_weekly_hours, find_available_slots, find_doctors,
+    load_weekly_hours, validate_weekly_hours,
+)
+from app.utils.appointment_booking import MAX_APPOINTMENT_DURATION, save_booking, validate_interval
+from app.utils.deps import get_current_active_doctor, get_current_active_staff
+from app.utils.lookups import get_by_id
+from app.utils.pagination import paginate
+from app.utils.timeutils import as_utc
+from app.models.appointment import Appointment, AppointmentStatus, AppointmentType, BOOKED_APPOINTMENT_STATUSES
+from app.models.doctor_working_hours import DoctorWorkingHours
+from app.models.patient import Patient
+from app.models.patient_health_plan import PatientHealthPlan
+from app.models.user import User, UserRole
+from app.schemas.appointment import (
+    AppointmentCreate, AppointmentUpdate, AppointmentResponse, AvailableSlot, WorkingHoursItem,
+)
+
+router = APIRouter()
+
+# 列表可选的排序字段（均有索引）
+APPOINTMENT_SORT_KEYS = {"scheduled_start": Appointment.scheduled_start, "id": Appointment.id}
+# 可以取消的预约状态
+CANCELLABLE_STATUSES = (AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED)
+# 查询可预约时间段时未指定结束时间的默认范围
+DEFAULT_AVAILABILITY_RANGE = timedelta(days=7)
+
+
+def _get_doctor(db: Session, doctor_id: int) -> User:
+    """获取在职医生（管理员也可接受预约），不存在时返回404"""
+    doctor = get_by_id(db, User, doctor_id)
+    if not doctor or not doctor.is_active or doctor.role not in (UserRole.DOCTOR, UserRole.ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="医生不存在"
+        )
+    return doctor
+
+
+def _weekly_hours_items(db: Session, doctor_id: int) -> List[WorkingHoursItem]:
+    """医生生效的每周出诊时间（未配置时为默认出诊时间）"""
+    hours = load_weekly_hours(db, [doctor_id]).get(doctor_id) or default_weekly_hours()
+    return [
+        WorkingHoursItem(weekday=weekday, start_time=start, end_time=end)
+        for weekday in sorted(hours)
+        for start, end in hours[weekday]
+    ]
+
+
+def _check_references(db: Session, appointment_data: AppointmentCreate) -> None:
+    """验证患者、医生存在，且方案分配属于该患者"""
+    if not get_by_id(db, Patient, appointment_data.patient_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="患者不存在"
+        )
+
+    _get_doctor(db, appointment_data.doctor_id)
+
+    if appointment_data.patient_health_plan_id is not None:
+        assignment = get_by_id(db, PatientHealthPlan, appointment_data.patient_health_plan_id)
+        if not assignment or assignment.patient_id != appointment_data.patient_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="健康方案分配不存在或不属于该患者"
+            )
+
+
+@router.post("/", response_model=AppointmentResponse)
+def create_appointment(
+    appointment_data: AppointmentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """创建预约（与该医生已有预约的时间段重叠时返回400）"""
+    start, end = validate_interval(appointment_data.scheduled_start, appointment_data.scheduled_end)
+    _check_references(db, appointment_data)
+
+    db_appointment = Appointment(
+        **appointment_data.model_dump(exclude={"scheduled_start", "scheduled_end"}),
+        scheduled_start=start,
+        scheduled_end=end,
+        status=AppointmentStatus.SCHEDULED
+    )
+    db.add(db_appointment)
+    save_booking(db, db_appointment)
+    db.commit()
+    db.refresh(db_appointment)
+
+    return db_appointment
+
+
+@router.get("/", response_model=List[AppointmentResponse])
+def get_appointments(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("scheduled_start", description="排序字段，前缀 - 表示降序"),
+    estimate_total: bool = Query(False),
+    patient_id: Optional[int] = Query(None),
+    doctor_id: Optional[int] = Query(None),
+    appointment_type: Optional[AppointmentType] = Query(None),
+    status_filter: Optional[AppointmentStatus] = Query(None, alias="status"),
+    scheduled_start_from: Optional[datetime] = Query(None),
+    scheduled_start_to: Optional[datetime] = Query(None),
+    patient_health_plan_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """搜索预约（支持游标分页）"""
+    query = db.query(Appointment)
+
+    if patient_id:
+        query = query.filter(Appointment.patient_id == patient_id)
+    if doctor_id:
+        query = query.filter(Appointment.doctor_id == doctor_id)
+    if appointment_type:
+        query = query.filter(Appointment.appointment_type == appointment_type)
+    if status_filter:
+        query = query.filter(Appointment.status == status_filter)
+    if scheduled_start_from:
+        query = query.filter(Appointment.scheduled_start >= as_utc(scheduled_start_from))
+    if scheduled_start_to:
+        query = query.filter(Appointment.scheduled_start <= as_utc(scheduled_start_to))
+    if patient_health_plan_id:
+        query = query.filter(Appointment.patient_health_plan_id == patient_health_plan_id)
+
+    return paginate(
+        db, query, response, sort_keys=APPOINTMENT_SORT_KEYS, sort=sort, id_column=Appointment.id,
+        cursor=cursor, skip=skip, limit=limit, estimate_total=estimate_total
+    )
+
+
+@router.get("/availability", response_model=List[AvailableSlot])
+def get_availability(
+    department: Optional[str] = Query(None, description="医生所在科室"),
+    specialty: Optional[str] = Query(None, description="医生的专业"),
+    doctor_id: Optional[int] = Query(None),
+    start: Optional[datetime] = Query(None, description="默认为当前时间，早于当前时间时从当前时间开始"),
+    end: Optional[datetime] = Query(None, description="默认为开始时间之后7天"),
+    duration: int = Query(30, ge=5, le=int(MAX_APPOINTMENT_DURATION.total_seconds() // 60),
+                          description="预约时长（分钟）"),
+    limit: int = Query(10, ge=1, le=MAX_AVAILABLE_SLOTS),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """查询可预约时间段：匹配科室/专业的在职医生在出诊时间内的空闲时间段，按开始时间返回最早的 limit 个"""
+    now = datetime.now(timezone.utc)
+    start = max(as_utc(start), now) if start else now
+    end = as_utc(end) if end else start + DEFAULT_AVAILABILITY_RANGE
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="结束时间必须晚于开始时间（且晚于当前时间）"
+        )
+    if end - start > MAX_SEARCH_RANGE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"查询范围不能超过{MAX_SEARCH_RANGE.days}天"
+        )
+
+    doctors = find_doctors(db, department=department, specialty=specialty, doctor_id=doctor_id)
+    return find_available_slots(db, doctors, start, end, timedelta(minutes=duration), limit)
+
+
+@router.get("/working-hours/{doctor_id}", response_model=List[WorkingHoursItem])
+def get_working_hours(
+    doctor_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """获取医生每周的出诊时间（未配置时返回默认出诊时间）"""
+    _get_doctor(db, doctor_id)
+    return _weekly_hours_items(db, doctor_id)
+
+
+@router.put("/working-hours/{doctor_id}", response_model=List[WorkingHoursItem])
+def set_working_hours(
+    doctor_id: int,
+    items: List[WorkingHoursItem],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """设置医生每周的出诊时间（整体替换，空列表恢复为默认出诊时间）；医生只能设置自己的出诊时间"""
+    if current_user.role != UserRole.ADMIN and current_user.id != doctor_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足：只能设置自己的出诊时间"
+        )
+    _get_doctor(db, doctor_id)
+    validate_weekly_hours([(item.weekday, item.start_time, item.end_time) for item in items])
+
+    db.query(DoctorWorkingHours).filter(DoctorWorkingHours.doctor_id == doctor_id).delete(
+        synchronize_session=False
+    )
+    db.add_all([DoctorWorkingHours(doctor_id=doctor_id, **item.model_dump()) for item in items])
+    db.commit()
+
+    return _weekly_hours_items(db, doctor_id)
+
+
+@router.get("/{appointment_id}", response_model=AppointmentResponse)
+def get_appointment(
+    appointment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """获取预约详情"""
+    appointment = get_by_id(db, Appointment, appointment_id)
+    if not appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="预约不存在"
+        )
+
+    return appointment
+
+
+@router.put("/{appointment_id}", response_model=AppointmentResponse)
+def update_appointment(
+    appointment_id: int,
+    appointment_data: AppointmentUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """更新预约（改期或恢复为占用时间段的状态时重新检查时间冲突）"""
+    appointment = get_by_id(db, Appointment, appointment_id)
+    if not appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="预约不存在"
+        )
+
+    update_data = appointment_data.model_dump(exclude_unset=True)
+    rescheduled = "scheduled_start" in update_data or "scheduled_end" in update_data
+    rebooked = (
+        appointment.status not in BOOKED_APPOINTMENT_STATUSES
+        and update_data.get("status") in BOOKED_APPOINTMENT_STATUSES
+    )
+    if rescheduled or rebooked:
+        # 恢复已取消的预约时同样校验时长（迁移时取消的超长预约不能直接恢复）
+        update_data["scheduled_start"], update_data["scheduled_end"] = validate_interval(
+            update_data.get("scheduled_start") or appointment.scheduled_start,
+            update_data.get("scheduled_end") or appointment.scheduled_end,
+        )
+    for field, value in update_data.items():
+        setattr(appointment, field, value)
+
+    if rescheduled or rebooked:
+        save_booking(db, appointment)
+    db.commit()
+    db.refresh(appointment)
+
+    return appointment
+
+
+@router.delete("/{appointment_id}")
+def cancel_appointment(
+    appointment_id: int,
+    cancellation_reason: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """取消预约（释放医生的时间段）"""
+    appointment = get_by_id(db, Appointment, appointment_id)
+    if not appointment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="预约不存在"
+        )
+    if appointment.status not in CANCELLABLE_STATUSES and appointment.status != AppointmentStatus.CANCELLED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="进行中、已完成或爽约的预约不能取消"
+        )
+
+    appointment.status = AppointmentStatus.CANCELLED
+    if cancellation_reason is not None:
+        appointment.cancellation_reason = cancellation_reason
+
+    db.commit()
+
+    return {"message": "预约已取消"}
@@ -1,26 +1,57 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordRequestForm, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, get_password_hash
+from app.core.database import get_db, run_in_session
+from app.core.hashing import password_executor, ExecutorSaturated
+from app.core.security import (
+    verify_and_update_password, create_access_token, get_password_hash, verify_token, revoke_token
+)
 from app.models.user import User
 from app.schemas.user import Token, UserCreate, UserResponse
+from app.utils.deps import security, get_current_user
 
 router = APIRouter()
 
 
+async def _run_hashing(fn, *args):
+    """在密码哈希线程池中执行，排队已满时快速返回503"""
+    try:
+        return await password_executor.run(fn, *args)
+    except ExecutorSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="认证服务繁忙，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
+
+
+def _get_user_by_username(db: Session, username: str):
+    return db.query(User).filter(User.username == username).first()
+
+
+def _update_password_hash(db: Session, user: User, new_hash: str) -> None:
+    user.hashed_password = new_hash
+    db.commit()
+
+
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """用户登录"""
-    user = db.query(User).filter(User.username == form_data.username).first()
+    user = await run_in_session(db, _get_user_by_username, form_data.username)
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await _run_hashing(
+            verify_and_update_password, form_data.password, user.hashed_password
+        )
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -35,21 +66,20 @@ def login(
     
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
     
+    # bcrypt成本配置变更后透明地重新哈希
+    if new_hash:
+        await run_in_session(db, _update_password_hash, user, new_hash)
+    
     return {
         "access_token": access_token,
         "token_type": "bearer"
     }
 
 
-@router.post("/register", response_model=UserResponse)
-def register(
-    user_data: UserCreate,
-    db: Session = Depends(get_db)
-):
-    """用户注册"""
+def _check_user_unique(db: Session, user_data: UserCreate) -> None:
     # 检查用户名是否已存在
     if db.query(User).filter(User.username == user_data.username).first():
         raise HTTPException(
@@ -63,9 +93,9 @@ def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="邮箱已存在"
         )
-    
-    # 创建新用户
-    hashed_password = get_password_hash(user_data.password)
+
+
+def _create_user(db: Session, user_data: UserCreate, hashed_password: str) -> User:
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -82,4 +112,30 @@ def register(
     db.commit()
     db.refresh(db_user)
     
-    return db_user
\ No newline at end of file
+    return db_user
+
+
+@router.post("/register", response_model=UserResponse)
+async def register(
+    user_data: UserCreate,
+    db: Session = Depends(get_db)
+):
+    """用户注册"""
+    await run_in_session(db, _check_user_unique, user_data)
+    
+    # 创建新用户
+    hashed_password = await _run_hashing(get_password_hash, user_data.password)
+    return await run_in_session(db, _create_user, user_data, hashed_password)
+
+
+@router.post("/logout")
+def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_user)
+):
+    """退出登录（吊销当前令牌）"""
+    payload = verify_token(credentials.credentials)
+    if payload:
+        revoke_token(payload)
+    
+    return {"message": "已退出登录"}
\ No newline at end of file
@@ -1,17 +1,24 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.utils.deps import get_current_active_doctor
+from app.utils.export import EXPORT_FORMAT_PATTERN, export_columns, export_response
+from app.utils.lookups import get_by_id
+from app.utils.pagination import paginate
+from app.utils.plan_search import search_plans
 from app.models.health_plan import HealthPlan
 from app.models.user import User
 from app.schemas.health_plan import (
-    HealthPlanCreate, HealthPlanUpdate, HealthPlanResponse, HealthPlanSearchParams
+    HealthPlanCreate, HealthPlanUpdate, HealthPlanResponse, HealthPlanSearchParams, HealthPlanSearchResult
 )
 
 router = APIRouter()
 
+# 列表可选的排序字段（均有索引）
+PLAN_SORT_KEYS = {"created_at": HealthPlan.created_at, "id": HealthPlan.id}
+
 
 @router.post("/", response_model=HealthPlanResponse)
 def create_health_plan(
@@ -32,23 +39,11 @@ def create_health_plan(
     return db_plan
 
 
-@router.get("/", response_model=List[HealthPlanResponse])
-def get_health_plans(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    title: Optional[str] = Query(None),
-    plan_type: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
-    is_template: Optional[bool] = Query(None),
-    is_public: Optional[bool] = Query(None),
-    created_by: Optional[int] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_doctor)
-):
-    """获取健康方案列表"""
+def _filter_health_plans(db: Session, current_user: User, title: Optional[str], plan_type: Optional[str],
+                         status: Optional[str], is_template: Optional[bool], is_public: Optional[bool],
+                         created_by: Optional[int]):
+    """健康方案列表与导出共用的过滤条件"""
     query = db.query(HealthPlan)
-    
-    # 应用过滤条件
     if title:
         query = query.filter(HealthPlan.title.ilike(f"%{title}%"))
     if plan_type:
@@ -69,9 +64,76 @@ def get_health_plans(
             (HealthPlan.is_public == True) | 
             (HealthPlan.created_by == current_user.id)
         )
-    
-    plans = query.offset(skip).limit(limit).all()
-    return plans
+    return query
+
+
+@router.get("/", response_model=List[HealthPlanResponse])
+def get_health_plans(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("created_at", description="排序字段，前缀 - 表示降序"),
+    estimate_total: bool = Query(False),
+    title: Optional[str] = Query(None),
+    plan_type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    is_template: Optional[bool] = Query(None),
+    is_public: Optional[bool] = Query(None),
+    created_by: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """获取健康方案列表（支持游标分页）"""
+    query = _filter_health_plans(db, current_user, title, plan_type, status, is_template, is_public, created_by)
+    return paginate(
+        db, query, response, sort_keys=PLAN_SORT_KEYS, sort=sort, id_column=HealthPlan.id,
+        cursor=cursor, skip=skip, limit=limit, estimate_total=estimate_total
+    )
+
+
+@router.get("/export")
+async def export_health_plans(
+    request: Request,
+    file_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = Query(False, description="返回gzip压缩文件"),
+    title: Optional[str] = Query(None),
+    plan_type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    is_template: Optional[bool] = Query(None),
+    is_public: Optional[bool] = Query(None),
+    created_by: Optional[int] = Query(None),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """流式导出健康方案（CSV或NDJSON），过滤条件与可见范围与列表接口相同"""
+    return export_response(
+        request, "health_plans",
+        lambda db: _filter_health_plans(db, current_user, title, plan_type, status, is_template, is_public, created_by),
+        export_columns(HealthPlan, HealthPlanResponse), HealthPlan.id, file_format, gzip
+    )
+
+
+@router.get("/search/", response_model=List[HealthPlanSearchResult])
+def search_health_plans(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """全文检索健康方案（标题、描述、目标、详细指导、适用病症），按相关度排序"""
+    # 非管理员只能检索公开的方案或自己创建的方案（在倒排表扫描时过滤）
+    from app.models.user import UserRole
+    user_id = None if current_user.role == UserRole.ADMIN else current_user.id
+    ranked = search_plans(db, q, user_id, limit)
+    if not ranked:
+        return []
+    plans = db.query(HealthPlan).filter(HealthPlan.id.in_([plan_id for plan_id, _ in ranked])).all()
+    plans_by_id = {plan.id: plan for plan in plans}
+    return [
+        HealthPlanSearchResult(**HealthPlanResponse.model_validate(plans_by_id[plan_id]).model_dump(), score=score)
+        for plan_id, score in ranked
+        if plan_id in plans_by_id
+    ]
 
 
 @router.get("/{plan_id}", response_model=HealthPlanResponse)
@@ -81,7 +143,7 @@ def get_health_plan(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """获取单个健康方案信息"""
-    plan = db.query(HealthPlan).filter(HealthPlan.id == plan_id).first()
+    plan = get_by_id(db, HealthPlan, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -109,7 +171,7 @@ def update_health_plan(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """更新健康方案"""
-    plan = db.query(HealthPlan).filter(HealthPlan.id == plan_id).first()
+    plan = get_by_id(db, HealthPlan, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -142,7 +204,7 @@ def delete_health_plan(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """删除健康方案"""
-    plan = db.query(HealthPlan).filter(HealthPlan.id == plan_id).first()
+    plan = get_by_id(db, HealthPlan, plan_id)
     if not plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,13 +220,10 @@ def delete_health_plan(
         )
     
     # 检查是否有患者正在使用此方案
-    from app.models.patient_health_plan import PatientHealthPlan, AssignmentStatus
+    from app.models.patient_health_plan import PatientHealthPlan, ACTIVE_ASSIGNMENT_STATUSES
     active_assignments = db.query(PatientHealthPlan).filter(
         PatientHealthPlan.health_plan_id == plan_id,
-        PatientHealthPlan.status.in_([
-            AssignmentStatus.ASSIGNED,
-            AssignmentStatus.IN_PROGRESS
-        ])
+        PatientHealthPlan.status.in_(ACTIVE_ASSIGNMENT_STATUSES)
     ).first()
     
     if active_assignments:
@@ -181,13 +240,17 @@ def delete_health_plan(
 
 @router.get("/templates/", response_model=List[HealthPlanResponse])
 def get_health_plan_templates(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("created_at", description="排序字段，前缀 - 表示降序"),
+    estimate_total: bool = Query(False),
     plan_type: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
-    """获取健康方案模板列表"""
+    """获取健康方案模板列表（支持游标分页）"""
     query = db.query(HealthPlan).filter(HealthPlan.is_template == True)
     
     if plan_type:
@@ -198,5 +261,7 @@ def get_health_plan_templates(
     if current_user.role != UserRole.ADMIN:
         query = query.filter(HealthPlan.is_public == True)
     
-    templates = query.offset(skip).limit(limit).all()
-    return templates
\ No newline at end of file
+    return paginate(
+        db, query, response, sort_keys=PLAN_SORT_KEYS, sort=sort, id_column=HealthPlan.id,
+        cursor=cursor, skip=skip, limit=limit, estimate_total=estimate_total
+    )
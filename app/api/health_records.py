@@ -0,0 +1,276 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.utils.deps import get_current_active_doctor, get_current_active_staff
+from app.utils.health_record_ingest import MAX_INGEST_RECORDS, ingest_records
+from app.utils.lookups import get_by_id
+from app.utils.pagination import paginate
+from app.utils.vitals_rollup import apply_rollups, choose_bucket, load_trends, refresh_rollups
+from app.models.health_record import HealthRecord
+from app.models.patient import Patient
+from app.models.patient_health_plan import PatientHealthPlan
+from app.models.user import User
+from app.models.vitals_flag import VitalsFlag, VitalsFlagType
+from app.models.vitals_rollup import VitalMetric
+from app.schemas.health_record import (
+    HealthRecordCreate, HealthRecordUpdate, HealthRecordResponse, HealthRecordIngestResult, VitalsTrend,
+    VitalsFlagResponse
+)
+
+router = APIRouter()
+
+# 列表可选的排序字段（均有索引）
+RECORD_SORT_KEYS = {"record_date": HealthRecord.record_date, "id": HealthRecord.id}
+FLAG_SORT_KEYS = {"event_date": VitalsFlag.event_date, "id": VitalsFlag.id}
+# 影响生命体征汇总的字段
+ROLLUP_FIELDS = {metric.value for metric in VitalMetric} | {"record_date"}
+RESOLUTION_UNITS = {"h": timedelta(hours=1), "d": timedelta(days=1), "w": timedelta(weeks=1)}
+
+
+def _find_by_idempotency_key(db: Session, recorded_by: int, record_data: HealthRecordCreate) -> Optional[HealthRecord]:
+    # 带 record_date 条件，PostgreSQL 分区表上只查该月分区
+    return db.query(HealthRecord).filter(
+        HealthRecord.recorded_by == recorded_by,
+        HealthRecord.idempotency_key == record_data.idempotency_key,
+        HealthRecord.record_date == record_data.record_date
+    ).first()
+
+
+@router.post("/", response_model=HealthRecordResponse)
+def create_health_record(
+    record_data: HealthRecordCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """创建健康记录（带幂等键重复提交时返回已保存的记录）"""
+    if record_data.idempotency_key:
+        existing = _find_by_idempotency_key(db, current_user.id, record_data)
+        if existing:
+            return existing
+
+    # 验证患者存在
+    if not get_by_id(db, Patient, record_data.patient_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="患者不存在"
+        )
+
+    # 验证方案分配属于该患者
+    if record_data.patient_health_plan_id is not None:
+        assignment = get_by_id(db, PatientHealthPlan, record_data.patient_health_plan_id)
+        if not assignment or assignment.patient_id != record_data.patient_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="健康方案分配不存在或不属于该患者"
+            )
+
+    db_record = HealthRecord(
+        **record_data.model_dump(),
+        recorded_by=current_user.id
+    )
+    db.add(db_record)
+    try:
+        db.flush()
+    except IntegrityError:
+        # 同一幂等键的并发重复提交
+        db.rollback()
+        return _find_by_idempotency_key(db, current_user.id, record_data)
+    apply_rollups(db.connection(), [record_data.model_dump()])
+    db.commit()
+    db.refresh(db_record)
+
+    return db_record
+
+
+@router.post("/batch", response_model=HealthRecordIngestResult)
+def ingest_health_records(
+    records: List[HealthRecordCreate] = Body(..., max_length=MAX_INGEST_RECORDS),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """批量上报健康记录（护士站与居家设备），返回新增、重复与被拒绝的数量及被拒绝记录的位置"""
+    return ingest_records(db, records, current_user.id)
+
+
+@router.get("/", response_model=List[HealthRecordResponse])
+def get_health_records(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("-record_date", description="排序字段，前缀 - 表示降序"),
+    estimate_total: bool = Query(False),
+    patient_id: Optional[int] = Query(None),
+    record_type: Optional[str] = Query(None),
+    recorded_by: Optional[int] = Query(None),
+    patient_health_plan_id: Optional[int] = Query(None),
+    record_date_from: Optional[datetime] = Query(None),
+    record_date_to: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """获取健康记录列表（支持游标分页）"""
+    query = db.query(HealthRecord)
+
+    # 应用过滤条件
+    if patient_id:
+        query = query.filter(HealthRecord.patient_id == patient_id)
+    if record_type:
+        query = query.filter(HealthRecord.record_type == record_type)
+    if recorded_by:
+        query = query.filter(HealthRecord.recorded_by == recorded_by)
+    if patient_health_plan_id:
+        query = query.filter(HealthRecord.patient_health_plan_id == patient_health_plan_id)
+    if record_date_from:
+        query = query.filter(HealthRecord.record_date >= record_date_from)
+    if record_date_to:
+        query = query.filter(HealthRecord.record_date <= record_date_to)
+
+    return paginate(
+        db, query, response, sort_keys=RECORD_SORT_KEYS, sort=sort, id_column=HealthRecord.id,
+        cursor=cursor, skip=skip, limit=limit, estimate_total=estimate_total
+    )
+
+
+@router.get("/trends", response_model=VitalsTrend)
+def get_vitals_trends(
+    patient_id: int = Query(...),
+    metric: List[VitalMetric] = Query(list(VitalMetric), description="指标，可重复指定；默认全部"),
+    start: Optional[datetime] = Query(None, description="默认为结束时间前30天"),
+    end: Optional[datetime] = Query(None, description="默认为当前时间"),
+    resolution: Optional[str] = Query(
+        None, pattern=r"^[1-9][0-9]*[hdw]$",
+        description="期望的时间分辨率，如 6h、1d、2w；取不超过它的最粗汇总粒度，未指定时按时间跨度选择"
+    ),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """获取患者生命体征趋势（读取小时/天/周汇总，并合并尚未出队累加的记录，不扫描全部原始记录）"""
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="开始时间必须早于结束时间"
+        )
+    if not get_by_id(db, Patient, patient_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="患者不存在"
+        )
+
+    width = int(resolution[:-1]) * RESOLUTION_UNITS[resolution[-1]] if resolution else None
+    bucket = choose_bucket(start, end, width)
+    metrics = list(dict.fromkeys(metric))
+    return {
+        "patient_id": patient_id,
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "metrics": load_trends(db, patient_id, metrics, bucket, start, end),
+    }
+
+
+@router.get("/flags", response_model=List[VitalsFlagResponse])
+def get_vitals_flags(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("-event_date", description="排序字段，前缀 - 表示降序"),
+    patient_id: Optional[int] = Query(None),
+    metric: Optional[VitalMetric] = Query(None),
+    flag_type: Optional[VitalsFlagType] = Query(None),
+    event_date_from: Optional[date] = Query(None),
+    event_date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """获取夜间分析生成的生命体征异常提示（支持游标分页）"""
+    query = db.query(VitalsFlag)
+    if patient_id:
+        query = query.filter(VitalsFlag.patient_id == patient_id)
+    if metric:
+        query = query.filter(VitalsFlag.metric == metric)
+    if flag_type:
+        query = query.filter(VitalsFlag.flag_type == flag_type)
+    if event_date_from:
+        query = query.filter(VitalsFlag.event_date >= event_date_from)
+    if event_date_to:
+        query = query.filter(VitalsFlag.event_date <= event_date_to)
+
+    return paginate(
+        db, query, response, sort_keys=FLAG_SORT_KEYS, sort=sort, id_column=VitalsFlag.id,
+        cursor=cursor, skip=skip, limit=limit
+    )
+
+
+@router.get("/{record_id}", response_model=HealthRecordResponse)
+def get_health_record(
+    record_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """获取单条健康记录"""
+    record = get_by_id(db, HealthRecord, record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="健康记录不存在"
+        )
+    return record
+
+
+@router.put("/{record_id}", response_model=HealthRecordResponse)
+def update_health_record(
+    record_id: int,
+    record_data: HealthRecordUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_staff)
+):
+    """更新健康记录"""
+    record = get_by_id(db, HealthRecord, record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="健康记录不存在"
+        )
+
+    previous_date = record.record_date
+    update_data = record_data.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(record, field, value)
+
+    if ROLLUP_FIELDS & update_data.keys():
+        db.flush()
+        refresh_rollups(db.connection(), record.patient_id, [previous_date, record.record_date])
+    db.commit()
+    db.refresh(record)
+
+    return record
+
+
+@router.delete("/{record_id}")
+def delete_health_record(
+    record_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """删除健康记录"""
+    record = get_by_id(db, HealthRecord, record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="健康记录不存在"
+        )
+
+    db.delete(record)
+    db.flush()
+    refresh_rollups(db.connection(), record.patient_id, [record.record_date])
+    db.commit()
+
+    return {"message": "健康记录已删除"}
@@ -1,19 +1,56 @@
+from collections import Counter
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, noload
 
 from app.core.database import get_db
 from app.utils.deps import get_current_active_doctor
-from app.models.patient_health_plan import PatientHealthPlan
+from app.utils.export import EXPORT_FORMAT_PATTERN, export_columns, export_response
+from app.utils.lookups import get_by_id
+from app.utils.pagination import paginate
+from app.utils.patient_search import filter_patients
+from app.utils.plan_assignment import (
+    BULK_ASSIGN_MAX_PATIENTS, OUTCOME_ALREADY_ASSIGNED, OUTCOME_ASSIGNED, OUTCOME_PATIENT_NOT_FOUND, bulk_assign
+)
+from app.models.patient_health_plan import PatientHealthPlan, ACTIVE_ASSIGNMENT_STATUSES
 from app.models.patient import Patient
 from app.models.health_plan import HealthPlan
 from app.models.user import User
 from app.schemas.patient_health_plan import (
-    PatientHealthPlanCreate, PatientHealthPlanUpdate, PatientHealthPlanResponse
+    PatientHealthPlanCreate, PatientHealthPlanUpdate, PatientHealthPlanResponse, PatientHealthPlanDetail,
+    PatientHealthPlanBulkCreate, PatientHealthPlanBulkResult
 )
 
 router = APIRouter()
 
+# 列表可选的排序字段（均有索引）
+ASSIGNMENT_SORT_KEYS = {"created_at": PatientHealthPlan.created_at, "id": PatientHealthPlan.id}
+
+# include 参数可选的关联对象（均为多对一，外键非空）
+ASSIGNMENT_RELATIONSHIPS = {
+    "patient": PatientHealthPlan.patient,
+    "health_plan": PatientHealthPlan.health_plan,
+    "assigned_doctor": PatientHealthPlan.assigned_doctor,
+}
+
+INCLUDE_DESCRIPTION = "附带的关联对象，逗号分隔: patient,health_plan,assigned_doctor"
+
+
+def assignment_load_options(include: Optional[str]) -> list:
+    """解析 include 参数：请求的关联对象在主查询中 JOIN 加载，未请求的不加载（响应中为null）"""
+    requested = {name.strip() for name in include.split(",") if name.strip()} if include else set()
+    unknown = requested - ASSIGNMENT_RELATIONSHIPS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的 include: {', '.join(sorted(unknown))}，可选: {', '.join(ASSIGNMENT_RELATIONSHIPS)}"
+        )
+    return [
+        joinedload(relationship, innerjoin=True) if name in requested else noload(relationship)
+        for name, relationship in ASSIGNMENT_RELATIONSHIPS.items()
+    ]
+
 
 @router.post("/", response_model=PatientHealthPlanResponse)
 def assign_health_plan_to_patient(
@@ -23,7 +60,7 @@ def assign_health_plan_to_patient(
 ):
     """为患者分配健康方案"""
     # 验证患者存在
-    patient = db.query(Patient).filter(Patient.id == assignment_data.patient_id).first()
+    patient = get_by_id(db, Patient, assignment_data.patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -31,7 +68,7 @@ def assign_health_plan_to_patient(
         )
     
     # 验证健康方案存在
-    health_plan = db.query(HealthPlan).filter(HealthPlan.id == assignment_data.health_plan_id).first()
+    health_plan = get_by_id(db, HealthPlan, assignment_data.health_plan_id)
     if not health_plan:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -42,7 +79,7 @@ def assign_health_plan_to_patient(
     existing = db.query(PatientHealthPlan).filter(
         PatientHealthPlan.patient_id == assignment_data.patient_id,
         PatientHealthPlan.health_plan_id == assignment_data.health_plan_id,
-        PatientHealthPlan.status.in_(["assigned", "in_progress"])
+        PatientHealthPlan.status.in_(ACTIVE_ASSIGNMENT_STATUSES)
     ).first()
     
     if existing:
@@ -58,27 +95,68 @@ def assign_health_plan_to_patient(
     )
     
     db.add(db_assignment)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 检查之后被并发请求抢先分配（进行中的分配有唯一索引）
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="该患者已被分配此健康方案"
+        )
     db.refresh(db_assignment)
     
     return db_assignment
 
 
-@router.get("/", response_model=List[PatientHealthPlanResponse])
-def get_patient_health_plans(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    patient_id: Optional[int] = Query(None),
-    health_plan_id: Optional[int] = Query(None),
-    assigned_by: Optional[int] = Query(None),
-    status: Optional[str] = Query(None),
+@router.post("/bulk", response_model=PatientHealthPlanBulkResult)
+def bulk_assign_health_plan(
+    bulk_data: PatientHealthPlanBulkCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
-    """获取患者健康方案分配列表"""
-    query = db.query(PatientHealthPlan)
+    """为一批患者（编号列表或患者列表的过滤条件）分配同一健康方案，返回每个患者的分配结果"""
+    if (bulk_data.patient_ids is None) == (bulk_data.patient_filter is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="patient_ids 与 patient_filter 须且只能提供一个"
+        )
+    if not get_by_id(db, HealthPlan, bulk_data.health_plan_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="健康方案不存在"
+        )
+    
+    if bulk_data.patient_ids is not None:
+        patient_ids = bulk_data.patient_ids
+    else:
+        patient_ids = filter_patients(db, **bulk_data.patient_filter.model_dump()).with_entities(
+            Patient.id
+        ).order_by(Patient.id).limit(BULK_ASSIGN_MAX_PATIENTS + 1).all()
+        patient_ids = [patient_id for patient_id, in patient_ids]
+    if len(patient_ids) > BULK_ASSIGN_MAX_PATIENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"单次最多分配 {BULK_ASSIGN_MAX_PATIENTS} 名患者"
+        )
     
-    # 应用过滤条件
+    values = bulk_data.model_dump(exclude={"health_plan_id", "patient_ids", "patient_filter"})
+    results = bulk_assign(db, bulk_data.health_plan_id, patient_ids, values, current_user.id)
+    counts = Counter(result["outcome"] for result in results)
+    return {
+        "health_plan_id": bulk_data.health_plan_id,
+        "requested": len(results),
+        "assigned": counts[OUTCOME_ASSIGNED],
+        "already_assigned": counts[OUTCOME_ALREADY_ASSIGNED],
+        "patient_not_found": counts[OUTCOME_PATIENT_NOT_FOUND],
+        "results": results,
+    }
+
+
+def _filter_assignments(db: Session, patient_id: Optional[int], health_plan_id: Optional[int],
+                        assigned_by: Optional[int], status: Optional[str]):
+    """分配列表与导出共用的过滤条件"""
+    query = db.query(PatientHealthPlan)
     if patient_id:
         query = query.filter(PatientHealthPlan.patient_id == patient_id)
     if health_plan_id:
@@ -87,19 +165,62 @@ def get_patient_health_plans(
         query = query.filter(PatientHealthPlan.assigned_by == assigned_by)
     if status:
         query = query.filter(PatientHealthPlan.status == status)
-    
-    assignments = query.offset(skip).limit(limit).all()
-    return assignments
+    return query
+
+
+@router.get("/", response_model=List[PatientHealthPlanDetail])
+def get_patient_health_plans(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("created_at", description="排序字段，前缀 - 表示降序"),
+    estimate_total: bool = Query(False),
+    patient_id: Optional[int] = Query(None),
+    health_plan_id: Optional[int] = Query(None),
+    assigned_by: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """获取患者健康方案分配列表（支持游标分页）"""
+    query = _filter_assignments(db, patient_id, health_plan_id, assigned_by, status)
+    query = query.options(*assignment_load_options(include))
+    return paginate(
+        db, query, response, sort_keys=ASSIGNMENT_SORT_KEYS, sort=sort, id_column=PatientHealthPlan.id,
+        cursor=cursor, skip=skip, limit=limit, estimate_total=estimate_total
+    )
 
 
-@router.get("/{assignment_id}", response_model=PatientHealthPlanResponse)
+@router.get("/export")
+async def export_patient_health_plans(
+    request: Request,
+    file_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = Query(False, description="返回gzip压缩文件"),
+    patient_id: Optional[int] = Query(None),
+    health_plan_id: Optional[int] = Query(None),
+    assigned_by: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """流式导出患者健康方案分配（CSV或NDJSON），过滤条件与列表接口相同"""
+    return export_response(
+        request, "patient_health_plans",
+        lambda db: _filter_assignments(db, patient_id, health_plan_id, assigned_by, status),
+        export_columns(PatientHealthPlan, PatientHealthPlanResponse), PatientHealthPlan.id, file_format, gzip
+    )
+
+
+@router.get("/{assignment_id}", response_model=PatientHealthPlanDetail)
 def get_patient_health_plan(
     assignment_id: int,
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
     """获取单个患者健康方案分配信息"""
-    assignment = db.query(PatientHealthPlan).filter(PatientHealthPlan.id == assignment_id).first()
+    assignment = get_by_id(db, PatientHealthPlan, assignment_id, assignment_load_options(include))
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -117,7 +238,7 @@ def update_patient_health_plan(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """更新患者健康方案分配信息"""
-    assignment = db.query(PatientHealthPlan).filter(PatientHealthPlan.id == assignment_id).first()
+    assignment = get_by_id(db, PatientHealthPlan, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -129,7 +250,15 @@ def update_patient_health_plan(
     for field, value in update_data.items():
         setattr(assignment, field, value)
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 恢复为进行中时，该患者已有另一条进行中的同一方案
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="该患者已被分配此健康方案"
+        )
     db.refresh(assignment)
     
     return assignment
@@ -142,7 +271,7 @@ def cancel_patient_health_plan(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """取消患者健康方案分配"""
-    assignment = db.query(PatientHealthPlan).filter(PatientHealthPlan.id == assignment_id).first()
+    assignment = get_by_id(db, PatientHealthPlan, assignment_id)
     if not assignment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -158,26 +287,35 @@ def cancel_patient_health_plan(
     return {"message": "健康方案分配已取消"}
 
 
-@router.get("/patient/{patient_id}", response_model=List[PatientHealthPlanResponse])
+@router.get("/patient/{patient_id}", response_model=List[PatientHealthPlanDetail])
 def get_health_plans_by_patient(
     patient_id: int,
-    status: Optional[str] = Query(None),
+    response: Response,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("created_at", description="排序字段，前缀 - 表示降序"),
+    include: Optional[str] = Query(None, description=INCLUDE_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
     """获取指定患者的所有健康方案"""
     # 验证患者存在
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = get_by_id(db, Patient, patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="患者不存在"
         )
     
-    query = db.query(PatientHealthPlan).filter(PatientHealthPlan.patient_id == patient_id)
+    query = db.query(PatientHealthPlan).options(*assignment_load_options(include)).filter(
+        PatientHealthPlan.patient_id == patient_id
+    )
     
-    if status:
-        query = query.filter(PatientHealthPlan.status == status)
+    if status_filter:
+        query = query.filter(PatientHealthPlan.status == status_filter)
     
-    assignments = query.all()
-    return assignments
\ No newline at end of file
+    return paginate(
+        db, query, response, sort_keys=ASSIGNMENT_SORT_KEYS, sort=sort, id_column=PatientHealthPlan.id,
+        cursor=cursor, limit=limit
+    )
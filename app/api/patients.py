@@ -1,18 +1,30 @@
+import tempfile
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
-from app.utils.deps import get_current_active_doctor
+from app.core.database import SessionLocal, get_db
+from app.utils.deps import get_current_active_admin, get_current_active_doctor
+from app.utils.lookups import get_by_id
+from app.utils.export import EXPORT_FORMAT_PATTERN, export_columns, export_response
+from app.utils.pagination import paginate
+from app.utils.patient_import import (
+    CONTENT_TYPES, IMPORT_BATCH_SIZE, IMPORT_SPOOL_MAX_BYTES, READERS, decode_lines, import_patients
+)
+from app.utils.patient_search import apply_patient_search, filter_patients
+from app.utils.pinyin import autocomplete_patients
 from app.models.patient import Patient
 from app.models.user import User
 from app.schemas.patient import (
-    PatientCreate, PatientUpdate, PatientResponse, PatientSearchParams
+    PatientCreate, PatientUpdate, PatientResponse, PatientSearchParams, PatientAutocompleteItem
 )
 
 router = APIRouter()
 
+# 列表可选的排序字段（均有索引）
+PATIENT_SORT_KEYS = {"created_at": Patient.created_at, "patient_id": Patient.patient_id, "id": Patient.id}
+
 
 @router.post("/", response_model=PatientResponse)
 def create_patient(
@@ -43,10 +55,52 @@ def create_patient(
     return db_patient
 
 
+def _import_spooled(spool, file_format: str, batch_size: int) -> dict:
+    """在独立的主库会话中导入已缓冲的上传内容"""
+    db = SessionLocal()
+    try:
+        return import_patients(db, READERS[file_format](decode_lines(spool)), batch_size).as_dict()
+    finally:
+        db.close()
+
+
+@router.post("/import")
+async def import_patients_stream(
+    request: Request,
+    file_format: Optional[str] = Query(None, alias="format", description="csv 或 ndjson，默认按 Content-Type 判断"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=10000),
+    current_user: User = Depends(get_current_active_admin)
+):
+    """批量导入患者（请求体为CSV或NDJSON），返回逐行错误报告；每批单独提交"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    file_format = file_format or CONTENT_TYPES.get(content_type)
+    if file_format not in READERS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="请求体应为CSV（text/csv）或NDJSON（application/x-ndjson）"
+        )
+    # 上传内容先缓冲（超过上限后落盘），再在线程池中逐行解析与导入，内存占用有上限
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            return await run_in_threadpool(_import_spooled, spool, file_format, batch_size)
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="文件编码应为UTF-8（解码失败之前的批次已导入）"
+            )
+
+
 @router.get("/", response_model=List[PatientResponse])
 def get_patients(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    sort: str = Query("created_at", description="排序字段，前缀 - 表示降序"),
+    estimate_total: bool = Query(False),
     name: Optional[str] = Query(None),
     patient_id: Optional[str] = Query(None),
     phone: Optional[str] = Query(None),
@@ -55,23 +109,43 @@ def get_patients(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_doctor)
 ):
-    """获取患者列表"""
-    query = db.query(Patient)
-    
-    # 应用过滤条件
-    if name:
-        query = query.filter(Patient.name.ilike(f"%{name}%"))
-    if patient_id:
-        query = query.filter(Patient.patient_id.ilike(f"%{patient_id}%"))
-    if phone:
-        query = query.filter(Patient.phone.ilike(f"%{phone}%"))
-    if id_card:
-        query = query.filter(Patient.id_card.ilike(f"%{id_card}%"))
-    if is_active is not None:
-        query = query.filter(Patient.is_active == is_active)
-    
-    patients = query.offset(skip).limit(limit).all()
-    return patients
+    """获取患者列表（支持游标分页）"""
+    query = filter_patients(db, name, patient_id, phone, id_card, is_active)
+    return paginate(
+        db, query, response, sort_keys=PATIENT_SORT_KEYS, sort=sort, id_column=Patient.id,
+        cursor=cursor, skip=skip, limit=limit, estimate_total=estimate_total
+    )
+
+
+@router.get("/export")
+async def export_patients(
+    request: Request,
+    file_format: str = Query("csv", alias="format", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = Query(False, description="返回gzip压缩文件"),
+    name: Optional[str] = Query(None),
+    patient_id: Optional[str] = Query(None),
+    phone: Optional[str] = Query(None),
+    id_card: Optional[str] = Query(None),
+    is_active: Optional[bool] = Query(True),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """流式导出患者（CSV或NDJSON），过滤条件与列表接口相同"""
+    return export_response(
+        request, "patients",
+        lambda db: filter_patients(db, name, patient_id, phone, id_card, is_active),
+        export_columns(Patient, PatientResponse), Patient.id, file_format, gzip
+    )
+
+
+@router.get("/autocomplete/", response_model=List[PatientAutocompleteItem])
+def autocomplete_patient_names(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_doctor)
+):
+    """患者姓名自动补全（支持汉字、全拼与拼音首字母前缀，如"张"、"zhangs"、"zs"）"""
+    return autocomplete_patients(db, q, limit)
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
@@ -81,7 +155,7 @@ def get_patient(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """获取单个患者信息"""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = get_by_id(db, Patient, patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -99,7 +173,7 @@ def update_patient(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """更新患者信息"""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = get_by_id(db, Patient, patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,7 +210,7 @@ def delete_patient(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """删除患者（软删除）"""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = get_by_id(db, Patient, patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -157,14 +231,8 @@ def search_patients(
     current_user: User = Depends(get_current_active_doctor)
 ):
     """搜索患者（按姓名、患者编号、电话或身份证号）"""
-    patients = db.query(Patient).filter(
-        or_(
-            Patient.name.ilike(f"%{query}%"),
-            Patient.patient_id.ilike(f"%{query}%"),
-            Patient.phone.ilike(f"%{query}%"),
-            Patient.id_card.ilike(f"%{query}%")
-        ),
-        Patient.is_active == True
+    patients = apply_patient_search(
+        db.query(Patient).filter(Patient.is_active.is_(True)), db, query
     ).limit(limit).all()
     
     return patients
\ No newline at end of file
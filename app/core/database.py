@@ -1,18 +1,141 @@
+from typing import Any, Callable
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
 from app.core.config import settings
+from app.core.db_routing import READ_METHODS, read_router, request_subject
+from app.core.pool_metrics import PoolMetrics, instrumented_pool_class, register_engine
+from app.core.slow_queries import slow_query_log
+from app.core.statement_cache import register_statement_cache
 
-engine = create_engine(settings.database_url)
+
+def _engine_options(url: str, metrics: PoolMetrics, is_async: bool = False) -> dict:
+    """根据配置生成连接池参数（内存SQLite使用单连接池，不适用）"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        return {}
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return {
+        "poolclass": instrumented_pool_class(base, metrics),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def _create_engine(name: str, url: str):
+    metrics = PoolMetrics(name)
+    sync_engine = create_engine(url, **_engine_options(url, metrics))
+    register_engine(name, sync_engine, metrics)
+    register_statement_cache(name, sync_engine)
+    slow_query_log.attach(sync_engine, name)
+    return sync_engine
+
+
+def _create_async_engine(name: str, url: str, explain_engine):
+    """创建异步引擎；慢查询的执行计划在对应的同步引擎 explain_engine 上采集"""
+    metrics = PoolMetrics(name)
+    engine_ = create_async_engine(url, **_engine_options(url, metrics, is_async=True))
+    register_engine(name, engine_.sync_engine, metrics)
+    register_statement_cache(name, engine_.sync_engine)
+    slow_query_log.attach(engine_.sync_engine, name, explain_engine)
+    return engine_
+
+
+engine = _create_engine("primary", settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 只读副本
+replica_engines = [
+    _create_engine(f"replica_{index}", url)
+    for index, url in enumerate(settings.database_replica_urls)
+]
+ReplicaSessionLocals = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    for replica_engine in replica_engines
+]
+
 Base = declarative_base()
 
 
-def get_db():
-    """获取数据库会话"""
-    db = SessionLocal()
+def _async_database_url(url: str) -> str:
+    """将同步数据库URL转换为对应的异步驱动URL"""
+    for sync_prefix, async_prefix in (
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+        ("sqlite://", "sqlite+aiosqlite://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+# 异步模式：仅在启用时创建异步引擎（需要asyncpg或aiosqlite驱动）
+async_engine = None
+AsyncSessionLocal = None
+async_replica_engines = []
+AsyncReplicaSessionLocals = []
+if settings.db_async:
+    async_engine = _create_async_engine(
+        "primary_async",
+        settings.async_database_url or _async_database_url(settings.database_url),
+        engine,
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    async_replica_engines = [
+        _create_async_engine(f"replica_{index}_async", _async_database_url(url), replica_engines[index])
+        for index, url in enumerate(settings.database_replica_urls)
+    ]
+    AsyncReplicaSessionLocals = [
+        async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+        for replica_engine in async_replica_engines
+    ]
+
+
+def get_db(request: Request):
+    """获取数据库会话（只读请求路由到副本，写请求使用主库）"""
+    replica = read_router.route(request)
+    db = SessionLocal() if replica is None else ReplicaSessionLocals[replica]()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        if request.method not in READ_METHODS:
+            # 写入完成后重新计时粘滞窗口
+            read_router.record_write(request_subject(request))
+
+
+async def get_async_db(request: Request):
+    """获取异步数据库会话（路由规则与get_db相同）"""
+    replica = read_router.route(request)
+    factory = AsyncSessionLocal if replica is None else AsyncReplicaSessionLocals[replica]
+    try:
+        async with factory() as db:
+            yield db
+    finally:
+        if request.method not in READ_METHODS:
+            read_router.record_write(request_subject(request))
+
+
+async def dispose_engines() -> None:
+    """释放所有引擎的连接池"""
+    for async_engine_ in ([async_engine] if async_engine is not None else []) + async_replica_engines:
+        await async_engine_.dispose()
+    for sync_engine in [engine] + replica_engines:
+        sync_engine.dispose()
+
+
+async def run_in_session(db, fn: Callable[..., Any], *args: Any) -> Any:
+    """在会话上执行同步ORM代码：异步会话通过greenlet执行，不占用线程；同步会话放入线程池"""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
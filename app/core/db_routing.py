@@ -0,0 +1,140 @@
+import itertools
+import math
+import threading
+import time
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import verify_token
+
+# 只读请求方法，其余方法视为写请求
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# 写请求响应中下发的粘滞截止时间（Unix时间戳），客户端带回后读请求走主库；
+# 浏览器通过Cookie自动带回，不保存Cookie的客户端可将响应头原样放入请求头
+STICKY_COOKIE = "primary_until"
+STICKY_HEADER = "X-Primary-Until"
+
+
+def request_subject(request: Request) -> Optional[str]:
+    """从认证头中解析用户标识（令牌校验有缓存，开销很小）"""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = verify_token(token)
+    if not payload:
+        return None
+    return str(payload.get("uid") or payload.get("sub"))
+
+
+class ReadRouter:
+    """读写分离路由：只读请求轮询分配到副本，用户写入后的短时间内读请求仍走主库
+
+    粘滞窗口有两个来源：
+    - 客户端带回的 primary_until Cookie 或 X-Primary-Until 请求头（由 ReadAfterWriteMiddleware 在写请求
+      的响应中下发）。标记保存在客户端，多worker、多实例部署时任一进程都能识别；
+      各实例之间需要时钟同步。
+    - 本进程最近写入过的用户（按令牌中的用户标识）。仅对同一worker生效，作为不带回标记的客户端的兜底。
+    """
+
+    def __init__(self, replica_count: int, sticky_seconds: float):
+        self.replica_count = replica_count
+        self.sticky_seconds = sticky_seconds
+        self._next_replica = itertools.cycle(range(replica_count)) if replica_count else None
+        self._recent_writers = TTLCache(max_size=100000, ttl_seconds=sticky_seconds)
+        self._lock = threading.Lock()
+        self.counters = {
+            "primary_writes": 0,
+            "primary_reads_sticky": 0,
+            "primary_reads_no_replica": 0,
+            "replica_reads": [0] * replica_count,
+        }
+
+    def _count(self, key: str, index: Optional[int] = None) -> None:
+        with self._lock:
+            if index is None:
+                self.counters[key] += 1
+            else:
+                self.counters[key][index] += 1
+
+    def route(self, request: Request) -> Optional[int]:
+        """返回副本序号，None表示使用主库"""
+        subject = request_subject(request)
+        if request.method not in READ_METHODS:
+            self.record_write(subject)
+            self._count("primary_writes")
+            return None
+        if not self.replica_count:
+            self._count("primary_reads_no_replica")
+            return None
+        if self.client_sticky(request) or (subject is not None and self._recent_writers.get(subject)):
+            self._count("primary_reads_sticky")
+            return None
+        with self._lock:
+            index = next(self._next_replica)
+        self._count("replica_reads", index)
+        return index
+
+    def client_sticky(self, request: Request) -> bool:
+        """客户端带回的粘滞截止时间是否仍有效（超过一个窗口的截止时间视为伪造，忽略）"""
+        value = request.cookies.get(STICKY_COOKIE) or request.headers.get(STICKY_HEADER)
+        if not value:
+            return False
+        try:
+            until = float(value)
+        except ValueError:
+            return False
+        now = time.time()
+        return now < until <= now + self.sticky_seconds + 1
+
+    def sticky_marker(self) -> str:
+        """写请求响应中下发的粘滞截止时间"""
+        return f"{time.time() + self.sticky_seconds:.3f}"
+
+    def record_write(self, subject: Optional[str]) -> None:
+        """记录用户写入时间，开启读主库的粘滞窗口"""
+        if subject is not None:
+            self._recent_writers.set(subject, True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "replica_count": self.replica_count,
+                "sticky_seconds": self.sticky_seconds,
+                "primary_writes": self.counters["primary_writes"],
+                "primary_reads_sticky": self.counters["primary_reads_sticky"],
+                "primary_reads_no_replica": self.counters["primary_reads_no_replica"],
+                "replica_reads": list(self.counters["replica_reads"]),
+            }
+
+
+class ReadAfterWriteMiddleware:
+    """在写请求的响应中下发粘滞截止时间（Cookie与响应头），使后续读请求在任一worker上都走主库"""
+
+    def __init__(self, app, router: "ReadRouter"):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start":
+                until = self.router.sticky_marker()
+                max_age = math.ceil(self.router.sticky_seconds)
+                headers = MutableHeaders(scope=message)
+                headers.append(STICKY_HEADER, until)
+                headers.append("Set-Cookie", f"{STICKY_COOKIE}={until}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax")
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
+
+
+read_router = ReadRouter(len(settings.database_replica_urls), settings.replica_sticky_seconds)
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.config import settings
+
+
+class ExecutorSaturated(Exception):
+    """执行器排队已满，拒绝新的任务"""
+
+
+class BoundedExecutor:
+    """固定大小、带排队上限的线程池，用于隔离CPU密集型任务"""
+
+    def __init__(self, max_workers: int, max_queue: int, name: str):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """提交任务并等待结果；运行中与排队的任务超过上限时立即抛出ExecutorSaturated"""
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated()
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        """执行器统计信息"""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+# 密码哈希专用线程池，避免bcrypt占满默认线程池
+password_executor = BoundedExecutor(
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    name="password-hash",
+)
@@ -0,0 +1,55 @@
+import bisect
+import threading
+from typing import Sequence
+
+# 默认耗时分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """固定分桶的耗时直方图"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, pct: float) -> float:
+        """按分桶上界估算百分位数"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = self.count * pct / 100.0
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= target:
+                    return self.buckets[index] if index < len(self.buckets) else self.max
+            return self.max
+
+    def snapshot(self) -> dict:
+        """导出直方图（分桶为累计计数，单位秒）"""
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, bucket_count in zip(self.buckets, self._counts):
+                cumulative += bucket_count
+                buckets[f"le_{bound}"] = cumulative
+            buckets["le_inf"] = self.count
+            return {
+                "count": self.count,
+                "sum": round(self.total, 6),
+                "max": round(self.max, 6),
+                "buckets": buckets,
+            }
@@ -0,0 +1,147 @@
+"""
+健康记录按月分区（PostgreSQL）
+
+- health_records 在 PostgreSQL 上是按 record_date 范围分区的分区表（迁移 20261017_1300 转换），
+  每个UTC自然月一个分区 health_records_YYYY_MM，另有默认分区 health_records_default 兜底，
+  超出已建分区范围的记录不会写入失败
+- 查询带 record_date 条件时由 PostgreSQL 裁剪分区，ORM 查询无需改写
+- 启动预热与 scripts/health_record_partitions.py 提前创建未来月份的分区；默认分区中已有
+  落在新分区月份的记录时，先移入新分区再挂载
+- 整月数据的归档与删除通过分离（DETACH）/删除分区完成，耗时与该月记录数无关
+- SQLite 等其他数据库不分区，仍为单表：创建与分离分区为空操作，删除某月记录退化为 DELETE
+"""
+import datetime
+import re
+from typing import List, Optional
+
+from sqlalchemy import DateTime, column, delete, table, text
+from sqlalchemy.engine import Connection
+
+PARTITIONED_TABLE = "health_records"
+DEFAULT_PARTITION = "health_records_default"
+PARTITION_NAME_PATTERN = re.compile(r"^health_records_(\d{4})_(\d{2})$")
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    """所在月份的第一天"""
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month: datetime.date, count: int) -> datetime.date:
+    """月份加减（month 为月初日期）"""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def parse_month(value: str) -> datetime.date:
+    """解析 YYYY-MM 形式的月份"""
+    return datetime.datetime.strptime(value, "%Y-%m").date()
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{PARTITIONED_TABLE}_{month.year:04d}_{month.month:02d}"
+
+
+def is_partition_table(name: str) -> bool:
+    """是否为健康记录的分区表（迁移自动生成时据此跳过，它们不在模型中）"""
+    return name == DEFAULT_PARTITION or PARTITION_NAME_PATTERN.match(name) is not None
+
+
+def _bounds(month: datetime.date):
+    """分区范围 [月初, 下月初)，按UTC计算"""
+    return f"{month.isoformat()} 00:00:00+00", f"{add_months(month, 1).isoformat()} 00:00:00+00"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """health_records 是否为分区表（仅 PostgreSQL 且已执行分区迁移）"""
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+    ), {"table": PARTITIONED_TABLE}).scalar() is not None
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    """已有的月份分区名（按月份排序，不含默认分区）"""
+    if not is_partitioned(connection):
+        return []
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:table)"
+    ), {"table": PARTITIONED_TABLE}).scalars()
+    return sorted(name for name in names if PARTITION_NAME_PATTERN.match(name))
+
+
+def create_partition(connection: Connection, month: datetime.date) -> bool:
+    """创建某月的分区，已存在时返回 False；默认分区中该月的记录随之移入新分区"""
+    name = partition_name(month)
+    if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    lower, upper = _bounds(month)
+    in_range = {"lower": lower, "upper": upper}
+    stray = connection.execute(text(
+        f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE record_date >= :lower AND record_date < :upper LIMIT 1"
+    ), in_range).scalar()
+    if stray is None:
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARTITIONED_TABLE} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        return True
+    # 默认分区已有该月记录时不能直接创建分区：先建独立表并移入记录，再挂载
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    connection.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE record_date >= :lower AND record_date < :upper RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), in_range)
+    connection.execute(text(
+        f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    return True
+
+
+def ensure_partitions(connection: Connection, months_ahead: int,
+                      today: Optional[datetime.date] = None) -> List[str]:
+    """确保当月及之后 months_ahead 个月的分区存在，返回新建的分区名"""
+    if not is_partitioned(connection):
+        return []
+    current = month_start(today or datetime.datetime.now(datetime.timezone.utc).date())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_partition(connection, month):
+            created.append(partition_name(month))
+    return created
+
+
+def detach_partition(connection: Connection, month: datetime.date) -> bool:
+    """将某月分区从 health_records 分离为独立表（数据保留，可归档后删除），不存在时返回 False"""
+    name = partition_name(month)
+    if name not in list_partitions(connection):
+        return False
+    connection.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+    return True
+
+
+def drop_month(connection: Connection, month: datetime.date) -> int:
+    """删除某月的全部健康记录
+
+    分区表上分离并删除该月分区（耗时与记录数无关），返回 -1；
+    未分区时按 record_date 范围 DELETE，返回删除的记录数。
+    """
+    if is_partitioned(connection):
+        name = partition_name(month)
+        if name in list_partitions(connection):
+            connection.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+            connection.execute(text(f"DROP TABLE {name}"))
+        return -1
+    records = table(PARTITIONED_TABLE, column("record_date", DateTime(timezone=True)))
+    lower = datetime.datetime.combine(month, datetime.time())
+    upper = datetime.datetime.combine(add_months(month, 1), datetime.time())
+    return connection.execute(
+        delete(records).where(records.c.record_date >= lower, records.c.record_date < upper)
+    ).rowcount
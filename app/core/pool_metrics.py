@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from app.core.metrics import Histogram
+
+
+class PoolMetrics:
+    """连接池指标：通过连接池事件统计签出/归还，并记录获取连接的等待时间"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wait_time = Histogram()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+
+    def _incr(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def attach(self, engine: Engine) -> None:
+        """在引擎的连接池上注册事件"""
+        event.listen(engine, "checkout", lambda *args: self._incr("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self._incr("checkins"))
+        event.listen(engine, "connect", lambda *args: self._incr("connects"))
+        event.listen(engine, "invalidate", lambda *args: self._incr("invalidations"))
+
+    def snapshot(self, pool: Pool) -> dict:
+        """当前连接池状态与累计指标"""
+        status = {"pool_class": type(pool).__name__}
+        if hasattr(pool, "checkedout"):
+            status.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow_in_use": max(0, pool.overflow()),
+                "max_overflow": getattr(pool, "_max_overflow", None),
+            })
+        return {
+            "name": self.name,
+            **status,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "checkout_timeouts": self.timeouts,
+            "wait_time": self.wait_time.snapshot(),
+            "wait_time_p99": self.wait_time.percentile(99),
+        }
+
+
+def instrumented_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """生成记录等待时间与超时次数的连接池子类（池重建时沿用同一子类）"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return base._do_get(self)
+        except exc.TimeoutError:
+            metrics._incr("timeouts")
+            raise
+        finally:
+            metrics.wait_time.observe(time.perf_counter() - started)
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+# 已注册的引擎，供管理端点导出指标
+registered_pools: Dict[str, tuple] = {}
+
+
+def register_engine(name: str, engine: Engine, metrics: PoolMetrics) -> None:
+    metrics.attach(engine)
+    registered_pools[name] = (engine, metrics)
+
+
+def pool_snapshots() -> list:
+    return [metrics.snapshot(engine.pool) for engine, metrics in registered_pools.values()]
@@ -0,0 +1,154 @@
+"""
+SQL执行统计：按请求统计SQL语句条数与数据库耗时，并检测疑似N+1查询
+
+- 通过引擎的 before/after_cursor_execute 事件计数（对所有引擎生效，包括只读副本与异步引擎），
+  执行失败的语句由 handle_error 事件计数
+- 当前请求的统计对象保存在 contextvars 中，线程池与异步会话中执行的语句都会计入发起它的请求
+- 中间件在响应头 Server-Timing 中返回 SQL 条数与耗时，并写入日志；
+  同一请求中同一条语句（参数不同）执行次数达到阈值时记录为疑似N+1查询
+- capture_queries / assert_max_queries 供测试与检查脚本统计一段代码执行的SQL条数
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+_captures: List["QueryStats"] = []
+_captures_lock = threading.Lock()
+
+
+class QueryStats:
+    """一次请求（或一段代码）执行的SQL统计"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.duration += elapsed
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """执行次数达到阈值的语句（疑似N+1）"""
+        return [(statement, count) for statement, count in self.statements.items() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+def _active_stats() -> List[QueryStats]:
+    stats = _current_stats.get()
+    active = [stats] if stats is not None else []
+    if _captures:
+        with _captures_lock:
+            active.extend(_captures)
+    return active
+
+
+def _record(context, statement: str) -> None:
+    started = getattr(context, "_query_stats_started", None)
+    if started is None:
+        return
+    context._query_stats_started = None
+    elapsed = time.perf_counter() - started
+    for stats in _active_stats():
+        stats.record(statement, elapsed)
+
+
+# 开始时间保存在语句的执行上下文上（随语句结束释放），不保存在连接池中长期存在的连接上
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(context, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    """执行失败的语句（如违反唯一约束）同样计数，after_cursor_execute 不会触发"""
+    if exception_context.execution_context is not None and exception_context.statement is not None:
+        _record(exception_context.execution_context, exception_context.statement)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """统计代码块执行期间的所有SQL（包括TestClient在其他线程中处理的请求）"""
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """断言代码块执行的SQL不超过 limit 条，例如:
+
+        with assert_max_queries(6):
+            client.post("/api/patient-health-plans/", json=data, headers=headers)
+    """
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        executed = "\n".join(f"  [{count}次] {statement}" for statement, count in stats.statements.items())
+        raise AssertionError(f"执行了 {stats.count} 条SQL，超过上限 {limit}:\n{executed}")
+
+
+class QueryStatsMiddleware:
+    """按请求统计SQL条数与耗时（纯ASGI中间件，不缓冲响应体）"""
+
+    def __init__(self, app, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, status_code, stats, time.perf_counter() - started)
+
+    def _log(self, scope, status_code: int, stats: QueryStats, elapsed: float) -> None:
+        method, path = scope["method"], scope["path"]
+        logger.info("%s %s %d: %d条SQL, 数据库耗时 %.1fms, 总耗时 %.1fms",
+                    method, path, status_code, stats.count, stats.duration * 1000, elapsed * 1000)
+        for statement, count in stats.repeated(self.n_plus_one_threshold):
+            logger.warning("疑似N+1查询: %s %s 中同一语句执行了 %d 次: %s",
+                           method, path, count, " ".join(statement.split())[:300])
@@ -0,0 +1,257 @@
+import abc
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """布隆过滤器：不存在的元素可在常数时间内确定排除"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationStore(abc.ABC):
+    """吊销令牌存储接口
+
+    每条吊销记录带有单调递增的序号（按提交顺序分配），其他worker按序号游标增量同步；
+    不使用吊销时间，避免较早取得时间戳、较晚提交的记录被跳过。
+    """
+
+    @abc.abstractmethod
+    def add(self, jti: str, expires_at: float) -> None:
+        """记录吊销的令牌，expires_at 为令牌过期时间"""
+
+    @abc.abstractmethod
+    def contains(self, jti: str) -> bool:
+        """令牌是否已被吊销"""
+
+    @abc.abstractmethod
+    def entries_since(self, after_seq: int) -> List[Tuple[str, int]]:
+        """返回序号大于 after_seq 的(jti, 序号)"""
+
+    @abc.abstractmethod
+    def purge_expired(self, now: float) -> int:
+        """删除已过期的吊销记录，返回删除数量"""
+
+
+class MemoryRevocationStore(RevocationStore):
+    """进程内存储，仅适用于单进程或开发环境"""
+
+    def __init__(self):
+        self._entries = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._seq += 1
+            self._entries[jti] = (expires_at, self._seq)
+
+    def contains(self, jti: str) -> bool:
+        with self._lock:
+            return jti in self._entries
+
+    def entries_since(self, after_seq: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return [(jti, seq) for jti, (_, seq) in self._entries.items() if seq > after_seq]
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [jti for jti, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for jti in expired:
+                del self._entries[jti]
+            return len(expired)
+
+
+class SQLiteRevocationStore(RevocationStore):
+    """基于SQLite文件的存储，同一主机上的多个worker可共享
+
+    序号为 AUTOINCREMENT 主键：SQLite的写入串行执行，序号在持有写锁时分配，提交顺序与序号顺序一致。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """每个线程一个连接，首次连接时建表（旧版本按吊销时间同步的表迁移为带序号的表）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            with conn:
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(revoked_tokens)")]
+                if columns and "seq" not in columns:
+                    conn.execute("DROP INDEX IF EXISTS ix_revoked_tokens_revoked_at")
+                    conn.execute("ALTER TABLE revoked_tokens RENAME TO revoked_tokens_old")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+                    "seq INTEGER PRIMARY KEY AUTOINCREMENT, jti TEXT NOT NULL UNIQUE, "
+                    "expires_at REAL NOT NULL, revoked_at REAL NOT NULL)"
+                )
+                if columns and "seq" not in columns:
+                    conn.execute(
+                        "INSERT INTO revoked_tokens (jti, expires_at, revoked_at) "
+                        "SELECT jti, expires_at, revoked_at FROM revoked_tokens_old ORDER BY revoked_at"
+                    )
+                    conn.execute("DROP TABLE revoked_tokens_old")
+            self._local.conn = conn
+        return conn
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO revoked_tokens (jti, expires_at, revoked_at) VALUES (?, ?, ?)",
+                (jti, expires_at, time.time()),
+            )
+
+    def contains(self, jti: str) -> bool:
+        row = self._connect().execute(
+            "SELECT 1 FROM revoked_tokens WHERE jti = ?", (jti,)
+        ).fetchone()
+        return row is not None
+
+    def entries_since(self, after_seq: int) -> List[Tuple[str, int]]:
+        return self._connect().execute(
+            "SELECT jti, seq FROM revoked_tokens WHERE seq > ? ORDER BY seq", (after_seq,)
+        ).fetchall()
+
+    def purge_expired(self, now: float) -> int:
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)).rowcount
+
+
+class RevocationList:
+    """令牌吊销列表：先查布隆过滤器，仅在可能命中时访问存储
+
+    同步其他worker的吊销记录与清理过期记录由后台线程定期执行（load() 时启动），
+    未命中过滤器的检查不访问存储；未启动后台线程时（如脚本中）由一个请求线程同步，其他线程不等待。
+    """
+
+    def __init__(self, store: RevocationStore, capacity: int, error_rate: float,
+                 refresh_seconds: float):
+        self.store = store
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._synced_seq = 0
+        self._next_refresh = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        self.bloom_negatives = 0
+        self.store_lookups = 0
+
+    def _sync(self, rebuild: bool = False) -> None:
+        """同步其他worker写入的吊销记录；清理过期记录后重建过滤器（调用方持有 _refresh_lock）"""
+        if self.store.purge_expired(time.time()):
+            rebuild = True
+        synced_seq = 0 if rebuild else self._synced_seq
+        # 持有 _lock 读取：读取之后才提交的本进程吊销在替换过滤器之后加入，不会丢失
+        with self._lock:
+            entries = self.store.entries_since(synced_seq)
+            if rebuild:
+                self._bloom = BloomFilter(self.capacity, self.error_rate)
+            for jti, seq in entries:
+                self._bloom.add(jti)
+                synced_seq = max(synced_seq, seq)
+            self._synced_seq = synced_seq
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+
+    def _refresh(self, rebuild: bool = False) -> None:
+        with self._refresh_lock:
+            self._sync(rebuild)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_seconds):
+            try:
+                self._refresh()
+            except Exception:
+                logger.exception("同步令牌吊销记录失败")
+
+    def load(self) -> None:
+        """从存储加载全部吊销记录并启动后台同步线程（启动预热时调用，未调用时首次检查会自动加载）"""
+        self._refresh(rebuild=True)
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="revocation-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台同步线程"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """吊销令牌"""
+        self.store.add(jti, expires_at)
+        with self._lock:
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti: str) -> bool:
+        """判断令牌是否已吊销"""
+        if self._thread is None and time.monotonic() >= self._next_refresh \
+                and self._refresh_lock.acquire(blocking=False):
+            # 只由一个线程同步，其余线程使用当前的过滤器
+            try:
+                if time.monotonic() >= self._next_refresh:
+                    self._sync()
+            finally:
+                self._refresh_lock.release()
+        if jti not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+        self.store_lookups += 1
+        return self.store.contains(jti)
+
+    def stats(self) -> dict:
+        """吊销检查统计信息"""
+        return {
+            "bloom_bits": self._bloom.size,
+            "bloom_hashes": self._bloom.hash_count,
+            "bloom_negatives": self.bloom_negatives,
+            "store_lookups": self.store_lookups,
+            "synced_seq": self._synced_seq,
+        }
+
+
+def _build_store() -> RevocationStore:
+    if settings.revocation_store == "sqlite":
+        return SQLiteRevocationStore(settings.revocation_sqlite_path)
+    return MemoryRevocationStore()
+
+
+revocation_list = RevocationList(
+    _build_store(),
+    capacity=settings.revocation_bloom_capacity,
+    error_rate=settings.revocation_bloom_error_rate,
+    refresh_seconds=settings.revocation_refresh_seconds,
+)
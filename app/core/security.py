@@ -1,10 +1,22 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.revocation import revocation_list
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 固定bcrypt成本，成本配置变更后旧哈希会被标记为需要更新
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -12,6 +24,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """验证密码，若哈希成本已过期则同时返回新的哈希"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """生成密码哈希"""
     return pwd_context.hash(password)
@@ -24,15 +41,46 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
 
+# 已验证令牌缓存，键为令牌摘要，避免重复的签名校验和JSON解析
+token_cache = TTLCache(
+    max_size=settings.token_cache_max_size,
+    ttl_seconds=settings.token_cache_ttl_seconds,
+)
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
 def verify_token(token: str):
     """验证令牌"""
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
-    except JWTError:
-        return None
\ No newline at end of file
+    digest = _token_digest(token)
+    payload = token_cache.get(digest)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        except JWTError:
+            return None
+        # 缓存有效期不超过令牌本身的过期时间
+        remaining = payload.get("exp", 0) - time.time()
+        token_cache.set(digest, payload, min(settings.token_cache_ttl_seconds, remaining))
+    elif payload.get("exp", 0) <= time.time():
+        token_cache.delete(digest)
+        return None
+    
+    jti = payload.get("jti")
+    if jti and revocation_list.is_revoked(jti):
+        return None
+    return dict(payload)
+
+
+def revoke_token(payload: dict) -> None:
+    """吊销令牌，使其在过期前即失效"""
+    jti = payload.get("jti")
+    if jti:
+        revocation_list.revoke(jti, payload.get("exp", time.time()))
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+慢查询日志：记录超过阈值的SQL，按语句指纹聚合并采样执行计划
+
+- 引擎的 before/after_cursor_execute 事件计时，未超过阈值时只有两次计时与一次比较的开销
+- 超过阈值的语句去掉字面量、合并 IN 列表后作为指纹，按指纹统计次数、总耗时、最大耗时与p95（最近样本）
+- 执行计划由后台线程在独立连接上采集（PostgreSQL为EXPLAIN，SQLite为EXPLAIN QUERY PLAN），
+  同一指纹在 slow_query_explain_interval 秒内只采集一次，不占用请求线程
+"""
+import hashlib
+import logging
+import queue
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|\$\d+|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+# 每个指纹保留的最近耗时样本数（用于计算p95）
+RECENT_SAMPLES = 200
+
+
+def fingerprint(statement: str) -> str:
+    """语句归一化：字面量替换为 ?，IN 列表合并为 (...)，空白压缩"""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER_LIST.sub("(...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class _SlowStatement:
+    """同一指纹的慢查询统计"""
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.fingerprint_id = hashlib.sha1(statement.encode()).hexdigest()[:12]
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.last_seen = 0.0
+        self.engine = None
+        self.plan: Optional[List[str]] = None
+        self.plan_captured_at: Optional[float] = None
+        self.explain_requested_at = 0.0
+
+    def p95(self) -> float:
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint_id,
+            "statement": self.statement,
+            "engine": self.engine,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p95_ms": round(self.p95() * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "last_seen": self.last_seen,
+            "plan": self.plan,
+            "plan_captured_at": self.plan_captured_at,
+        }
+
+
+class SlowQueryLog:
+    """慢查询聚合与执行计划采集"""
+
+    def __init__(self, threshold_seconds: float, max_fingerprints: int = 500,
+                 explain: bool = True, explain_interval: float = 300.0):
+        self.threshold = threshold_seconds
+        self.max_fingerprints = max_fingerprints
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self._entries: Dict[str, _SlowStatement] = {}
+        self._lock = threading.Lock()
+        self._explain_queue: "queue.Queue" = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+        self.explain_dropped = 0
+        self.explain_failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def attach(self, engine: Engine, name: str, explain_engine: Optional[Engine] = None) -> None:
+        """在引擎上注册计时事件；explain_engine 为采集执行计划使用的同步引擎（默认即 engine）"""
+        if not self.enabled:
+            return
+        explain_engine = explain_engine or engine
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._slow_query_started = time.perf_counter()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = getattr(context, "_slow_query_started", None)
+            if started is None:
+                return
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold and context.execution_options.get("slow_query_log", True):
+                # 异步驱动与同步驱动的参数格式不同时无法在同步连接上重放，只记录不采集执行计划
+                replayable = not executemany and conn.dialect.paramstyle == explain_engine.dialect.paramstyle
+                self.record(name, statement, parameters if replayable else None, elapsed,
+                            explain_engine if replayable else None)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    def record(self, name: str, statement: str, parameters, elapsed: float,
+               explain_engine: Optional[Engine] = None) -> None:
+        key = fingerprint(statement)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    # 淘汰累计耗时最少的指纹
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k].total)]
+                entry = self._entries[key] = _SlowStatement(key)
+            entry.engine = name
+            entry.count += 1
+            entry.total += elapsed
+            entry.max = max(entry.max, elapsed)
+            entry.recent.append(elapsed)
+            entry.last_seen = now
+            request_explain = (
+                self.explain and explain_engine is not None and _EXPLAINABLE.match(statement)
+                and now - entry.explain_requested_at >= self.explain_interval
+            )
+            if request_explain:
+                entry.explain_requested_at = now
+        logger.warning("慢查询 %.1fms [%s] %s", elapsed * 1000, entry.fingerprint_id, key[:300])
+        if request_explain:
+            self._enqueue_explain(entry, explain_engine, statement, parameters)
+
+    def _enqueue_explain(self, entry: _SlowStatement, explain_engine: Engine, statement: str, parameters) -> None:
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._explain_loop, name="slow-query-explain", daemon=True)
+                    self._worker.start()
+        try:
+            self._explain_queue.put_nowait((entry, explain_engine, statement, parameters))
+        except queue.Full:
+            self.explain_dropped += 1
+
+    def _explain_loop(self) -> None:
+        while True:
+            entry, explain_engine, statement, parameters = self._explain_queue.get()
+            try:
+                plan = explain(explain_engine, statement, parameters)
+            except Exception:
+                self.explain_failures += 1
+                logger.exception("采集慢查询执行计划失败 [%s]", entry.fingerprint_id)
+                continue
+            with self._lock:
+                entry.plan = plan
+                entry.plan_captured_at = time.time()
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[dict]:
+        """按累计耗时（total）、次数（count）、p95或最大耗时（max）排序的慢查询"""
+        sort_keys = {
+            "total": lambda entry: entry.total,
+            "count": lambda entry: entry.count,
+            "p95": lambda entry: entry.p95(),
+            "max": lambda entry: entry.max,
+        }
+        with self._lock:
+            entries = sorted(self._entries.values(), key=sort_keys[order_by], reverse=True)[:limit]
+            return [entry.snapshot() for entry in entries]
+
+    def stats(self) -> dict:
+        with self._lock:
+            fingerprints = len(self._entries)
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "fingerprints": fingerprints,
+            "explain_queue": self._explain_queue.qsize(),
+            "explain_dropped": self.explain_dropped,
+            "explain_failures": self.explain_failures,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def explain(engine: Engine, statement: str, parameters) -> List[str]:
+    """在独立连接上获取语句的执行计划文本行"""
+    with engine.connect() as connection:
+        connection.execution_options(slow_query_log=False)
+        if connection.dialect.name == "sqlite":
+            rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            return [row[-1] for row in rows]
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+        return [row[0] for row in rows]
+
+
+slow_query_log = SlowQueryLog(
+    threshold_seconds=settings.slow_query_threshold_ms / 1000,
+    max_fingerprints=settings.slow_query_max_fingerprints,
+    explain=settings.slow_query_explain,
+    explain_interval=settings.slow_query_explain_interval,
+)
@@ -0,0 +1,125 @@
+import logging
+import time
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 预热任务：(同步函数, 是否必需)，按注册顺序在线程池中执行
+_warmup_tasks: List[Tuple[Callable[[], None], bool]] = []
+
+
+def register_warmup(fn: Optional[Callable[[], None]] = None, *, required: bool = True):
+    """注册启动预热任务（装饰器）
+
+    必需任务失败时实例不报告就绪（/ready 持续返回503）；required=False 的任务
+    只是提前承担首个请求的初始化开销，失败时记录错误但不阻塞就绪。
+    """
+    def decorator(task: Callable[[], None]) -> Callable[[], None]:
+        _warmup_tasks.append((task, required))
+        return task
+
+    return decorator(fn) if fn is not None else decorator
+
+
+class Readiness:
+    """就绪状态：所有必需的预热任务成功后才对外报告就绪"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at = time.monotonic()
+        self.warmup_seconds = None
+        self.tasks = {}
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "warmup_seconds": self.warmup_seconds,
+            "tasks": self.tasks,
+        }
+
+
+readiness = Readiness()
+
+
+async def run_warmup() -> None:
+    """依次执行预热任务；任一必需任务失败时保持未就绪，失败原因见 /ready 的任务列表"""
+    started = time.perf_counter()
+    failed = []
+    for task, required in _warmup_tasks:
+        task_started = time.perf_counter()
+        try:
+            await run_in_threadpool(task)
+            status = "ok"
+        except Exception as exc:
+            logger.exception("预热任务 %s 失败", task.__name__)
+            status = f"error: {exc}"
+            if required:
+                failed.append(task.__name__)
+        readiness.tasks[task.__name__] = {
+            "status": status,
+            "required": required,
+            "seconds": round(time.perf_counter() - task_started, 4),
+        }
+    readiness.warmup_seconds = round(time.perf_counter() - started, 4)
+    if failed:
+        logger.error("必需的预热任务失败，实例保持未就绪: %s", ", ".join(failed))
+        return
+    readiness.ready = True
+
+
+@register_warmup
+def warm_db_pools() -> None:
+    """预先建立数据库连接，避免首批请求承担建连开销"""
+    from app.core.database import engine, replica_engines
+
+    for pool_engine in [engine] + replica_engines:
+        connections = []
+        try:
+            for _ in range(max(1, settings.db_warmup_connections)):
+                connection = pool_engine.connect()
+                connection.execute(text("SELECT 1"))
+                connections.append(connection)
+        finally:
+            for connection in connections:
+                connection.close()
+
+
+@register_warmup
+def ensure_health_record_partitions() -> None:
+    """提前创建未来月份的健康记录分区（未分区的数据库上为空操作）"""
+    from app.core.database import engine
+    from app.core.partitions import ensure_partitions
+
+    with engine.begin() as connection:
+        created = ensure_partitions(connection, settings.health_record_partitions_ahead)
+    if created:
+        logger.info("已创建健康记录分区: %s", ", ".join(created))
+
+
+@register_warmup(required=False)
+def warm_password_hashing() -> None:
+    """加载bcrypt后端，避免首次登录时才初始化"""
+    from app.core.security import pwd_context
+
+    pwd_context.handler("bcrypt").get_backend()
+
+
+@register_warmup
+def warm_revocation_list() -> None:
+    """加载令牌吊销记录到布隆过滤器"""
+    from app.core.revocation import revocation_list
+
+    revocation_list.load()
+
+
+@register_warmup(required=False)
+def warm_plan_search() -> None:
+    """加载健康方案检索的中文分词词典，避免首次检索时才加载"""
+    from app.utils.plan_search import warm_tokenizer
+
+    warm_tokenizer()
@@ -0,0 +1,67 @@
+"""
+SQL编译缓存指标：统计SQLAlchemy编译缓存（compiled cache）的命中情况
+
+每次执行语句时 ExecutionContext.cache_hit 标明编译结果的来源：命中缓存、未命中（本次编译后写入缓存）、
+语句不可缓存（如文本SQL）等。命中率下降通常意味着有语句在每次请求时以不同结构重新构建。
+"""
+import threading
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS, CACHING_DISABLED, NO_CACHE_KEY, NO_DIALECT_SUPPORT
+
+_CACHE_STATUS = {
+    CACHE_HIT: "hits",
+    CACHE_MISS: "misses",
+    CACHING_DISABLED: "caching_disabled",
+    NO_CACHE_KEY: "no_cache_key",
+    NO_DIALECT_SUPPORT: "no_dialect_support",
+}
+
+
+class StatementCacheMetrics:
+    """单个引擎的编译缓存命中统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts = dict.fromkeys(_CACHE_STATUS.values(), 0)
+        self._lock = threading.Lock()
+        self._engine = None
+
+    def attach(self, engine: Engine) -> None:
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        status = _CACHE_STATUS.get(getattr(context, "cache_hit", None))
+        if status is not None:
+            with self._lock:
+                self.counts[status] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        cacheable = counts["hits"] + counts["misses"]
+        cache = getattr(self._engine, "_compiled_cache", None)
+        return {
+            "name": self.name,
+            **counts,
+            "hit_rate": round(counts["hits"] / cacheable, 4) if cacheable else None,
+            "cache_entries": len(cache) if cache is not None else None,
+            "cache_capacity": getattr(cache, "capacity", None),
+        }
+
+
+# 已注册的引擎，供管理端点导出指标
+registered_caches: Dict[str, StatementCacheMetrics] = {}
+
+
+def register_statement_cache(name: str, engine: Engine) -> None:
+    metrics = StatementCacheMetrics(name)
+    metrics.attach(engine)
+    registered_caches[name] = metrics
+
+
+def statement_cache_snapshots() -> list:
+    return [metrics.snapshot() for metrics in registered_caches.values()]
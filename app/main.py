@@ -1,13 +1,36 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api import auth, patients, health_plans, patient_health_plans
+from app.core.database import get_db, get_async_db, dispose_engines
+from app.core.db_routing import STICKY_HEADER, ReadAfterWriteMiddleware, read_router
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.revocation import revocation_list
+from app.core.startup import readiness, run_warmup
+from app.api import auth, patients, health_plans, patient_health_plans, health_records, appointments, admin
+from app.utils.async_routes import to_async_router
+from app.utils.bulk_insert import UnsupportedDialect
+from app.utils.pagination import NEXT_CURSOR_HEADER, ESTIMATED_TOTAL_HEADER
+from app.utils.deps import get_current_user, get_current_user_async
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：后台执行连接与缓存预热，关闭时释放数据库连接池
+
+    数据库表结构不在启动时创建，由迁移步骤（alembic upgrade head 或 scripts/init_db.py）负责。
+    """
+    warmup = asyncio.create_task(run_warmup())
+    yield
+    warmup.cancel()
+    revocation_list.stop()
+    await dispose_engines()
 
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.app_name,
     version=settings.app_version,
     description="健康管理系统后台API",
@@ -22,13 +45,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, ESTIMATED_TOTAL_HEADER, STICKY_HEADER],
 )
 
+# 读写分离：写请求的响应中下发读主库的粘滞标记，各worker均可识别
+if settings.database_replica_urls:
+    app.add_middleware(ReadAfterWriteMiddleware, router=read_router)
+
+# SQL执行统计中间件
+if settings.sql_stats_enabled:
+    app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=settings.sql_n_plus_one_threshold)
+
+# 异步数据库模式：会话与认证依赖切换为异步版本，路由在AsyncSession上执行
+if settings.db_async:
+    app.dependency_overrides[get_db] = get_async_db
+    app.dependency_overrides[get_current_user] = get_current_user_async
+
+
+def _router(router):
+    return to_async_router(router) if settings.db_async else router
+
+
 # 注册路由
-app.include_router(auth.router, prefix="/api/auth", tags=["认证"])
-app.include_router(patients.router, prefix="/api/patients", tags=["患者管理"])
-app.include_router(health_plans.router, prefix="/api/health-plans", tags=["健康方案"])
-app.include_router(patient_health_plans.router, prefix="/api/patient-health-plans", tags=["患者健康方案"])
+app.include_router(_router(auth.router), prefix="/api/auth", tags=["认证"])
+app.include_router(_router(patients.router), prefix="/api/patients", tags=["患者管理"])
+app.include_router(_router(health_plans.router), prefix="/api/health-plans", tags=["健康方案"])
+app.include_router(_router(patient_health_plans.router), prefix="/api/patient-health-plans", tags=["患者健康方案"])
+app.include_router(_router(health_records.router), prefix="/api/health-records", tags=["健康记录"])
+app.include_router(_router(appointments.router), prefix="/api/appointments", tags=["预约管理"])
+app.include_router(_router(admin.router), prefix="/api/admin", tags=["系统管理"])
+
+@app.exception_handler(UnsupportedDialect)
+async def unsupported_dialect_handler(request: Request, exc: UnsupportedDialect):
+    """批量写入、健康记录汇总等依赖 ON CONFLICT 的接口在不支持的数据库上返回501"""
+    return JSONResponse(status_code=status.HTTP_501_NOT_IMPLEMENTED, content={"detail": str(exc)})
 
 @app.get("/")
 def read_root():
@@ -44,6 +94,13 @@ def health_check():
     """健康检查"""
     return {"status": "健康"}
 
+@app.get("/ready")
+def readiness_check():
+    """就绪检查：必需的预热任务全部成功前返回503"""
+    if not readiness.ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=readiness.snapshot())
+    return readiness.snapshot()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
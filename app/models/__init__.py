@@ -1,15 +1,28 @@
 from .user import User
 from .patient import Patient
+from .patient_search_gram import PatientSearchGram, PatientSearchQueue
 from .health_plan import HealthPlan
+from .plan_search import PlanSearchPosting, PlanSearchDocument
 from .patient_health_plan import PatientHealthPlan
 from .health_record import HealthRecord
+from .vitals_rollup import VitalsRollup, VitalsRollupQueue
+from .vitals_flag import VitalsFlag
 from .appointment import Appointment
+from .doctor_working_hours import DoctorWorkingHours
 
 __all__ = [
     "User",
     "Patient", 
+    "PatientSearchGram",
+    "PatientSearchQueue",
     "HealthPlan",
+    "PlanSearchPosting",
+    "PlanSearchDocument",
     "PatientHealthPlan",
     "HealthRecord",
-    "Appointment"
+    "VitalsRollup",
+    "VitalsRollupQueue",
+    "VitalsFlag",
+    "Appointment",
+    "DoctorWorkingHours"
 ]
\ No newline at end of file
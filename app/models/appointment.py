@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean, Index, DDL, event
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -22,6 +23,13 @@ class AppointmentStatus(enum.Enum):
     NO_SHOW = "no_show"            # 爽约
 
 
+# 占用医生时间段的预约状态（同一医生的这些预约时间段不得重叠）
+BOOKED_APPOINTMENT_STATUSES = (
+    AppointmentStatus.SCHEDULED, AppointmentStatus.CONFIRMED,
+    AppointmentStatus.IN_PROGRESS, AppointmentStatus.COMPLETED,
+)
+
+
 class Appointment(Base):
     __tablename__ = "appointments"
 
@@ -68,6 +76,25 @@ class Appointment(Base):
     # 系统信息
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_appointments_patient_scheduled_start", patient_id, scheduled_start),
+        Index("ix_appointments_doctor_scheduled_start", doctor_id, scheduled_start),
+        Index("ix_appointments_patient_health_plan_id", patient_health_plan_id),
+        Index("ix_appointments_scheduled_start", scheduled_start, id),  # 列表游标分页
+        # 预约冲突检查与医生排班查询：只包含占用时间段的预约
+        Index(
+            "ix_appointments_doctor_booked", doctor_id, scheduled_start, scheduled_end,
+            postgresql_where=status.in_(BOOKED_APPOINTMENT_STATUSES),
+            sqlite_where=status.in_(BOOKED_APPOINTMENT_STATUSES),
+        ),
+        # PostgreSQL 上由排他约束保证同一医生占用的时间段 [scheduled_start, scheduled_end) 不重叠
+        ExcludeConstraint(
+            (doctor_id, "="), (func.tstzrange(scheduled_start, scheduled_end), "&&"),
+            name="ex_appointments_doctor_overlap", using="gist",
+            where=status.in_(BOOKED_APPOINTMENT_STATUSES),
+        ).ddl_if(dialect="postgresql"),
+    )
     
     # 关系
     patient = relationship("Patient", backref="appointments")
@@ -75,4 +102,11 @@ class Appointment(Base):
     patient_health_plan = relationship("PatientHealthPlan", backref="appointments")
 
     def __repr__(self):
-        return f"<Appointment(id={self.id}, patient_id={self.patient_id}, doctor_id={self.doctor_id}, status='{self.status}')>"
\ No newline at end of file
+        return f"<Appointment(id={self.id}, patient_id={self.patient_id}, doctor_id={self.doctor_id}, status='{self.status}')>"
+
+
+# create_all 建表前在PostgreSQL上启用 btree_gist 扩展（排他约束中 doctor_id 的等值比较需要，迁移中同样处理）
+event.listen(
+    Appointment.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Time, ForeignKey, Index
+from app.core.database import Base
+
+
+class DoctorWorkingHours(Base):
+    """医生每周的出诊时间段（诊所所在时区的当地时间，见 settings.clinic_timezone）
+
+    同一天可以有多个时间段（如上午、下午各一段）；没有配置任何时间段的医生按
+    settings.default_working_hours / default_working_days 出诊。
+    """
+    __tablename__ = "doctor_working_hours"
+
+    id = Column(Integer, primary_key=True)
+    doctor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    weekday = Column(Integer, nullable=False)     # 0=周一 ... 6=周日
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)       # 晚于 start_time，不跨越午夜
+
+    __table_args__ = (
+        Index("ix_doctor_working_hours_doctor", doctor_id, weekday, start_time, unique=True),
+    )
+
+    def __repr__(self):
+        return f"<DoctorWorkingHours(doctor_id={self.doctor_id}, weekday={self.weekday}, {self.start_time}-{self.end_time})>"
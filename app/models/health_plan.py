@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -52,6 +52,13 @@ class HealthPlan(Base):
     is_public = Column(Boolean, default=False)    # 是否公开
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_health_plans_template_public_type", is_template, is_public, plan_type),
+        Index("ix_health_plans_public_type", is_public, plan_type),  # 非管理员：公开方案或本人创建
+        Index("ix_health_plans_created_by", created_by),
+        Index("ix_health_plans_created_at", created_at, id),  # 列表游标分页
+    )
     
     # 关系
     creator = relationship("User", backref="created_health_plans")
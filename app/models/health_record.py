@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -56,8 +56,22 @@ class HealthRecord(Base):
     event_date = Column(DateTime(timezone=True))  # 事件发生时间
     
     # 系统信息
+    idempotency_key = Column(String(64))  # 上报方生成的幂等键：同一记录者重复上报同一键、同一记录时间的记录时只保存一次
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # PostgreSQL 上按 record_date 按月分区（见 app/core/partitions.py），分区表的主键与唯一索引均包含 record_date
+    __table_args__ = (
+        Index("ix_health_records_patient_record_date", patient_id, record_date),
+        Index("ix_health_records_recorded_by", recorded_by),
+        Index("ix_health_records_patient_health_plan_id", patient_health_plan_id),
+        Index("ix_health_records_record_date", record_date, id),  # 列表游标分页
+        Index(
+            "ix_health_records_idempotency_key", recorded_by, idempotency_key, record_date, unique=True,
+            postgresql_where=idempotency_key.isnot(None),
+            sqlite_where=idempotency_key.isnot(None),
+        ),
+    )
     
     # 关系
     patient = relationship("Patient", backref="health_records")
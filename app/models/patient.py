@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Enum, Text, DateTime, Float, Boolean
+from sqlalchemy import Column, Integer, String, Date, Enum, Text, DateTime, Float, Boolean, Index, DDL, event
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -18,6 +18,8 @@ class Patient(Base):
     # 基本信息
     patient_id = Column(String(20), unique=True, index=True, nullable=False)  # 患者编号
     name = Column(String(100), nullable=False)
+    name_pinyin = Column(String(300))   # 姓名全拼，如 zhangsan（用于自动补全）
+    name_initials = Column(String(50))  # 姓名拼音首字母，如 zs
     gender = Column(Enum(Gender), nullable=False)
     birth_date = Column(Date, nullable=False)
     phone = Column(String(20))
@@ -42,5 +44,50 @@ class Patient(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        # 列表默认只查询在册患者：部分索引只包含 is_active 为真的行
+        Index(
+            "ix_patients_active_created_at", created_at, id,
+            postgresql_where=is_active.is_(True), sqlite_where=is_active.is_(True),
+        ),
+        Index("ix_patients_phone", phone),
+        # 姓名自动补全：在册患者的姓名/全拼/首字母前缀范围查询
+        Index(
+            "ix_patients_active_name", name,
+            postgresql_where=is_active.is_(True), sqlite_where=is_active.is_(True),
+            postgresql_ops={"name": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_patients_active_name_pinyin", name_pinyin,
+            postgresql_where=is_active.is_(True), sqlite_where=is_active.is_(True),
+            postgresql_ops={"name_pinyin": "varchar_pattern_ops"},
+        ),
+        Index(
+            "ix_patients_active_name_initials", name_initials,
+            postgresql_where=is_active.is_(True), sqlite_where=is_active.is_(True),
+            postgresql_ops={"name_initials": "varchar_pattern_ops"},
+        ),
+        # 患者编号前缀匹配：PostgreSQL的 LIKE 'P001%' 需要 varchar_pattern_ops 索引（其他数据库使用唯一索引范围扫描）
+        Index(
+            "ix_patients_patient_id_pattern", patient_id,
+            postgresql_ops={"patient_id": "varchar_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # 子串搜索：PostgreSQL使用pg_trgm的GIN索引，其他数据库使用 patient_search_grams 倒排表
+        *(
+            Index(
+                f"ix_patients_{column}_trgm", column,
+                postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in ("name", "patient_id", "phone", "id_card")
+        ),
+    )
+
     def __repr__(self):
-        return f"<Patient(id={self.id}, patient_id='{self.patient_id}', name='{self.name}')>"
\ No newline at end of file
+        return f"<Patient(id={self.id}, patient_id='{self.patient_id}', name='{self.name}')>"
+
+
+# create_all 建表前在PostgreSQL上启用 pg_trgm 扩展（迁移中同样处理）
+event.listen(
+    Patient.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Date, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, DateTime, Date, Text, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -13,6 +13,10 @@ class AssignmentStatus(enum.Enum):
     CANCELLED = "cancelled"    # 已取消
 
 
+# 视为"进行中"的分配状态
+ACTIVE_ASSIGNMENT_STATUSES = (AssignmentStatus.ASSIGNED, AssignmentStatus.IN_PROGRESS)
+
+
 class PatientHealthPlan(Base):
     __tablename__ = "patient_health_plans"
 
@@ -41,6 +45,20 @@ class PatientHealthPlan(Base):
     # 系统信息
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_patient_health_plans_patient_status", patient_id, status),
+        Index("ix_patient_health_plans_plan_status", health_plan_id, status),
+        Index("ix_patient_health_plans_assigned_by", assigned_by),
+        Index("ix_patient_health_plans_created_at", created_at, id),  # 列表游标分页
+        # 进行中的分配（已分配/进行中）：同一患者同一方案最多一条（并发重复分配由数据库拒绝），
+        # 也用于重复分配检查与删除方案前的占用检查
+        Index(
+            "ix_patient_health_plans_active_unique", patient_id, health_plan_id, unique=True,
+            postgresql_where=status.in_(ACTIVE_ASSIGNMENT_STATUSES),
+            sqlite_where=status.in_(ACTIVE_ASSIGNMENT_STATUSES),
+        ),
+    )
     
     # 关系
     patient = relationship("Patient", backref="health_plans")
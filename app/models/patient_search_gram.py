@@ -0,0 +1,35 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.core.database import Base
+
+
+class PatientSearchGram(Base):
+    """患者搜索n-gram倒排表
+
+    PostgreSQL只写入汉字的单字与双字gram（1~2个字的输入pg_trgm无法使用索引），其他数据库写入全部gram。
+    """
+    __tablename__ = "patient_search_grams"
+
+    gram = Column(String(16), primary_key=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_patient_search_grams_patient_id", patient_id),  # 患者资料变更/删除时按患者清除gram
+        {"sqlite_with_rowid": False},
+    )
+
+    def __repr__(self):
+        return f"<PatientSearchGram(gram='{self.gram}', patient_id={self.patient_id})>"
+
+
+class PatientSearchQueue(Base):
+    """待写入gram索引的患者
+
+    批量导入只写入患者并在此登记，gram索引在请求之外由 scripts/drain_patient_search_index.py 分批写入；
+    出队之前子串搜索把队列中的患者一并作为候选（用ILIKE校验），结果不受出队进度影响。
+    """
+    __tablename__ = "patient_search_queue"
+
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+
+    def __repr__(self):
+        return f"<PatientSearchQueue(patient_id={self.patient_id})>"
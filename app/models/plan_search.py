@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, Index
+from app.core.database import Base
+
+
+class PlanSearchPosting(Base):
+    """健康方案全文检索倒排表：每个(方案, 词项)一行
+
+    冗余存储文档长度与可见性字段（is_public、created_by），可见性过滤在索引扫描中完成，BM25打分无需读取方案表。
+    impact 为写入时按BM25词频部分计算的贡献值，检索时按它有序读取每个词项的前若干条候选。
+    """
+    __tablename__ = "plan_search_postings"
+
+    plan_id = Column(Integer, ForeignKey("health_plans.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String(32), primary_key=True)
+    tf = Column(Integer, nullable=False)          # 词频（按字段权重累加）
+    doc_length = Column(Integer, nullable=False)  # 方案的加权词项总数
+    is_public = Column(Boolean, nullable=False)
+    created_by = Column(Integer, nullable=False)
+    impact = Column(Float, nullable=False)        # BM25词频部分（不含idf）
+
+    __table_args__ = (
+        # 按词项读取候选：覆盖可见性字段与plan_id，无需回表
+        Index("ix_plan_search_postings_term_impact", term, impact, is_public, created_by, plan_id),
+        {"sqlite_with_rowid": False},
+    )
+
+    def __repr__(self):
+        return f"<PlanSearchPosting(term='{self.term}', plan_id={self.plan_id}, tf={self.tf})>"
+
+
+class PlanSearchDocument(Base):
+    """已索引的健康方案及其文档长度，用于计算BM25的文档总数与平均长度"""
+    __tablename__ = "plan_search_documents"
+
+    plan_id = Column(Integer, ForeignKey("health_plans.id", ondelete="CASCADE"), primary_key=True)
+    length = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<PlanSearchDocument(plan_id={self.plan_id}, length={self.length})>"
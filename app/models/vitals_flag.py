@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.vitals_rollup import VitalMetric
+import enum
+
+
+class VitalsFlagType(enum.Enum):
+    TREND_UP = "trend_up"          # 连续数周上升
+    TREND_DOWN = "trend_down"      # 连续数周下降
+    SPIKE = "spike"                # 偏离患者自身基线（z分数）
+    CHANGE_POINT = "change_point"  # EWMA 超出基线控制限，水平发生持续变化
+
+
+class VitalsFlag(Base):
+    """生命体征异常提示：由夜间分析任务（scripts/analyze_vitals.py）批量写入
+
+    同一患者、指标、类型在同一日期只保留一条，重复运行分析不会产生重复提示。
+    """
+    __tablename__ = "vitals_flags"
+
+    id = Column(Integer, primary_key=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    metric = Column(Enum(VitalMetric), nullable=False)
+    flag_type = Column(Enum(VitalsFlagType), nullable=False)
+    event_date = Column(Date, nullable=False)  # 异常出现的日期（趋势为所在周的周一）
+    value = Column(Float, nullable=False)      # 触发提示的日均值（趋势为最近一周均值）
+    score = Column(Float, nullable=False)      # z分数、EWMA偏离的标准差倍数或趋势斜率（每天）
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_vitals_flags_patient_event", patient_id, metric, flag_type, event_date, unique=True),
+        Index("ix_vitals_flags_event_date", event_date, id),  # 按日期查看全部患者的提示
+    )
+
+    def __repr__(self):
+        return f"<VitalsFlag(patient_id={self.patient_id}, metric='{self.metric}', type='{self.flag_type}', event_date={self.event_date})>"
@@ -0,0 +1,77 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum, Index
+from app.core.database import Base
+import enum
+
+
+class VitalMetric(enum.Enum):
+    """参与汇总的生命体征指标，值为 HealthRecord 上的列名"""
+    SYSTOLIC_PRESSURE = "systolic_pressure"    # 收缩压
+    DIASTOLIC_PRESSURE = "diastolic_pressure"  # 舒张压
+    HEART_RATE = "heart_rate"                  # 心率
+    TEMPERATURE = "temperature"                # 体温
+    BLOOD_GLUCOSE = "blood_glucose"            # 血糖
+    WEIGHT = "weight"                          # 体重
+
+
+class RollupBucket(enum.Enum):
+    """汇总时间粒度（按UTC划分，周从周一开始），按从细到粗的顺序定义"""
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+
+class VitalsRollup(Base):
+    """生命体征汇总表：每个(患者, 指标, 粒度, 时间段)一行
+
+    健康记录写入时增量累加（批量上报经 vitals_rollup_queue 在请求之外累加），记录修改或删除时按所在周重新计算；
+    趋势图读取汇总行而不是原始记录。
+    平均值为 sum_value / count。
+    """
+    __tablename__ = "vitals_rollups"
+
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(Enum(VitalMetric), primary_key=True)
+    bucket = Column(Enum(RollupBucket), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+
+    count = Column(Integer, nullable=False)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    sum_value = Column(Float, nullable=False)
+    last_value = Column(Float, nullable=False)  # 时间段内记录时间最晚的值
+    last_recorded_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # 夜间分析按指标、患者范围批量读取日均值：覆盖所需列，只包含日粒度行
+        Index(
+            "ix_vitals_rollups_daily", metric, patient_id, bucket_start, count, sum_value,
+            postgresql_where=bucket == RollupBucket.DAY,
+            sqlite_where=bucket == RollupBucket.DAY,
+        ),
+        {"sqlite_with_rowid": False},
+    )
+
+    def __repr__(self):
+        return f"<VitalsRollup(patient_id={self.patient_id}, metric='{self.metric}', bucket='{self.bucket}', bucket_start={self.bucket_start})>"
+
+
+class VitalsRollupQueue(Base):
+    """待汇总的健康记录
+
+    批量上报只写入原始记录并在此登记，汇总在请求之外由 scripts/drain_vitals_rollups.py 分批累加；
+    出队之前趋势查询把队列中的记录与汇总行合并计算。记录在出队前被修改时，重新计算所在周的汇总并一并出队；
+    被删除的记录出队时跳过。
+    """
+    __tablename__ = "vitals_rollup_queue"
+
+    record_id = Column(Integer, primary_key=True, autoincrement=False)  # health_records.id（分区表上不建外键）
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False)
+    record_date = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # 趋势查询合并某患者一段时间内尚未汇总的记录
+        Index("ix_vitals_rollup_queue_patient", patient_id, record_date),
+    )
+
+    def __repr__(self):
+        return f"<VitalsRollupQueue(record_id={self.record_id}, patient_id={self.patient_id})>"
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, time
 from app.models.appointment import AppointmentType, AppointmentStatus
 
 
@@ -71,4 +71,22 @@ class AppointmentSearchParams(BaseModel):
     status: Optional[AppointmentStatus] = None
     scheduled_start_from: Optional[datetime] = None
     scheduled_start_to: Optional[datetime] = None
-    patient_health_plan_id: Optional[int] = None
\ No newline at end of file
+    patient_health_plan_id: Optional[int] = None
+
+
+class WorkingHoursItem(BaseModel):
+    weekday: int = Field(..., ge=0, le=6)  # 0=周一 ... 6=周日
+    start_time: time
+    end_time: time
+
+    class Config:
+        from_attributes = True
+
+
+class AvailableSlot(BaseModel):
+    doctor_id: int
+    doctor_name: str
+    department: Optional[str]
+    specialty: Optional[str]
+    start: datetime
+    end: datetime
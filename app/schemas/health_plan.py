@@ -52,6 +52,10 @@ class HealthPlanResponse(HealthPlanBase):
         from_attributes = True
 
 
+class HealthPlanSearchResult(HealthPlanResponse):
+    score: float  # BM25相关度得分
+
+
 class HealthPlanSearchParams(BaseModel):
     title: Optional[str] = None
     plan_type: Optional[PlanType] = None
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import date, datetime
 from app.models.health_record import RecordType
+from app.models.vitals_flag import VitalsFlagType
+from app.models.vitals_rollup import RollupBucket, VitalMetric
 
 
 class HealthRecordBase(BaseModel):
@@ -38,7 +40,20 @@ class HealthRecordBase(BaseModel):
 
 
 class HealthRecordCreate(HealthRecordBase):
-    pass
+    idempotency_key: Optional[str] = Field(None, max_length=64)
+
+
+class HealthRecordIngestError(BaseModel):
+    index: int  # 在批量数据中的位置（从0开始）
+    error: str
+
+
+class HealthRecordIngestResult(BaseModel):
+    received: int
+    created: int
+    duplicates: int  # 幂等键已上报过的记录（未重复保存）
+    rejected: int
+    errors: List[HealthRecordIngestError]
 
 
 class HealthRecordUpdate(BaseModel):
@@ -67,6 +82,7 @@ class HealthRecordUpdate(BaseModel):
 class HealthRecordResponse(HealthRecordBase):
     id: int
     recorded_by: int
+    idempotency_key: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime]
 
@@ -74,6 +90,37 @@ class HealthRecordResponse(HealthRecordBase):
         from_attributes = True
 
 
+class VitalsTrendPoint(BaseModel):
+    bucket_start: datetime
+    count: int
+    min: float
+    max: float
+    avg: float
+    last: float  # 时间段内最新一条记录的值
+
+
+class VitalsTrend(BaseModel):
+    patient_id: int
+    bucket: RollupBucket  # 实际使用的汇总粒度
+    start: datetime
+    end: datetime
+    metrics: Dict[str, List[VitalsTrendPoint]]  # 指标 -> 按时间排序的汇总点
+
+
+class VitalsFlagResponse(BaseModel):
+    id: int
+    patient_id: int
+    metric: VitalMetric
+    flag_type: VitalsFlagType
+    event_date: date
+    value: float
+    score: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class HealthRecordSearchParams(BaseModel):
     patient_id: Optional[int] = None
     record_type: Optional[RecordType] = None
@@ -61,4 +61,14 @@ class PatientSearchParams(BaseModel):
     patient_id: Optional[str] = None
     phone: Optional[str] = None
     id_card: Optional[str] = None
-    is_active: Optional[bool] = True
\ No newline at end of file
+    is_active: Optional[bool] = True
+
+class PatientAutocompleteItem(BaseModel):
+    id: int
+    patient_id: str
+    name: str
+    gender: Gender
+    birth_date: date
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,10 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, date
 from app.models.patient_health_plan import AssignmentStatus
+from app.schemas.health_plan import HealthPlanResponse
+from app.schemas.patient import PatientResponse, PatientSearchParams
+from app.schemas.user import UserSummary
 
 
 class PatientHealthPlanBase(BaseModel):
@@ -18,6 +21,33 @@ class PatientHealthPlanCreate(PatientHealthPlanBase):
     pass
 
 
+class PatientHealthPlanBulkCreate(BaseModel):
+    """批量分配：patient_ids 与 patient_filter（与患者列表的过滤条件相同）二选一"""
+    health_plan_id: int
+    patient_ids: Optional[List[int]] = None
+    patient_filter: Optional[PatientSearchParams] = None
+    start_date: date
+    end_date: Optional[date] = None
+    custom_instructions: Optional[str] = None
+    custom_objectives: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class BulkAssignmentOutcome(BaseModel):
+    patient_id: int
+    outcome: str  # assigned / already_assigned / patient_not_found
+    assignment_id: Optional[int] = None
+
+
+class PatientHealthPlanBulkResult(BaseModel):
+    health_plan_id: int
+    requested: int
+    assigned: int
+    already_assigned: int
+    patient_not_found: int
+    results: List[BulkAssignmentOutcome]
+
+
 class PatientHealthPlanUpdate(BaseModel):
     status: Optional[AssignmentStatus] = None
     end_date: Optional[date] = None
@@ -43,6 +73,13 @@ class PatientHealthPlanResponse(PatientHealthPlanBase):
         from_attributes = True
 
 
+class PatientHealthPlanDetail(PatientHealthPlanResponse):
+    """分配记录，按 include 参数附带关联对象（未请求的为null）"""
+    patient: Optional[PatientResponse] = None
+    health_plan: Optional[HealthPlanResponse] = None
+    assigned_doctor: Optional[UserSummary] = None
+
+
 class PatientHealthPlanSearchParams(BaseModel):
     patient_id: Optional[int] = None
     health_plan_id: Optional[int] = None
@@ -40,6 +40,19 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserSummary(BaseModel):
+    """用户摘要（嵌入其他资源的响应中，不含联系方式）"""
+    id: int
+    username: str
+    full_name: str
+    role: UserRole
+    specialty: Optional[str] = None
+    department: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class UserLogin(BaseModel):
     username: str
     password: str
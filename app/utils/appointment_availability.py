@@ -0,0 +1,293 @@
+"""
+医生可预约时间段查询：按科室/专业查找医生，在出诊时间内扣除已占用的预约，按开始时间返回最早的N个空闲时间段
+
+- 出诊时间：doctor_working_hours 中每名医生每周的时间段（诊所时区 settings.clinic_timezone 的当地时间），
+  未配置的医生使用 settings.default_working_hours / default_working_days
+- 占用时间：BOOKED_APPOINTMENT_STATUSES 的预约。所有匹配医生的预约用一条查询读出（doctor_id IN (...) 加
+  开始时间范围，与 appointment_booking 一样以 MAX_APPOINTMENT_DURATION 限定开始时间的下界）
+- 扫描：每名医生的出诊时间段与占用时间段均按时间排序，双指针一次扫描得到空闲区间，区间内从对齐到
+  SLOT_STEP 的时刻起按所需时长依次切分。各医生的时间段以生成器按时间顺序产生，用 heapq.merge 按
+  (开始时间, 医生)合并，只取前N个，不为每名医生生成全部时间段
+- 分段读取：扫描线 T 从最早的出诊时刻起按 INITIAL_SEARCH_SPAN 的倍数推进（2、4、8……小时，跳过所有医生
+  都不出诊的时间），每次只读取开始时间在新增区间内的预约。开始时间晚于 T 的预约不影响结束时间不晚于 T 的时间段，而所有时间段时长相同，
+  这些时间段恰好是最终结果按开始时间排序的前缀；前缀中已有N个时即停止。通常几个小时内就能找满，
+  只读取所有医生这几个小时的预约；医生排满时也只需 O(log 时长) 次查询
+- 扫描中的时间均为不带时区的UTC时间（SQLite 读出的时间不带时区，PostgreSQL 的带时区时间读出时转换一次），
+  不逐行转换时区
+"""
+import bisect
+import datetime
+import heapq
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.appointment import Appointment, BOOKED_APPOINTMENT_STATUSES
+from app.models.doctor_working_hours import DoctorWorkingHours
+from app.models.user import User, UserRole
+from app.utils.appointment_booking import MAX_APPOINTMENT_DURATION
+from app.utils.timeutils import as_utc
+
+SLOT_STEP = datetime.timedelta(minutes=15)  # 空闲时间段的开始时间对齐到15分钟
+INITIAL_SEARCH_SPAN = datetime.timedelta(hours=2)
+MAX_SEARCH_RANGE = datetime.timedelta(days=183)
+MAX_AVAILABLE_SLOTS = 100
+
+Interval = Tuple[datetime.datetime, datetime.datetime]
+# 星期几(0=周一) -> 当天的出诊时间段
+WeeklyHours = Dict[int, List[Tuple[datetime.time, datetime.time]]]
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _naive_utc(moment: datetime.datetime) -> datetime.datetime:
+    return as_utc(moment).replace(tzinfo=None)
+
+
+def parse_hours(value: str) -> Tuple[datetime.time, datetime.time]:
+    """解析 "08:00-12:00" 形式的时间段"""
+    start, end = (datetime.time.fromisoformat(part.strip()) for part in value.split("-"))
+    return start, end
+
+
+def validate_weekly_hours(items: Sequence[Tuple[int, datetime.time, datetime.time]]) -> None:
+    """出诊时间段须在同一天内（结束晚于开始），同一天的时间段不得重叠，否则返回400"""
+    by_day = sorted(items)
+    for index, (weekday, start, end) in enumerate(by_day):
+        if not 0 <= weekday <= 6:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="星期取值为0（周一）到6（周日）"
+            )
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="出诊结束时间必须晚于开始时间（不支持跨越午夜）"
+            )
+        if index and by_day[index - 1][0] == weekday and by_day[index - 1][2] > start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="同一天的出诊时间段不能重叠"
+            )
+
+
+def default_weekly_hours() -> WeeklyHours:
+    hours = sorted(parse_hours(value) for value in settings.default_working_hours)
+    return {int(weekday): hours for weekday in settings.default_working_days}
+
+
+def load_weekly_hours(db: Session, doctor_ids: Sequence[int]) -> Dict[int, WeeklyHours]:
+    """医生编号 -> 每周出诊时间（只包含配置过出诊时间的医生）"""
+    hours: Dict[int, WeeklyHours] = {}
+    rows = db.execute(
+        select(DoctorWorkingHours.doctor_id, DoctorWorkingHours.weekday,
+               DoctorWorkingHours.start_time, DoctorWorkingHours.end_time)
+        .where(DoctorWorkingHours.doctor_id.in_(doctor_ids))
+        .order_by(DoctorWorkingHours.doctor_id, DoctorWorkingHours.weekday, DoctorWorkingHours.start_time)
+    )
+    for doctor_id, weekday, start, end in rows:
+        hours.setdefault(doctor_id, {}).setdefault(weekday, []).append((start, end))
+    return hours
+
+
+def find_doctors(db: Session, department: Optional[str] = None, specialty: Optional[str] = None,
+                 doctor_id: Optional[int] = None) -> list:
+    """在职医生（编号、姓名、科室、专业），按编号排序"""
+    query = select(User.id, User.full_name, User.department, User.specialty).where(
+        User.role == UserRole.DOCTOR, User.is_active.is_(True)
+    )
+    if department:
+        query = query.where(User.department == department)
+    if specialty:
+        query = query.where(User.specialty == specialty)
+    if doctor_id is not None:
+        query = query.where(User.id == doctor_id)
+    return db.execute(query.order_by(User.id)).all()
+
+
+def busy_query(doctor_ids: Sequence[int], start: datetime.datetime, end: datetime.datetime,
+               loaded_until: Optional[datetime.datetime] = None) -> Select:
+    """这些医生与 [start, end) 重叠的占用时间段的预约(医生编号, 开始时间, 结束时间)
+
+    指定 loaded_until 时只查询开始时间不早于该时刻的预约（更早的已经读取过）。
+    """
+    if loaded_until is None:
+        lower_bound = Appointment.scheduled_start > start - MAX_APPOINTMENT_DURATION
+    else:
+        lower_bound = Appointment.scheduled_start >= loaded_until
+    return select(Appointment.doctor_id, Appointment.scheduled_start, Appointment.scheduled_end).where(
+        Appointment.doctor_id.in_(doctor_ids),
+        Appointment.status.in_(BOOKED_APPOINTMENT_STATUSES),
+        lower_bound,
+        Appointment.scheduled_start < end,
+        Appointment.scheduled_end > start,
+    )
+
+
+def load_busy(db: Session, doctor_ids: Sequence[int], start: datetime.datetime, end: datetime.datetime,
+              busy: Dict[int, List[Interval]], loaded_until: Optional[datetime.datetime] = None) -> None:
+    """读取 busy_query 的预约，按医生追加到 busy（不带时区的UTC时间）
+
+    每次读取的预约都晚于之前读取的，追加后每名医生的占用时间段仍按开始时间排序。
+    """
+    # 只读取三列，在连接上执行，不经过ORM的结果处理
+    rows = db.connection().execute(busy_query(doctor_ids, start, end, loaded_until)).all()
+    if rows and rows[0][1].tzinfo is not None:
+        rows = [(doctor_id, _naive_utc(busy_start), _naive_utc(busy_end)) for doctor_id, busy_start, busy_end in rows]
+    loaded: Dict[int, List[Interval]] = {}
+    for doctor_id, busy_start, busy_end in rows:
+        intervals = loaded.get(doctor_id)
+        if intervals is None:
+            intervals = loaded[doctor_id] = []
+        intervals.append((busy_start, busy_end))
+    for doctor_id, intervals in loaded.items():
+        intervals.sort()
+        busy.setdefault(doctor_id, []).extend(intervals)
+
+
+def working_windows(hours: WeeklyHours, first_day: datetime.date, last_day: datetime.date,
+                    zone: datetime.tzinfo, cache: Dict) -> List[Interval]:
+    """first_day 到 last_day（当地日期，含两端）的出诊时间段（不带时区的UTC时间，按时间排序）"""
+    windows = []
+    day = first_day
+    while day <= last_day:
+        for start, end in hours.get(day.weekday(), ()):
+            key = (day, start, end)
+            window = cache.get(key)
+            if window is None:
+                window = cache[key] = (
+                    _naive_utc(datetime.datetime.combine(day, start, zone)),
+                    _naive_utc(datetime.datetime.combine(day, end, zone)),
+                )
+            windows.append(window)
+        day += datetime.timedelta(days=1)
+    return windows
+
+
+def _align(moment: datetime.datetime) -> datetime.datetime:
+    """向后对齐到 SLOT_STEP 的整数倍"""
+    remainder = (moment - _EPOCH) % SLOT_STEP
+    return moment + (SLOT_STEP - remainder) if remainder else moment
+
+
+def free_slots(windows: Sequence[Interval], busy: Sequence[Interval], start: datetime.datetime,
+               end: datetime.datetime, duration: datetime.timedelta) -> Iterator[Interval]:
+    """按时间顺序生成 [start, end) 内、出诊时间段中不与占用时间段重叠的时长为 duration 的时间段
+
+    windows 与 busy 均按开始时间排序；占用时间段之间可以重叠（如历史数据）。时间均为不带时区的UTC时间。
+    """
+    if not windows:
+        return
+    # 预约时长不超过 MAX_APPOINTMENT_DURATION，更早开始的预约在第一个出诊时间段之前已结束
+    index = bisect.bisect_left(busy, (windows[0][0] - MAX_APPOINTMENT_DURATION,))
+    count = len(busy)
+    for window_start, window_end in windows:
+        window_end = min(window_end, end)
+        cursor = max(window_start, start)
+        while cursor < window_end:
+            # 跳过在 cursor 之前已结束的占用时间段
+            while index < count and busy[index][1] <= cursor:
+                index += 1
+            if index < count and busy[index][0] < window_end:
+                # 不移动 index：跨越多个出诊时间段的预约在下一个时间段开始时仍需扣除
+                gap_end, next_cursor = busy[index]
+            else:
+                gap_end = next_cursor = window_end
+            if gap_end - cursor >= duration:  # 排满时大多数空隙为0，不必对齐
+                slot_start = _align(cursor)
+                while slot_start + duration <= gap_end:
+                    yield slot_start, slot_start + duration
+                    slot_start += duration
+            if next_cursor > cursor:
+                cursor = next_cursor
+        if window_end >= end:
+            return
+
+
+def _first_working_moment(schedules: Sequence[WeeklyHours], start: datetime.datetime, end: datetime.datetime,
+                          zone: datetime.tzinfo, cache: Dict) -> Optional[datetime.datetime]:
+    """这些出诊时间在 [start, end) 内最早的出诊时刻（不带时区的UTC时间），没有时返回None"""
+    distinct = list({id(hours): hours for hours in schedules}.values())
+    utc_start = start.replace(tzinfo=datetime.timezone.utc)
+    day = utc_start.astimezone(zone).date()
+    last_day = (end - datetime.timedelta(microseconds=1)).replace(tzinfo=datetime.timezone.utc).astimezone(zone).date()
+    while day <= last_day:
+        openings = [
+            window_start
+            for hours in distinct
+            for window_start, window_end in working_windows(hours, day, day, zone, cache)
+            if window_end > start
+        ]
+        if openings:
+            moment = max(start, min(openings))
+            return moment if moment < end else None
+        day += datetime.timedelta(days=1)
+    return None
+
+
+def _doctor_slots(doctor, windows: Sequence[Interval], busy: Sequence[Interval], start: datetime.datetime,
+                  end: datetime.datetime, duration: datetime.timedelta) -> Iterator[tuple]:
+    for slot_start, slot_end in free_slots(windows, busy, start, end, duration):
+        yield slot_start, doctor.id, slot_end, doctor
+
+
+def find_available_slots(db: Session, doctors: Sequence, start: datetime.datetime, end: datetime.datetime,
+                         duration: datetime.timedelta, limit: int) -> List[dict]:
+    """doctors 在 [start, end) 内最早的 limit 个空闲时间段，按(开始时间, 医生编号)排序"""
+    if not doctors:
+        return []
+    zone = ZoneInfo(settings.clinic_timezone)
+    doctor_ids = [doctor.id for doctor in doctors]
+    configured = load_weekly_hours(db, doctor_ids)
+    defaults = default_weekly_hours()
+    schedules = [configured.get(doctor.id, defaults) for doctor in doctors]
+    cache: Dict = {}
+
+    start, end = as_utc(start), as_utc(end)
+    naive_start, naive_end = _naive_utc(start), _naive_utc(end)
+    frontier = _first_working_moment(schedules, naive_start, naive_end, zone, cache)
+    if frontier is None:
+        return []
+    sweep_day = start.astimezone(zone).date()
+    busy: Dict[int, List[Interval]] = {}
+    slots: List[tuple] = []
+    loaded_until = None
+    span = INITIAL_SEARCH_SPAN
+    while True:
+        # 扫描线推进到 frontier：读取开始时间早于 frontier 的全部预约后，结束时间不晚于 frontier 的时间段已确定
+        frontier = min(naive_end, frontier + span)
+        frontier_utc = frontier.replace(tzinfo=datetime.timezone.utc)
+        load_busy(db, doctor_ids, start, frontier_utc, busy, loaded_until)
+        last_day = frontier_utc.astimezone(zone).date()
+        streams = [
+            _doctor_slots(doctor, working_windows(hours, sweep_day, last_day, zone, cache),
+                          busy.get(doctor.id, ()), naive_start, frontier, duration)
+            for doctor, hours in zip(doctors, schedules)
+        ]
+        merged = heapq.merge(*streams)
+        if loaded_until is not None:
+            # 从上一条扫描线所在的一天重新扫描，结束时间不晚于上一条扫描线的时间段已在 slots 中
+            previous = loaded_until.replace(tzinfo=None)
+            merged = (slot for slot in merged if slot[2] > previous)
+        slots.extend(islice(merged, limit - len(slots)))
+        if len(slots) >= limit or frontier >= naive_end:
+            break
+        loaded_until = frontier_utc
+        sweep_day = last_day
+        span *= 2
+        # 跳过夜间、周末等所有医生都不出诊的时间
+        frontier = _first_working_moment(schedules, frontier, naive_end, zone, cache)
+        if frontier is None:
+            break
+
+    return [
+        {"doctor_id": doctor.id, "doctor_name": doctor.full_name, "department": doctor.department,
+         "specialty": doctor.specialty, "start": slot_start.replace(tzinfo=datetime.timezone.utc),
+         "end": slot_end.replace(tzinfo=datetime.timezone.utc)}
+        for slot_start, _, slot_end, doctor in slots
+    ]
@@ -0,0 +1,88 @@
+"""
+预约时间冲突检查：同一医生占用时间段的预约（BOOKED_APPOINTMENT_STATUSES）的 [scheduled_start, scheduled_end) 不得重叠
+
+- PostgreSQL：排他约束 ex_appointments_doctor_overlap（btree_gist，doctor_id 相等且 tstzrange 重叠即冲突），
+  由数据库在写入时判断；并发预约同一时间段时，后写入的一方违反约束
+- 其他数据库：先写入（flush）再查询重叠的预约。预约时长不超过 MAX_APPOINTMENT_DURATION，与 [start, end) 重叠的
+  预约开始时间必在 (start - MAX_APPOINTMENT_DURATION, end) 内，查询只在部分索引 ix_appointments_doctor_booked
+  上扫描该医生这一小段时间的预约，耗时与医生的历史预约数无关。
+  并发安全：SQLite 的写入取得数据库写锁，之后的查询能看到全部已提交的预约，其他写入须等待本事务结束；
+  其他数据库先锁定医生所在的 users 行（SELECT ... FOR UPDATE），同一医生的预约写入依次进行
+- 时间统一转换为UTC保存（SQLite 不保存时区，不同时区的时间无法直接比较）
+"""
+import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment, BOOKED_APPOINTMENT_STATUSES
+from app.models.user import User
+from app.utils.timeutils import as_utc
+
+MAX_APPOINTMENT_DURATION = datetime.timedelta(hours=12)
+
+
+def validate_interval(start: datetime.datetime, end: datetime.datetime) -> Tuple[datetime.datetime, datetime.datetime]:
+    """校验预约时间段并转换为UTC，结束时间不晚于开始时间或时长超过上限时返回400"""
+    start, end = as_utc(start), as_utc(end)
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="预约结束时间必须晚于开始时间"
+        )
+    if end - start > MAX_APPOINTMENT_DURATION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"预约时长不能超过{MAX_APPOINTMENT_DURATION.total_seconds() / 3600:g}小时"
+        )
+    return start, end
+
+
+def overlap_query(doctor_id: int, start: datetime.datetime, end: datetime.datetime,
+                  exclude_id: Optional[int] = None) -> Select:
+    """该医生与 [start, end) 重叠的占用时间段的预约编号（最多一条）"""
+    query = select(Appointment.id).where(
+        Appointment.doctor_id == doctor_id,
+        Appointment.status.in_(BOOKED_APPOINTMENT_STATUSES),
+        Appointment.scheduled_start > start - MAX_APPOINTMENT_DURATION,
+        Appointment.scheduled_start < end,
+        Appointment.scheduled_end > start,
+    )
+    if exclude_id is not None:
+        query = query.where(Appointment.id != exclude_id)
+    return query.limit(1)
+
+
+def find_overlap(db: Session, doctor_id: int, start: datetime.datetime, end: datetime.datetime,
+                 exclude_id: Optional[int] = None) -> Optional[int]:
+    """查找该医生与 [start, end) 重叠的占用时间段的预约，返回其中一条的编号"""
+    return db.execute(overlap_query(doctor_id, start, end, exclude_id)).scalar()
+
+
+def save_booking(db: Session, appointment: Appointment) -> None:
+    """写入新建或修改后的预约（不提交）；与该医生其他预约的时间段重叠时回滚并返回400"""
+    dialect_name = db.connection().dialect.name
+    if dialect_name not in ("postgresql", "sqlite"):
+        db.execute(select(User.id).where(User.id == appointment.doctor_id).with_for_update())
+    try:
+        db.flush()
+    except IntegrityError:
+        # PostgreSQL 排他约束：与已提交或并发写入的预约重叠
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="该医生在此时间段已有预约"
+        )
+    if dialect_name == "postgresql" or appointment.status not in BOOKED_APPOINTMENT_STATUSES:
+        return
+    conflict = find_overlap(db, appointment.doctor_id, as_utc(appointment.scheduled_start),
+                            as_utc(appointment.scheduled_end), appointment.id)
+    if conflict is not None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"该医生在此时间段已有预约（预约 {conflict}）"
+        )
@@ -0,0 +1,52 @@
+import functools
+import inspect
+from fastapi import APIRouter
+from fastapi.routing import APIRoute
+
+from app.core.database import run_in_session
+
+
+def _run_endpoint_in_session(endpoint):
+    """把使用同步会话的路由函数包装为协程，在异步会话的run_sync中执行"""
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        db = kwargs.pop("db")
+        return await run_in_session(db, lambda session: endpoint(*args, db=session, **kwargs))
+    return wrapper
+
+
+def to_async_router(router: APIRouter) -> APIRouter:
+    """生成路由的异步版本：同步路由函数改为在AsyncSession上执行，不再占用线程池"""
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        endpoint = route.endpoint
+        if not inspect.iscoroutinefunction(endpoint) and "db" in inspect.signature(endpoint).parameters:
+            endpoint = _run_endpoint_in_session(endpoint)
+        async_router.add_api_route(
+            route.path,
+            endpoint,
+            response_model=route.response_model,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            response_model_include=route.response_model_include,
+            response_model_exclude=route.response_model_exclude,
+            response_model_by_alias=route.response_model_by_alias,
+            response_model_exclude_unset=route.response_model_exclude_unset,
+            response_model_exclude_defaults=route.response_model_exclude_defaults,
+            response_model_exclude_none=route.response_model_exclude_none,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+        )
+    return async_router
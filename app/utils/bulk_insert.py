@@ -0,0 +1,101 @@
+"""
+批量写入：多行 INSERT ... ON CONFLICT（PostgreSQL与SQLite）
+
+违反唯一约束的行被跳过而不是使整批失败；配合 RETURNING，调用方按返回的行判断哪些行因冲突未写入。
+需要合并到已有行时（如累加汇总值），在 dialect_insert 的结果上调用 on_conflict_do_update。
+其他数据库抛出 UnsupportedDialect，接口返回501。
+
+insert_rows_ignoring_conflicts 面向大批量导入：多行VALUES语句按行数编译一次并缓存，参数经各列的类型处理后
+按驱动的参数格式直接执行，跳过Core逐行构造参数（每行十几列时这部分开销与SQLite写入本身相当）。
+"""
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import Table, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+
+# 单条多行INSERT语句的绑定参数上限（SQLite默认上限为32766）
+MAX_BIND_PARAMS = 10000
+
+
+class UnsupportedDialect(Exception):
+    """数据库不支持 INSERT ... ON CONFLICT，无法批量写入"""
+
+
+def dialect_insert(table: Table, dialect_name: str):
+    """构建支持 ON CONFLICT 子句的INSERT语句"""
+    if dialect_name == "postgresql":
+        return postgresql.insert(table)
+    if dialect_name == "sqlite":
+        return sqlite.insert(table)
+    raise UnsupportedDialect(f"批量写入不支持数据库: {dialect_name}（仅支持PostgreSQL与SQLite）")
+
+
+def insert_ignoring_conflicts(table: Table, dialect_name: str):
+    """构建遇到唯一约束冲突时跳过该行的INSERT语句"""
+    return dialect_insert(table, dialect_name).on_conflict_do_nothing()
+
+
+@lru_cache(maxsize=64)
+def _compiled_rows_insert(table: Table, names: Tuple[str, ...], returning: tuple, dialect, size: int):
+    """编译 size 行的多行INSERT；names 按表的列顺序排列时绑定参数按行依次排列"""
+    statement = insert_ignoring_conflicts(table, dialect.name).values([
+        {name: bindparam(f"r{index}_{position}") for position, name in enumerate(names)}
+        for index in range(size)
+    ]).returning(*returning)
+    compiled = statement.compile(dialect=dialect)
+    expected = [f"r{index}_{position}" for index in range(size) for position in range(len(names))]
+    if compiled.positional and list(compiled.positiontup) != expected:
+        raise ValueError("多行INSERT的绑定参数顺序与列顺序不一致")
+    return compiled, expected
+
+
+def _chunk_sizes(total: int, largest: int) -> Iterator[int]:
+    """把 total 行拆成若干条语句的行数：先按 largest 行，余数按2的幂拆分，编译结果可在各批之间复用"""
+    while total >= largest:
+        yield largest
+        total -= largest
+    size = largest
+    while total:
+        size //= 2
+        if total >= size:
+            yield size
+            total -= size
+
+
+def insert_rows_ignoring_conflicts(connection, table: Table, rows: List[Dict], returning: Sequence) -> list:
+    """写入一批行（各行的键相同），跳过违反唯一约束的行，返回已写入行的 returning 列
+
+    未提供的列使用列上的标量默认值（如 is_active）；服务器端默认值（如 created_at）由数据库生成。
+    """
+    if not rows:
+        return []
+    dialect = connection.dialect
+    defaults = {
+        column.name: column.default.arg for column in table.columns
+        if column.name not in rows[0] and column.default is not None and column.default.is_scalar
+    }
+    names = tuple(column.name for column in table.columns if column.name in rows[0] or column.name in defaults)
+    getter = itemgetter(*names)
+    processors = [
+        (position, processor) for position, processor in (
+            (position, table.c[name].type.dialect_impl(dialect).bind_processor(dialect))
+            for position, name in enumerate(names)
+        ) if processor is not None
+    ]
+    largest = 1 << ((MAX_BIND_PARAMS // len(names)).bit_length() - 1)
+    inserted = []
+    start = 0
+    for size in _chunk_sizes(len(rows), largest):
+        compiled, keys = _compiled_rows_insert(table, names, tuple(returning), dialect, size)
+        values = []
+        for row in rows[start:start + size]:
+            row_values = list(getter({**defaults, **row}) if defaults else getter(row))
+            for position, processor in processors:
+                row_values[position] = processor(row_values[position])
+            values.extend(row_values)
+        start += size
+        parameters = tuple(values) if compiled.positional else dict(zip(keys, values))
+        inserted.extend(connection.exec_driver_sql(compiled.string, parameters).all())
+    return inserted
@@ -1,21 +1,19 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.security import verify_token
 from app.models.user import User
 from app.schemas.user import TokenData
+from app.utils.lookups import get_by, get_by_id
+from app.utils.user_cache import cache_key, load_cached_user, remember_user
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """获取当前登录用户"""
-    token = credentials.credentials
-    
+def _resolve_user(db: Session, token: str) -> User:
+    """根据令牌解析当前用户（同步、异步认证依赖共用）"""
     # 验证token
     payload = verify_token(token)
     if payload is None:
@@ -26,21 +24,29 @@ def get_current_user(
         )
     
     username: str = payload.get("sub")
-    if username is None:
+    key = cache_key(payload)
+    if username is None or key is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="无效的认证凭据",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # 查询用户
-    user = db.query(User).filter(User.username == username).first()
+    # 优先从缓存获取用户，未命中时再查询数据库
+    user = load_cached_user(key, db)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="用户不存在",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        user_id = payload.get("uid")
+        if user_id is not None:
+            user = get_by_id(db, User, user_id)
+        else:
+            user = get_by(db, User, "username", username)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="用户不存在",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        remember_user(key, user)
     
     if not user.is_active:
         raise HTTPException(
@@ -51,6 +57,22 @@ def get_current_user(
     return user
 
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    """获取当前登录用户"""
+    return _resolve_user(db, credentials.credentials)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """获取当前登录用户（异步模式，get_db被覆盖为get_async_db，与路由共用同一会话）"""
+    return await db.run_sync(_resolve_user, credentials.credentials)
+
+
 def get_current_active_admin(current_user: User = Depends(get_current_user)) -> User:
     """获取当前活跃的管理员用户"""
     from app.models.user import UserRole
@@ -70,4 +92,14 @@ def get_current_active_doctor(current_user: User = Depends(get_current_user)) ->
             status_code=status.HTTP_403_FORBIDDEN,
             detail="权限不足：需要医生权限"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+def get_current_active_staff(current_user: User = Depends(get_current_user)) -> User:
+    """获取当前活跃的医护人员（管理员、医生或护士）"""
+    from app.models.user import UserRole
+    if current_user.role not in [UserRole.ADMIN, UserRole.DOCTOR, UserRole.NURSE]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="权限不足：需要医护人员权限"
+        )
+    return current_user
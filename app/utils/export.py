@@ -0,0 +1,107 @@
+"""
+流式导出：在服务端游标上分批读取（yield_per），逐批编码为CSV/NDJSON后发送，可选gzip压缩
+
+- 只查询导出列（Core行，不构建ORM对象与Pydantic模型），内存占用只与批大小有关，与导出行数无关
+- 导出在独立的会话上执行（按与 get_db 相同的规则选择主库或副本），响应发送完毕或客户端断开后关闭
+- CSV先发送表头，gzip每批刷新一次，客户端无需等待整个结果集
+- CSV带UTF-8 BOM（Excel可直接打开中文），导入接口会自动去掉BOM
+"""
+import csv
+import datetime
+import enum
+import io
+import json
+import zlib
+from typing import Callable, Iterator, List, Type
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Query, Session
+
+from app.core.database import ReplicaSessionLocals, SessionLocal
+from app.core.db_routing import read_router
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson)$"
+
+
+def export_columns(model: Type, schema: Type[BaseModel]) -> list:
+    """导出列：模型中出现在响应模型里的列，按表中列的顺序"""
+    return [getattr(model, column.key) for column in model.__table__.columns if column.key in schema.model_fields]
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(names: List[str], rows) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([("" if value is None else _plain(value) for value in row) for row in rows])
+    return buffer.getvalue()
+
+
+def _encode_ndjson(names: List[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(names, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+    )
+
+
+def stream_export(
+    session_factory: Callable[[], Session],
+    build_query: Callable[[Session], Query],
+    columns: list,
+    order_by,
+    file_format: str,
+    compress: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """按批生成导出内容；build_query 在导出会话上构建带过滤条件的查询"""
+    names = [column.key for column in columns]
+    encode = _encode_csv if file_format == "csv" else _encode_ndjson
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        if compressor is not None:
+            data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+
+    db = session_factory()
+    try:
+        if file_format == "csv":
+            yield emit("\ufeff" + ",".join(names) + "\r\n")
+        statement = build_query(db).with_entities(*columns).order_by(order_by).statement
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            yield emit(encode(names, rows))
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+def export_response(
+    request: Request,
+    filename: str,
+    build_query: Callable[[Session], Query],
+    columns: list,
+    order_by,
+    file_format: str,
+    compress: bool = False,
+) -> StreamingResponse:
+    """流式导出响应；compress 时返回 .gz 文件"""
+    replica = read_router.route(request)
+    factory = SessionLocal if replica is None else ReplicaSessionLocals[replica]
+    filename = f"{filename}.{file_format}" + (".gz" if compress else "")
+    return StreamingResponse(
+        stream_export(factory, build_query, columns, order_by, file_format, compress),
+        media_type="application/gzip" if compress else EXPORT_FORMATS[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,90 @@
+"""
+健康记录批量上报：集合查询校验引用，多行写入，幂等键去重
+
+- 一批记录引用的患者与方案分配用一条查询校验（分配须属于同一患者），错误按记录在批中的位置返回
+- 写入使用多行 INSERT ... ON CONFLICT DO NOTHING RETURNING；(记录者, 幂等键, 记录时间) 有唯一索引，
+  设备重试时已保存过的记录由数据库跳过并计为重复，不需要逐条查询
+- 新增的记录在同一事务中登记到生命体征汇总队列，由独立进程出队累加到汇总表（见 app/utils/vitals_rollup.py），
+  请求中不更新汇总；重复记录不登记
+- 整批在一个事务中提交
+"""
+from typing import List
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session
+
+from app.models.health_record import HealthRecord
+from app.models.patient import Patient
+from app.models.patient_health_plan import PatientHealthPlan
+from app.schemas.health_record import HealthRecordCreate
+from app.utils.bulk_insert import insert_ignoring_conflicts
+from app.utils.vitals_rollup import enqueue_rollups
+
+# 单次上报的记录数上限
+MAX_INGEST_RECORDS = 5000
+
+
+def _valid_references(db: Session, rows: List[dict]):
+    """返回存在的患者编号集合与属于对应患者的(患者, 分配)集合"""
+    patient_ids = {row["patient_id"] for row in rows}
+    assignment_ids = {row.get("patient_health_plan_id") for row in rows} - {None}
+    result = db.connection().execute(
+        select(Patient.id, PatientHealthPlan.id)
+        .outerjoin(PatientHealthPlan, and_(
+            PatientHealthPlan.patient_id == Patient.id, PatientHealthPlan.id.in_(assignment_ids)
+        ))
+        .where(Patient.id.in_(patient_ids))
+    )
+    patients, assignments = set(), set()
+    for patient_id, assignment_id in result:
+        patients.add(patient_id)
+        if assignment_id is not None:
+            assignments.add((patient_id, assignment_id))
+    return patients, assignments
+
+
+def ingest_records(db: Session, records: List[HealthRecordCreate], recorded_by: int) -> dict:
+    """校验并写入一批健康记录，返回上报结果（新增、重复与被拒绝的数量及错误）"""
+    # 未填写的字段不写入（设备上报通常只填少数指标），减少逐行的参数处理
+    rows = [record.model_dump(exclude_none=True) for record in records]
+    patients, assignments = _valid_references(db, rows) if rows else (set(), set())
+
+    errors, accepted, keys = [], [], set()
+    duplicates = 0
+    for index, row in enumerate(rows):
+        if row["patient_id"] not in patients:
+            errors.append({"index": index, "error": "患者不存在"})
+        elif row.get("patient_health_plan_id") is not None and \
+                (row["patient_id"], row["patient_health_plan_id"]) not in assignments:
+            errors.append({"index": index, "error": "健康方案分配不存在或不属于该患者"})
+        elif row.get("idempotency_key") is not None and (row["idempotency_key"], row["record_date"]) in keys:
+            duplicates += 1  # 同一批中重复的幂等键
+        else:
+            if row.get("idempotency_key") is not None:
+                keys.add((row["idempotency_key"], row["record_date"]))
+            row["recorded_by"] = recorded_by
+            accepted.append(row)
+
+    created = 0
+    if accepted:
+        # 多行写入要求各行的列相同：只包含这批记录中出现过的列
+        columns = dict.fromkeys(set().union(*accepted))
+        accepted = [{**columns, **row} for row in accepted]
+        connection = db.connection()
+        table = HealthRecord.__table__
+        statement = insert_ignoring_conflicts(table, connection.dialect.name).returning(
+            table.c.id, table.c.record_date
+        )
+        inserted = connection.execute(statement, accepted).all()
+        created = len(inserted)
+        duplicates += len(accepted) - created
+        # 重复记录不会返回，不进入汇总队列
+        enqueue_rollups(connection, inserted)
+    db.commit()
+    return {
+        "received": len(rows),
+        "created": created,
+        "duplicates": duplicates,
+        "rejected": len(errors),
+        "errors": errors,
+    }
@@ -0,0 +1,34 @@
+"""
+按主键/唯一字段的单行查询：使用预先构建的语句
+
+每次调用 db.query(Model).filter(Model.id == x).first() 都会重新构建 Query 并遍历语句结构生成编译缓存键；
+预先构建的 select + bindparam 语句只构建一次，缓存键也只计算一次，每次调用只绑定参数。
+与原写法一样每次都查询数据库（不依赖会话的标识映射）。
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+_statements: Dict[Tuple[type, str], Any] = {}
+
+
+def _lookup_statement(model: Type, field: str):
+    key = (model, field)
+    statement = _statements.get(key)
+    if statement is None:
+        statement = _statements[key] = select(model).where(getattr(model, field) == bindparam("value"))
+    return statement
+
+
+def get_by(db: Session, model: Type, field: str, value: Any, options: Sequence = ()) -> Optional[Any]:
+    """按唯一字段查询单行，不存在时返回None；options 为加载选项（如 joinedload）"""
+    statement = _lookup_statement(model, field)
+    if options:
+        statement = statement.options(*options)
+    return db.execute(statement, {"value": value}).scalars().first()
+
+
+def get_by_id(db: Session, model: Type, ident: Any, options: Sequence = ()) -> Optional[Any]:
+    """按主键查询单行，不存在时返回None"""
+    return get_by(db, model, "id", ident, options)
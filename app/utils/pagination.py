@@ -0,0 +1,147 @@
+"""
+列表分页：游标（keyset）分页与偏移分页
+
+- 游标分页：按(排序字段, id)排序，下一页条件为 (排序字段, id) > (上一页最后一行的值)，
+  可直接在索引上定位，页码再深耗时也不变，且翻页期间插入新数据不会导致重复或遗漏
+- 偏移分页（skip）：保留以兼容已有调用方
+- 下一页游标通过响应头 X-Next-Cursor 返回（没有下一页时不返回），响应体格式不变；
+  estimate_total=true 时通过 X-Estimated-Total 返回基于数据库统计信息的估计总数，不执行 COUNT(*)
+"""
+import base64
+import binascii
+import datetime
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import literal, text, tuple_
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Query, Session
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+ESTIMATED_TOTAL_HEADER = "X-Estimated-Total"
+
+# SQLite中 CURRENT_TIMESTAMP 写入的时间只精确到秒，游标中的时间按相同格式比较
+_SQLITE_SECONDS_FORMAT = "%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+_SQLITE_STAT_ROWS = re.compile(r"^\d+")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value: Any) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort: str, values: List[Any]) -> str:
+    """生成不透明的游标字符串"""
+    payload = json.dumps([sort, [_encode_value(value) for value in values]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, columns: List) -> List[Any]:
+    """解析游标，游标与当前排序方式不一致或格式错误时返回400"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, values = json.loads(payload)
+        if cursor_sort != sort or len(values) != len(columns):
+            raise ValueError(cursor_sort)
+        return [_decode_value(column, value) for column, value in zip(columns, values)]
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
+def _cursor_bound(column, value: Any, dialect_name: str):
+    if dialect_name == "sqlite" and isinstance(value, datetime.datetime) and not value.microsecond:
+        return literal(value, sqlite.DATETIME(storage_format=_SQLITE_SECONDS_FORMAT))
+    return literal(value, column.type)
+
+
+def estimate_count(db: Session, query: Query) -> Optional[int]:
+    """基于统计信息估计查询结果总数：PostgreSQL取执行计划的估计行数；
+    SQLite取 sqlite_stat1 中的表行数（表级估计，需执行过ANALYZE）；无法估计时返回None"""
+    bind = db.get_bind()
+    statement = query.statement
+    if bind.dialect.name == "postgresql":
+        compiled = statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+        plan = db.execute(text("EXPLAIN (FORMAT JSON) " + str(compiled))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    if bind.dialect.name == "sqlite":
+        analyzed = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        ).scalar()
+        if not analyzed:
+            return None
+        table = query.column_descriptions[0]["entity"].__table__.name
+        stat = db.execute(
+            text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1"), {"table": table}
+        ).scalar()
+        match = _SQLITE_STAT_ROWS.match(stat or "")
+        return int(match.group()) if match else None
+    return None
+
+
+def paginate(
+    db: Session,
+    query: Query,
+    response: Response,
+    *,
+    sort_keys: Dict[str, Any],
+    sort: str,
+    id_column,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    estimate_total: bool = False,
+) -> list:
+    """按排序字段对查询分页，返回当前页数据并设置分页响应头
+
+    sort 为 sort_keys 中的字段名，前缀"-"表示降序；同值按 id 排序保证顺序稳定。
+    """
+    name = sort.lstrip("-")
+    descending = sort.startswith("-")
+    if name not in sort_keys:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的排序字段: {name}，可选: {', '.join(sort_keys)}"
+        )
+    if cursor and skip:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="cursor 与 skip 不能同时使用")
+
+    if estimate_total:
+        estimated = estimate_count(db, query)
+        if estimated is not None:
+            response.headers[ESTIMATED_TOTAL_HEADER] = str(estimated)
+
+    key = sort_keys[name]
+    columns = [key] if key is id_column else [key, id_column]
+    query = query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+    if cursor:
+        values = decode_cursor(cursor, sort, columns)
+        dialect_name = db.get_bind().dialect.name
+        bounds = [_cursor_bound(column, value, dialect_name) for column, value in zip(columns, values)]
+        position = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*bounds) if len(bounds) > 1 else bounds[0]
+        query = query.filter(position < bound if descending else position > bound)
+    else:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            sort, [getattr(last, column.key) for column in columns]
+        )
+    return rows
@@ -0,0 +1,299 @@
+"""
+患者搜索：按输入形态选择查询方式，子串匹配使用n-gram索引
+
+- 11位数字：按手机号精确查询
+- 18位身份证号：按身份证号精确查询
+- P开头的患者编号：按患者编号前缀匹配
+- 其他输入：子串匹配。PostgreSQL由pg_trgm的GIN索引直接支持ILIKE；
+  其他数据库先从 patient_search_grams 倒排表中取最稀有的gram对应的候选患者，再用ILIKE校验
+- 1~2个字的汉字输入（如“张三”）不含三字gram，pg_trgm无法使用索引：PostgreSQL的倒排表只写入汉字的
+  单字与双字gram，这类输入同样先从倒排表取候选患者
+- 批量导入的患者先登记到 patient_search_queue，由 scripts/drain_patient_search_index.py 在请求之外写入gram；
+  使用倒排表的搜索把队列中的患者一并作为候选
+"""
+import re
+from collections import namedtuple
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, delete, event, exists, func, insert, inspect, or_, select, union
+from sqlalchemy.orm import Query, Session, aliased
+
+from app.models.patient import Patient
+from app.models.patient_search_gram import PatientSearchGram, PatientSearchQueue
+
+# 参与子串搜索的字段
+SEARCH_COLUMNS = ("name", "patient_id", "phone", "id_card")
+
+PHONE_PATTERN = re.compile(r"^\d{11}$")
+ID_CARD_PATTERN = re.compile(r"^\d{17}[\dXx]$")
+PATIENT_CODE_PATTERN = re.compile(r"^P\d+$", re.IGNORECASE)
+
+GRAM_SIZE = 3
+# 比较gram稀有程度时每个gram最多计数的行数
+GRAM_COUNT_CAP = 2000
+# 子串搜索时最多联合校验的gram数
+MAX_JOIN_GRAMS = 4
+# 重建索引时每批处理的患者数
+INDEX_BATCH_SIZE = 1000
+# 每次出队写入gram索引的患者数
+DRAIN_BATCH_SIZE = 2000
+
+SearchPlan = namedtuple("SearchPlan", ["kind", "value"])
+
+
+def _is_cjk(char: str) -> bool:
+    return "\u4e00" <= char <= "\u9fff" or "\u3400" <= char <= "\u4dbf"
+
+
+def _gram_at(text: str, index: int) -> Optional[str]:
+    """text在index处的gram：一般为三字gram；纯数字的三字gram只有1000种、选择性太低，扩展为四字gram"""
+    gram = text[index:index + GRAM_SIZE]
+    if len(gram) < GRAM_SIZE:
+        return None
+    if gram.isdigit():
+        gram = text[index:index + GRAM_SIZE + 1]
+        if len(gram) <= GRAM_SIZE:
+            return None
+    return gram
+
+
+def text_grams(text: str, short_only: bool = False) -> Set[str]:
+    """生成文本的索引gram；另外为汉字生成单字与双字gram（中文姓名通常只有2~3个字）
+
+    short_only=True 时只生成汉字的单字与双字gram（PostgreSQL的三字以上子串由pg_trgm索引）。
+    """
+    text = text.lower()
+    grams = set()
+    for index, char in enumerate(text):
+        if _is_cjk(char):
+            grams.add(char)
+            grams.add(text[index:index + 2])
+        if short_only:
+            continue
+        gram = _gram_at(text, index)
+        if gram:
+            grams.add(gram)
+    return grams
+
+
+def patient_grams(values: Iterable[Optional[str]], short_only: bool = False) -> Set[str]:
+    """患者各搜索字段的gram并集"""
+    grams = set()
+    for value in values:
+        if value:
+            grams |= text_grams(value, short_only)
+    return grams
+
+
+def query_grams(text: str) -> List[str]:
+    """查询输入对应的gram（每个包含该输入的字段都必然索引了这些gram）；输入过短无法使用索引时返回空列表"""
+    text = text.lower()
+    grams = {_gram_at(text, index) for index in range(len(text))} - {None}
+    if grams:
+        return sorted(grams)
+    if text and _is_cjk(text[0]) and len(text) <= 2:
+        return [text]
+    return []
+
+
+def plan_search(text: str) -> SearchPlan:
+    """根据输入形态确定查询方式"""
+    text = text.strip()
+    if PHONE_PATTERN.match(text):
+        return SearchPlan("phone", text)
+    if ID_CARD_PATTERN.match(text):
+        return SearchPlan("id_card", text.upper())
+    if PATIENT_CODE_PATTERN.match(text):
+        return SearchPlan("patient_id_prefix", text.upper())
+    return SearchPlan("substring", text)
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """前缀范围查询的上界（不含）：prefix <= value < upper_bound，可使用B-tree索引"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def prefix_filter(column, prefix: str, bind):
+    """前缀匹配条件：PostgreSQL使用 LIKE 'prefix%'（配合varchar_pattern_ops索引，不受排序规则影响），其他数据库使用范围条件"""
+    if bind.dialect.name == "postgresql":
+        return column.startswith(prefix, autoescape=True)
+    return and_(column >= prefix, column < prefix_upper_bound(prefix))
+
+
+def _uses_trigram_index(bind) -> bool:
+    """PostgreSQL由pg_trgm索引三字以上的子串，倒排表只包含汉字的单字与双字gram"""
+    return bind.dialect.name == "postgresql"
+
+
+def _gram_counts(db: Session, grams: Sequence[str]) -> List[Tuple[str, int]]:
+    """按候选患者数（截断计数）从少到多排列gram；遇到无候选的gram时只返回该gram"""
+    counts = []
+    for gram in grams:
+        capped = (
+            select(PatientSearchGram.patient_id)
+            .where(PatientSearchGram.gram == gram)
+            .limit(GRAM_COUNT_CAP)
+            .subquery()
+        )
+        count = db.execute(select(func.count()).select_from(capped)).scalar()
+        if count == 0:
+            return [(gram, 0)]
+        counts.append((gram, count))
+    return sorted(counts, key=lambda item: item[1])
+
+
+def apply_substring_search(query: Query, db: Session, text: str,
+                           columns: Sequence[str] = SEARCH_COLUMNS) -> Query:
+    """子串匹配：任一指定字段包含text（不区分大小写）"""
+    match = or_(*(getattr(Patient, column).ilike(f"%{text}%") for column in columns))
+    if _uses_trigram_index(db.get_bind()) and len(text) >= GRAM_SIZE:
+        return query.filter(match)
+    grams = query_grams(text)
+    if not grams:
+        # 过短的输入匹配面很广，带LIMIT的扫描很快就能凑满结果
+        return query.filter(match)
+    queued = select(PatientSearchQueue.patient_id)
+    counts = _gram_counts(db, grams)
+    if counts[0][1] == 0:
+        return query.filter(Patient.id.in_(queued)).filter(match)
+    # 最稀有的gram驱动扫描；其余gram以EXISTS按主键校验，只依赖驱动表，在读取患者行之前就排除大部分候选
+    driver = aliased(PatientSearchGram)
+    indexed = select(driver.patient_id).where(driver.gram == counts[0][0])
+    for gram, _ in counts[1:MAX_JOIN_GRAMS]:
+        other = aliased(PatientSearchGram)
+        indexed = indexed.where(exists().where(other.gram == gram, other.patient_id == driver.patient_id))
+    # 尚未写入gram的患者（批量导入后等待出队）同样作为候选
+    candidates = union(indexed, queued).subquery()
+    return query.join(candidates, candidates.c.patient_id == Patient.id).filter(match)
+
+
+def apply_patient_search(query: Query, db: Session, text: str) -> Query:
+    """按查询方式为患者查询添加搜索条件"""
+    plan = plan_search(text)
+    if plan.kind == "phone":
+        return query.filter(Patient.phone == plan.value)
+    if plan.kind == "id_card":
+        return query.filter(Patient.id_card == plan.value)
+    if plan.kind == "patient_id_prefix":
+        return query.filter(prefix_filter(Patient.patient_id, plan.value, db.get_bind()))
+    return apply_substring_search(query, db, plan.value)
+
+
+def filter_patients(db: Session, name: Optional[str] = None, patient_id: Optional[str] = None,
+                    phone: Optional[str] = None, id_card: Optional[str] = None,
+                    is_active: Optional[bool] = True) -> Query:
+    """患者列表的过滤条件（列表、导出与按条件批量分配共用），各字段按子串匹配"""
+    query = db.query(Patient)
+    for column, value in (("name", name), ("patient_id", patient_id), ("phone", phone), ("id_card", id_card)):
+        if value:
+            query = apply_substring_search(query, db, value, (column,))
+    if is_active is not None:
+        # 使用 IS 字面量而非绑定参数，使查询条件与部分索引的条件一致
+        query = query.filter(Patient.is_active.is_(is_active))
+    return query
+
+
+def index_patients(connection, patients: Iterable[Sequence]) -> int:
+    """为患者写入gram索引行，patients为(id, name, patient_id, phone, id_card)序列，返回写入行数"""
+    short_only = _uses_trigram_index(connection)
+    rows = [
+        (gram, patient[0])
+        for patient in patients
+        for gram in patient_grams(patient[1:], short_only)
+    ]
+    if not rows:
+        return 0
+    # 每个患者约30行：跳过Core逐行构造参数，按驱动的参数格式直接批量执行
+    compiled = insert(PatientSearchGram).compile(dialect=connection.dialect)
+    if not compiled.positional:
+        rows = [{"gram": gram, "patient_id": patient_id} for gram, patient_id in rows]
+    elif compiled.positiontup != ["gram", "patient_id"]:
+        rows = [(patient_id, gram) for gram, patient_id in rows]
+    connection.exec_driver_sql(compiled.string, rows)
+    return len(rows)
+
+
+def enqueue_search_index(connection, patient_ids: Sequence[int]) -> None:
+    """登记批量写入（不经过ORM事件）的患者，出队时再写入gram索引"""
+    if not patient_ids:
+        return
+    compiled = insert(PatientSearchQueue).compile(dialect=connection.dialect)
+    rows = [(patient_id,) if compiled.positional else {"patient_id": patient_id} for patient_id in sorted(patient_ids)]
+    connection.exec_driver_sql(compiled.string, rows)
+
+
+def drain_search_queue(connection, limit: int = DRAIN_BATCH_SIZE) -> int:
+    """从队列中取出最多 limit 名患者写入gram索引，返回出队数（调用方提交事务）
+
+    先删除这些患者已有的gram再写入，出队前被修改过（已由ORM事件写入gram）的患者不会重复写入；
+    PostgreSQL 上以 SKIP LOCKED 锁定队列行，多个进程可同时出队。
+    """
+    queue = PatientSearchQueue.__table__
+    columns = [getattr(Patient, column) for column in SEARCH_COLUMNS]
+    statement = (
+        select(queue.c.patient_id, *columns)
+        .select_from(queue)
+        .outerjoin(Patient, Patient.id == queue.c.patient_id)
+        .order_by(queue.c.patient_id)
+        .limit(limit)
+    )
+    if connection.dialect.name == "postgresql":
+        statement = statement.with_for_update(of=queue, skip_locked=True)
+    rows = connection.execute(statement).all()
+    if not rows:
+        return 0
+    patient_ids = [row[0] for row in rows]
+    connection.execute(delete(PatientSearchGram).where(PatientSearchGram.patient_id.in_(patient_ids)))
+    # 已删除的患者只出队
+    index_patients(connection, [row for row in rows if row[1] is not None])
+    connection.execute(delete(queue).where(queue.c.patient_id.in_(patient_ids)))
+    return len(rows)
+
+
+def drain_all(connection, batch_size: int = DRAIN_BATCH_SIZE) -> int:
+    """分批出队直到队列中没有可处理的患者，每批提交一次，返回出队总数"""
+    total = 0
+    while True:
+        count = drain_search_queue(connection, batch_size)
+        connection.commit()
+        total += count
+        if count < batch_size:
+            return total
+
+
+def rebuild_search_index(connection) -> int:
+    """重建全部患者的gram索引（迁移回填或修复时使用，队列一并清空），返回写入行数"""
+    connection.execute(delete(PatientSearchQueue))
+    connection.execute(delete(PatientSearchGram))
+    columns = [Patient.id] + [getattr(Patient, column) for column in SEARCH_COLUMNS]
+    result = connection.execution_options(yield_per=INDEX_BATCH_SIZE).execute(select(*columns))
+    total = 0
+    for batch in result.partitions():
+        total += index_patients(connection, batch)
+    return total
+
+
+def _search_values(target: Patient) -> list:
+    return [target.id] + [getattr(target, column) for column in SEARCH_COLUMNS]
+
+
+@event.listens_for(Patient, "after_insert")
+def _index_inserted_patient(mapper, connection, target):
+    """新增患者时写入gram索引"""
+    index_patients(connection, [_search_values(target)])
+
+
+@event.listens_for(Patient, "after_update")
+def _reindex_updated_patient(mapper, connection, target):
+    """搜索字段变更时重建该患者的gram索引"""
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in SEARCH_COLUMNS):
+        connection.execute(delete(PatientSearchGram).where(PatientSearchGram.patient_id == target.id))
+        index_patients(connection, [_search_values(target)])
+
+
+@event.listens_for(Patient, "after_delete")
+def _unindex_deleted_patient(mapper, connection, target):
+    """删除患者时清除gram索引与队列中的登记（SQLite默认不执行外键级联）"""
+    connection.execute(delete(PatientSearchGram).where(PatientSearchGram.patient_id == target.id))
+    connection.execute(delete(PatientSearchQueue).where(PatientSearchQueue.patient_id == target.id))
@@ -0,0 +1,102 @@
+"""
+姓名拼音：生成全拼与首字母，用于患者姓名自动补全
+
+拼音由 pypinyin 在本地词典中查得，不依赖外部服务。未安装 pypinyin 时汉字部分不生成拼音，
+自动补全仍可按姓名前缀匹配。
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.models.patient import Patient
+from app.utils.patient_search import prefix_filter
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # pragma: no cover - 依赖缺失时降级
+    lazy_pinyin = None
+
+logger = logging.getLogger(__name__)
+
+if lazy_pinyin is None:
+    logger.warning("未安装 pypinyin，患者姓名将不生成拼音")
+
+_HAN_RUN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]+")
+_WORD = re.compile(r"[a-z0-9]+")
+# 查询输入中忽略的分隔符：空格、隔音符号、连字符
+_SEPARATORS = re.compile(r"[\s'’\-]+")
+
+
+def _syllables(name: str) -> List[str]:
+    """将姓名拆为音节：汉字按词组读音转为拼音（处理多音字），其他部分按单词拆分"""
+    syllables = []
+    position = 0
+    for match in _HAN_RUN.finditer(name):
+        syllables += _WORD.findall(name[position:match.start()].lower())
+        if lazy_pinyin is not None:
+            syllables += [syllable.lower() for syllable in lazy_pinyin(match.group())]
+        position = match.end()
+    syllables += _WORD.findall(name[position:].lower())
+    return syllables
+
+
+# 常见姓名重复率高，批量导入时缓存可省去大部分词典查找
+@lru_cache(maxsize=65536)
+def name_pinyin(name: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """返回(全拼, 首字母)，如"张三" -> ("zhangsan", "zs")；无法生成时返回(None, None)"""
+    syllables = _syllables(name or "")
+    if not syllables:
+        return None, None
+    return "".join(syllables), "".join(syllable[0] for syllable in syllables)
+
+
+def normalize_query(text: str) -> str:
+    """规范化自动补全输入：小写并去掉分隔符，"Zhang San" -> "zhangsan" """
+    return _SEPARATORS.sub("", text).lower()
+
+
+def autocomplete_patients(db: Session, text: str, limit: int) -> list:
+    """姓名自动补全：含汉字时按姓名前缀匹配，否则依次按全拼、首字母前缀匹配；只查询在册患者"""
+    text = text.strip()
+    if _HAN_RUN.search(text):
+        prefixes = [(Patient.name, text)]
+    else:
+        text = normalize_query(text)
+        prefixes = [(Patient.name_pinyin, text), (Patient.name_initials, text)] if text else []
+    bind = db.get_bind()
+    columns = (Patient.id, Patient.patient_id, Patient.name, Patient.gender, Patient.birth_date)
+    results = {}
+    for column, prefix in prefixes:
+        rows = (
+            db.query(*columns)
+            .filter(Patient.is_active.is_(True), prefix_filter(column, prefix, bind))
+            .order_by(column)
+            .limit(limit)
+            .all()
+        )
+        for row in rows:
+            results.setdefault(row.id, row)
+        if len(results) >= limit:
+            break
+    return list(results.values())[:limit]
+
+
+def _fill_pinyin(target: Patient) -> None:
+    target.name_pinyin, target.name_initials = name_pinyin(target.name)
+
+
+@event.listens_for(Patient, "before_insert")
+def _pinyin_on_insert(mapper, connection, target):
+    """新增患者时生成姓名拼音"""
+    _fill_pinyin(target)
+
+
+@event.listens_for(Patient, "before_update")
+def _pinyin_on_update(mapper, connection, target):
+    """姓名变更时重新生成拼音"""
+    if inspect(target).attrs.name.history.has_changes():
+        _fill_pinyin(target)
@@ -0,0 +1,69 @@
+"""
+批量分配健康方案：按集合查询校验，分批写入
+
+- 每批患者是否存在、是否已有进行中的同一方案，各用一条 IN 查询判断，而不是逐个患者查询
+- 新分配用多行 INSERT ... ON CONFLICT DO NOTHING RETURNING 写入；进行中的分配有唯一部分索引，
+  查询之后被并发请求抢先分配的患者由数据库跳过，同样记为"已分配"
+- 全部批次在同一事务中提交
+"""
+from typing import Iterable, List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.patient import Patient
+from app.models.patient_health_plan import ACTIVE_ASSIGNMENT_STATUSES, AssignmentStatus, PatientHealthPlan
+from app.utils.bulk_insert import insert_ignoring_conflicts
+
+ASSIGN_BATCH_SIZE = 1000
+# 单次批量分配的患者数上限
+BULK_ASSIGN_MAX_PATIENTS = 20000
+
+OUTCOME_ASSIGNED = "assigned"
+OUTCOME_ALREADY_ASSIGNED = "already_assigned"
+OUTCOME_PATIENT_NOT_FOUND = "patient_not_found"
+
+
+def bulk_assign(db: Session, health_plan_id: int, patient_ids: Iterable[int], values: dict,
+                assigned_by: int) -> List[dict]:
+    """为一批患者分配同一方案，返回每个患者的结果（按 patient_ids 的顺序，重复的编号只保留一次）"""
+    ids = list(dict.fromkeys(patient_ids))
+    table = PatientHealthPlan.__table__
+    connection = db.connection()
+    statement = insert_ignoring_conflicts(table, connection.dialect.name).returning(table.c.id, table.c.patient_id)
+    outcomes = {}
+    for start in range(0, len(ids), ASSIGN_BATCH_SIZE):
+        batch = ids[start:start + ASSIGN_BATCH_SIZE]
+        existing = set(connection.execute(select(Patient.id).where(Patient.id.in_(batch))).scalars())
+        active = set(connection.execute(
+            select(PatientHealthPlan.patient_id).where(
+                PatientHealthPlan.health_plan_id == health_plan_id,
+                PatientHealthPlan.status.in_(ACTIVE_ASSIGNMENT_STATUSES),
+                PatientHealthPlan.patient_id.in_(batch),
+            )
+        ).scalars())
+
+        rows = []
+        for patient_id in batch:
+            if patient_id not in existing:
+                outcomes[patient_id] = (OUTCOME_PATIENT_NOT_FOUND, None)
+            elif patient_id in active:
+                outcomes[patient_id] = (OUTCOME_ALREADY_ASSIGNED, None)
+            else:
+                rows.append(dict(
+                    values, patient_id=patient_id, health_plan_id=health_plan_id,
+                    assigned_by=assigned_by, status=AssignmentStatus.ASSIGNED,
+                ))
+        if not rows:
+            continue
+        inserted = {patient_id: assignment_id for assignment_id, patient_id in connection.execute(statement, rows)}
+        for row in rows:
+            assignment_id = inserted.get(row["patient_id"])
+            outcomes[row["patient_id"]] = (
+                (OUTCOME_ASSIGNED, assignment_id) if assignment_id is not None else (OUTCOME_ALREADY_ASSIGNED, None)
+            )
+    db.commit()
+    return [
+        {"patient_id": patient_id, "outcome": outcomes[patient_id][0], "assignment_id": outcomes[patient_id][1]}
+        for patient_id in ids
+    ]
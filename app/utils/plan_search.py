@@ -0,0 +1,270 @@
+"""
+健康方案全文检索：中文分词 + 倒排表 + BM25排序
+
+- 分词：安装了 jieba 时使用其搜索模式离线分词，否则连续汉字按双字（bigram）切分；字母与数字按单词切分
+- 索引：plan_search_postings 倒排表，方案新增、修改、删除时由ORM事件增量维护
+- 检索：先按写入时计算的impact有序读取每个查询词项的前若干条可见倒排记录（公开或本人创建，管理员不限）
+  作为候选，再读取候选方案在各查询词项上的倒排记录，按当前的文档总数与平均长度计算BM25得分并排序。
+  常见词项的倒排链可能覆盖大半个方案库，候选截断使检索耗时与方案库规模无关
+"""
+import heapq
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, event, func, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.health_plan import HealthPlan
+from app.models.plan_search import PlanSearchDocument, PlanSearchPosting
+
+try:
+    import jieba
+except ImportError:  # pragma: no cover - 依赖缺失时降级
+    jieba = None
+
+logger = logging.getLogger(__name__)
+
+if jieba is None:
+    logger.warning("未安装 jieba，健康方案检索使用双字切分")
+else:
+    jieba.setLogLevel(logging.WARNING)
+
+# 参与检索的字段及其词频权重
+FIELD_WEIGHTS = {
+    "title": 3,
+    "target_conditions": 2,
+    "description": 1,
+    "objectives": 1,
+    "instructions": 1,
+}
+# 冗余到倒排表中的可见性字段
+VISIBILITY_FIELDS = ("is_public", "created_by")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_TERM_LENGTH = 32
+# 单次查询最多使用的词项数
+MAX_QUERY_TERMS = 16
+# 单次查询的候选方案总数，平均分配给各查询词项（每个词项不少于返回条数）
+CANDIDATE_BUDGET = 400
+# 文档总数、平均长度与文档频率的缓存时间（秒）：只影响打分精度，无需实时
+STATS_TTL_SECONDS = 300.0
+# 重建索引时每批处理的方案数
+INDEX_BATCH_SIZE = 500
+
+_HAN_RUN = r"[\u3400-\u4dbf\u4e00-\u9fff]+"
+_TOKEN = re.compile(_HAN_RUN + r"|[a-z0-9]+")
+STOPWORDS = frozenset("的 了 和 与 及 或 等 在 是 为 对 并".split())
+
+_stats_cache = TTLCache(max_size=10000, ttl_seconds=STATS_TTL_SECONDS)
+
+
+def warm_tokenizer() -> None:
+    """预先加载分词词典（jieba首次分词时加载，约1秒）"""
+    if jieba is not None:
+        jieba.initialize()
+
+
+def _segment(run: str) -> List[str]:
+    """切分一段连续汉字"""
+    if jieba is not None:
+        return jieba.lcut_for_search(run)
+    if len(run) == 1:
+        return [run]
+    return [run[index:index + 2] for index in range(len(run) - 1)]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """将文本切分为词项（小写，去除停用词）"""
+    tokens = []
+    for run in _TOKEN.findall((text or "").lower()):
+        words = [run] if run.isascii() else _segment(run)
+        tokens += [word[:MAX_TERM_LENGTH] for word in words if word not in STOPWORDS]
+    return tokens
+
+
+def plan_terms(plan: Mapping) -> Counter:
+    """方案各检索字段的词项及加权词频"""
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(plan.get(field)):
+            terms[token] += weight
+    return terms
+
+
+def _term_weight(tf: int, doc_length: int, avg_length: float) -> float:
+    """BM25的词频部分（不含idf）"""
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length / max(avg_length, 1.0))
+    return tf * (BM25_K1 + 1) / (tf + norm)
+
+
+def index_plans(connection, plans: Iterable[Mapping]) -> int:
+    """为方案写入倒排索引，plans为包含id、检索字段与可见性字段的映射序列，返回写入的倒排记录数"""
+    documents = [(plan, plan_terms(plan)) for plan in plans]
+    if not documents:
+        return 0
+    count, avg_length = _corpus_stats(connection)
+    if not count:
+        avg_length = sum(sum(terms.values()) for _, terms in documents) / len(documents)
+    rows = []
+    postings = []
+    for plan, terms in documents:
+        length = sum(terms.values())
+        rows.append({"plan_id": plan["id"], "length": length})
+        postings += [
+            {
+                "term": term,
+                "plan_id": plan["id"],
+                "tf": tf,
+                "doc_length": length,
+                "is_public": bool(plan["is_public"]),
+                "created_by": plan["created_by"],
+                "impact": _term_weight(tf, length, avg_length),
+            }
+            for term, tf in terms.items()
+        ]
+    connection.execute(insert(PlanSearchDocument), rows)
+    if postings:
+        connection.execute(insert(PlanSearchPosting), postings)
+    return len(postings)
+
+
+def unindex_plan(connection, plan_id: int) -> None:
+    """删除方案的倒排索引"""
+    connection.execute(delete(PlanSearchPosting).where(PlanSearchPosting.plan_id == plan_id))
+    connection.execute(delete(PlanSearchDocument).where(PlanSearchDocument.plan_id == plan_id))
+
+
+def rebuild_plan_index(connection) -> int:
+    """重建全部方案的倒排索引（迁移回填、切换分词方式或修复时使用），返回写入的倒排记录数"""
+    connection.execute(delete(PlanSearchPosting))
+    connection.execute(delete(PlanSearchDocument))
+    columns = [HealthPlan.id] + [getattr(HealthPlan, field) for field in (*FIELD_WEIGHTS, *VISIBILITY_FIELDS)]
+    result = connection.execution_options(yield_per=INDEX_BATCH_SIZE).execute(select(*columns))
+    total = 0
+    for batch in result.partitions():
+        total += index_plans(connection, [row._mapping for row in batch])
+    return total
+
+
+def _corpus_stats(connection) -> Tuple[int, float]:
+    """(已索引方案数, 平均文档长度)"""
+    stats = _stats_cache.get("corpus")
+    if stats is None:
+        count, total = connection.execute(
+            select(func.count(), func.coalesce(func.sum(PlanSearchDocument.length), 0))
+        ).one()
+        stats = (count, total / count if count else 0.0)
+        if count:
+            _stats_cache.set("corpus", stats)
+    return stats
+
+
+def _document_frequencies(db: Session, terms: Sequence[str]) -> Dict[str, int]:
+    """各词项出现的方案数；未出现的词项不缓存，新方案的词项可立即检索"""
+    frequencies = {}
+    missing = []
+    for term in terms:
+        cached = _stats_cache.get(("df", term))
+        if cached is None:
+            missing.append(term)
+        else:
+            frequencies[term] = cached
+    if missing:
+        counted = dict(db.execute(
+            select(PlanSearchPosting.term, func.count())
+            .where(PlanSearchPosting.term.in_(missing))
+            .group_by(PlanSearchPosting.term)
+        ).all())
+        for term in missing:
+            frequencies[term] = counted.get(term, 0)
+            if frequencies[term]:
+                _stats_cache.set(("df", term), frequencies[term])
+    return frequencies
+
+
+_posting = PlanSearchPosting
+# 每个词项按impact从高到低读取候选方案（可见性条件在索引扫描中判断）
+_CANDIDATES = (
+    select(_posting.plan_id)
+    .where(_posting.term == bindparam("term"))
+    .order_by(_posting.impact.desc())
+    .limit(bindparam("limit"))
+)
+_VISIBLE_CANDIDATES = _CANDIDATES.where(
+    or_(_posting.is_public.is_(True), _posting.created_by == bindparam("user_id"))
+)
+# 候选方案在各查询词项上的倒排记录，按主键(term, plan_id)逐条查找
+_CANDIDATE_POSTINGS = select(_posting.term, _posting.plan_id, _posting.tf, _posting.doc_length).where(
+    _posting.term.in_(bindparam("terms", expanding=True)),
+    _posting.plan_id.in_(bindparam("plan_ids", expanding=True)),
+)
+
+
+def search_plans(db: Session, text: str, user_id: Optional[int], limit: int) -> List[Tuple[int, float]]:
+    """检索方案，返回按BM25得分从高到低排列的(方案id, 得分)；user_id为None时不限制可见性（管理员）"""
+    terms = list(dict.fromkeys(tokenize(text)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+    count, avg_length = _corpus_stats(db)
+    frequencies = _document_frequencies(db, terms)
+    terms = [term for term in terms if frequencies[term]]
+    if not terms:
+        return []
+
+    statement = _CANDIDATES if user_id is None else _VISIBLE_CANDIDATES
+    per_term_limit = max(CANDIDATE_BUDGET // len(terms), limit)
+    candidates = set()
+    for term in terms:
+        candidates.update(db.execute(
+            statement, {"term": term, "limit": per_term_limit, "user_id": user_id}
+        ).scalars())
+    if not candidates:
+        return []
+
+    idf = {
+        term: math.log(1 + (max(count, df) - df + 0.5) / (df + 0.5))
+        for term, df in frequencies.items()
+    }
+    scores = defaultdict(float)
+    rows = db.execute(_CANDIDATE_POSTINGS, {"terms": terms, "plan_ids": sorted(candidates)})
+    for term, plan_id, tf, doc_length in rows:
+        scores[plan_id] += idf[term] * _term_weight(tf, doc_length, avg_length)
+    return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+
+def _plan_values(target: HealthPlan) -> dict:
+    values = {field: getattr(target, field) for field in (*FIELD_WEIGHTS, *VISIBILITY_FIELDS)}
+    values["id"] = target.id
+    return values
+
+
+@event.listens_for(HealthPlan, "after_insert")
+def _index_inserted_plan(mapper, connection, target):
+    """新增方案时写入倒排索引"""
+    index_plans(connection, [_plan_values(target)])
+
+
+@event.listens_for(HealthPlan, "after_update")
+def _reindex_updated_plan(mapper, connection, target):
+    """检索字段变更时重建该方案的索引；仅可见性变更时更新倒排记录中的冗余字段"""
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in FIELD_WEIGHTS):
+        unindex_plan(connection, target.id)
+        index_plans(connection, [_plan_values(target)])
+    elif any(state.attrs[field].history.has_changes() for field in VISIBILITY_FIELDS):
+        connection.execute(
+            update(PlanSearchPosting)
+            .where(PlanSearchPosting.plan_id == target.id)
+            .values(is_public=bool(target.is_public), created_by=target.created_by)
+        )
+
+
+@event.listens_for(HealthPlan, "after_delete")
+def _unindex_deleted_plan(mapper, connection, target):
+    """删除方案时清除倒排索引（SQLite默认不执行外键级联）"""
+    unindex_plan(connection, target.id)
@@ -0,0 +1,11 @@
+"""
+时间工具：数据库中的时间统一按UTC存储与比较
+"""
+import datetime
+
+
+def as_utc(moment: datetime.datetime) -> datetime.datetime:
+    """转换为UTC时间；不带时区的时间视为UTC（SQLite读出的时间不带时区）"""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.astimezone(datetime.timezone.utc)
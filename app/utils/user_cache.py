@@ -0,0 +1,69 @@
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+# 影响认证结果的字段，变更时需要使缓存失效
+_AUTH_FIELDS = ("is_active", "role", "username")
+
+user_cache = TTLCache(
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+)
+
+
+def cache_key(payload: dict) -> Optional[tuple]:
+    """根据令牌内容生成缓存键，优先使用令牌中携带的用户ID"""
+    user_id = payload.get("uid")
+    if user_id is not None:
+        return ("id", user_id)
+    username = payload.get("sub")
+    if username is not None:
+        return ("username", username)
+    return None
+
+
+def remember_user(key: tuple, user: User) -> None:
+    """缓存用户的列值快照（不缓存ORM实例本身，避免跨会话共享）"""
+    snapshot = {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+    }
+    user_cache.set(key, snapshot)
+
+
+def load_cached_user(key: tuple, db: Session) -> Optional[User]:
+    """从缓存恢复用户，并作为已持久化对象挂到当前会话上，不产生查询"""
+    snapshot = user_cache.get(key)
+    if snapshot is None:
+        return None
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+def invalidate_user(user: User) -> None:
+    """使指定用户的所有缓存条目失效"""
+    user_cache.delete(("id", user.id))
+    user_cache.delete(("username", user.username))
+    username_history = inspect(user).attrs.username.history
+    for old_username in username_history.deleted or ():
+        user_cache.delete(("username", old_username))
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target):
+    """用户状态、角色或用户名变更时清除缓存"""
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _AUTH_FIELDS):
+        invalidate_user(target)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target):
+    """用户被删除时清除缓存"""
+    invalidate_user(target)
@@ -0,0 +1,266 @@
+"""
+生命体征趋势与异常分析（夜间批量任务，见 scripts/analyze_vitals.py）
+
+- 数据来源为生命体征汇总表的日粒度行（日均值 = sum/count），一年每个指标每名患者最多365个点，不读取原始记录
+- 在职患者按编号分块，每块每个指标两条查询（覆盖索引 ix_vitals_rollups_daily）：基线期在数据库中按患者汇总为
+  (天数, 日均值之和, 日均值平方和)，只有最近 WINDOW_DAYS 天逐日读出，组成 患者 x 天 的矩阵（无记录的日期为NaN）。
+  一年的数据量主要在基线期，读入Python的行数因此减少约15倍
+- 滚动均值、斜率、相对患者自身基线的z分数与EWMA均在整块矩阵上以NumPy向量运算完成，不逐患者、逐记录循环
+- 检测规则（基线为分析窗口中最近 RECENT_DAYS 天之前的日均值，至少 MIN_BASELINE_DAYS 天）：
+  - SPIKE：最近几天中孤立的离群日均值（相对基线的 |z| 达到 SPIKE_Z，且前后一天没有同向离群）
+  - CHANGE_POINT：最近几天的EWMA连续两天超出基线的控制限（EWMA_LIMIT 倍EWMA标准差），且当天读数同向偏离，即水平持续变化
+  - TREND_UP/TREND_DOWN：最近 TREND_WEEKS 周的周均值逐周上升/下降，且累计变化达到该指标的阈值
+- 提示按(患者, 指标, 类型, 日期)唯一，用多行 INSERT ... ON CONFLICT DO NOTHING 写入，每块提交一次；
+  重复运行同一天的分析不会产生重复提示
+"""
+import datetime
+import itertools
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+
+from app.models.patient import Patient
+from app.models.vitals_flag import VitalsFlag, VitalsFlagType
+from app.models.vitals_rollup import RollupBucket, VitalMetric, VitalsRollup
+from app.utils.bulk_insert import insert_ignoring_conflicts
+
+ANALYSIS_DAYS = 365
+ANALYSIS_CHUNK_PATIENTS = 5000
+RECENT_DAYS = 7
+MIN_BASELINE_DAYS = 14
+SPIKE_Z = 3.0
+EWMA_ALPHA = 0.3
+EWMA_LIMIT = 3.0
+TREND_WEEKS = 3
+WINDOW_DAYS = TREND_WEEKS * 7  # 逐日读取的最近天数，更早的日期只参与基线统计
+MIN_WEEK_READINGS = 3  # 参与趋势判断的每周至少有记录的天数
+
+# 指标 -> (趋势提示所需的最小累计变化, 基线标准差下限)；标准差下限避免读数很稳定的患者因微小波动被提示
+METRIC_THRESHOLDS = {
+    VitalMetric.SYSTOLIC_PRESSURE: (10.0, 3.0),
+    VitalMetric.DIASTOLIC_PRESSURE: (6.0, 2.0),
+    VitalMetric.HEART_RATE: (10.0, 3.0),
+    VitalMetric.TEMPERATURE: (0.5, 0.1),
+    VitalMetric.BLOOD_GLUCOSE: (1.5, 0.3),
+    VitalMetric.WEIGHT: (2.0, 0.3),
+}
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """按行计算截至每一天的 window 天滚动均值（忽略NaN），返回(均值, 窗口内有记录的天数)"""
+    present = ~np.isnan(values)
+    zero = np.zeros((values.shape[0], 1))
+    sums = np.concatenate([zero, np.cumsum(np.where(present, values, 0.0), axis=1)], axis=1)
+    counts = np.concatenate([zero, np.cumsum(present, axis=1)], axis=1)
+    upper = np.arange(1, values.shape[1] + 1)
+    lower = np.maximum(upper - window, 0)
+    window_counts = counts[:, upper] - counts[:, lower]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = (sums[:, upper] - sums[:, lower]) / window_counts
+    return means, window_counts
+
+
+def slopes(values: np.ndarray) -> np.ndarray:
+    """按行对有记录的日期做最小二乘直线拟合，返回斜率（每天的变化量），不足两个点时为NaN"""
+    present = ~np.isnan(values)
+    t = np.broadcast_to(np.arange(values.shape[1], dtype=np.float64), values.shape)
+    y = np.where(present, values, 0.0)
+    tm = np.where(present, t, 0.0)
+    n = present.sum(axis=1)
+    st, sy = tm.sum(axis=1), y.sum(axis=1)
+    stt, sty = (tm * tm).sum(axis=1), (tm * y).sum(axis=1)
+    denominator = n * stt - st * st
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, (n * sty - st * sy) / denominator, np.nan)
+
+
+def baseline_stats(count: np.ndarray, total: np.ndarray, squares: np.ndarray,
+                   min_std: float) -> Tuple[np.ndarray, np.ndarray]:
+    """由基线的(天数, 日均值之和, 日均值平方和)按行计算(均值, 标准差)，标准差不低于 min_std"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        variance = np.maximum(squares / count - mean * mean, 0.0)
+    return mean, np.maximum(np.sqrt(variance), min_std)
+
+
+def ewma(values: np.ndarray, alpha: float, initial: np.ndarray) -> np.ndarray:
+    """按行计算指数加权移动平均，从 initial 开始；无记录的日期沿用前一天的值（逐天推进，每一步是整列向量运算）"""
+    result = np.empty_like(values)
+    current = initial.astype(np.float64, copy=True)
+    for day in range(values.shape[1]):
+        column = values[:, day]
+        present = ~np.isnan(column)
+        current[present] = alpha * column[present] + (1 - alpha) * current[present]
+        result[:, day] = current
+    return result
+
+
+def _shift(mask: np.ndarray, offset: int) -> np.ndarray:
+    """按列平移布尔矩阵（offset > 0 时第 j 列取原第 j - offset 列），移出范围的位置为 False"""
+    result = np.zeros_like(mask)
+    if offset > 0:
+        result[:, offset:] = mask[:, :-offset]
+    else:
+        result[:, :offset] = mask[:, -offset:]
+    return result
+
+
+def detect_flags(values: np.ndarray, baseline: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                 metric: VitalMetric) -> List[Tuple[int, VitalsFlagType, int, float, float]]:
+    """检测一块患者的异常
+
+    values 为最近 WINDOW_DAYS 天的 患者 x 天 矩阵，baseline 为各患者基线的(天数, 日均值之和, 日均值平方和)，
+    返回(行号, 类型, 日期列号, 值, 分数)。
+    """
+    min_rise, min_std = METRIC_THRESHOLDS[metric]
+    days = values.shape[1]
+    recent_start = days - RECENT_DAYS
+    mean, std = baseline_stats(*baseline, min_std)
+    has_baseline = baseline[0] >= MIN_BASELINE_DAYS
+    recent = values[:, recent_start:]
+    flags = []
+
+    with np.errstate(invalid="ignore"):
+        z = np.where(has_baseline[:, None], (recent - mean[:, None]) / std[:, None], np.nan)
+        high, low = z >= SPIKE_Z, z <= -SPIKE_Z
+    # 孤立的离群值才是突变；相邻日期同向离群属于水平变化，由EWMA判断
+    spike = (high & ~(_shift(high, 1) | _shift(high, -1))) | (low & ~(_shift(low, 1) | _shift(low, -1)))
+    for row, column in zip(*np.nonzero(spike)):
+        flags.append((row, VitalsFlagType.SPIKE, recent_start + column, recent[row, column], z[row, column]))
+
+    sigma = std * np.sqrt(EWMA_ALPHA / (2 - EWMA_ALPHA))
+    smoothed = ewma(recent, EWMA_ALPHA, np.where(has_baseline, mean, 0.0))
+    with np.errstate(invalid="ignore"):
+        deviation = (smoothed - mean[:, None]) / sigma[:, None]
+        # 当天读数也须与EWMA同向偏离基线至少一个标准差，单个离群值之后EWMA的余波不算
+        crossed = (np.abs(deviation) >= EWMA_LIMIT) & (z * np.sign(deviation) >= 1)
+    sustained = crossed[:, :-1] & crossed[:, 1:]
+    for row in np.nonzero(sustained.any(axis=1))[0]:
+        column = sustained[row].argmax()
+        flags.append((row, VitalsFlagType.CHANGE_POINT, recent_start + column, smoothed[row, column],
+                      deviation[row, column]))
+
+    means, counts = rolling_mean(values, 7)
+    weekly_columns = [days - 1 - 7 * week for week in reversed(range(TREND_WEEKS))]
+    weekly, weekly_counts = means[:, weekly_columns], counts[:, weekly_columns]
+    enough = (weekly_counts >= MIN_WEEK_READINGS).all(axis=1)
+    # 每周的变化都须达到平均每周所需变化的一半，一次性的水平变化不算趋势
+    min_step = min_rise / (2 * (TREND_WEEKS - 1))
+    steps = np.diff(weekly, axis=1)
+    change = weekly[:, -1] - weekly[:, 0]
+    trend_slopes = slopes(values[:, days - TREND_WEEKS * 7:])
+    for flag_type, selected in (
+        (VitalsFlagType.TREND_UP, enough & (steps >= min_step).all(axis=1) & (change >= min_rise)),
+        (VitalsFlagType.TREND_DOWN, enough & (steps <= -min_step).all(axis=1) & (-change >= min_rise)),
+    ):
+        for row in np.nonzero(selected)[0]:
+            flags.append((row, flag_type, days - 1, weekly[row, -1], trend_slopes[row]))
+    return flags
+
+
+def _epoch_days(column, dialect_name: str):
+    """时间列距1970-01-01的天数（在数据库中计算，避免逐行构造datetime）"""
+    if dialect_name == "postgresql":
+        return func.round(func.extract("epoch", column) / 86400)
+    return func.round(func.julianday(column) - 2440587.5)
+
+
+def _daily_rollups(metric: VitalMetric, patient_ids: np.ndarray, first_day: datetime.date, days: int):
+    """一批患者（已排序的编号数组）某指标 [first_day, first_day + days) 的日粒度汇总的查询条件"""
+    start = datetime.datetime.combine(first_day, datetime.time(), datetime.timezone.utc)
+    return (
+        VitalsRollup.metric == metric,
+        VitalsRollup.bucket == RollupBucket.DAY,
+        VitalsRollup.patient_id >= int(patient_ids[0]),
+        VitalsRollup.patient_id <= int(patient_ids[-1]),
+        VitalsRollup.bucket_start >= start,
+        VitalsRollup.bucket_start < start + datetime.timedelta(days=days),
+    )
+
+
+def _fetch_array(result, columns: int) -> np.ndarray:
+    # 逐值展开后一次构造数组；直接用 np.array(rows) 时NumPy会逐行探测Row对象的数组接口，慢一个数量级
+    return np.fromiter(itertools.chain.from_iterable(result), dtype=np.float64).reshape(-1, columns)
+
+
+def _positions(patient_ids: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """编号在 patient_ids 中的行号，以及是否属于 patient_ids（编号范围内的停用患者不参与分析）"""
+    positions = np.minimum(np.searchsorted(patient_ids, ids), len(patient_ids) - 1)
+    return positions, patient_ids[positions] == ids
+
+
+def load_baseline(connection: Connection, metric: VitalMetric, patient_ids: np.ndarray,
+                  first_day: datetime.date, days: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """在数据库中按患者汇总基线期的日均值，返回与 patient_ids 对齐的(天数, 日均值之和, 日均值平方和)"""
+    daily_mean = VitalsRollup.sum_value / VitalsRollup.count
+    data = _fetch_array(connection.execute(
+        select(VitalsRollup.patient_id, func.count(), func.sum(daily_mean), func.sum(daily_mean * daily_mean))
+        .where(*_daily_rollups(metric, patient_ids, first_day, days))
+        .group_by(VitalsRollup.patient_id)
+    ), 4)
+    baseline = tuple(np.zeros(len(patient_ids)) for _ in range(3))
+    positions, selected = _positions(patient_ids, data[:, 0].astype(np.int64))
+    for column, values in enumerate(baseline, start=1):
+        values[positions[selected]] = data[selected, column]
+    return baseline
+
+
+def load_daily_means(connection: Connection, metric: VitalMetric, patient_ids: np.ndarray,
+                     first_day: datetime.date, days: int) -> np.ndarray:
+    """读取一批患者某指标 [first_day, first_day + days) 的日均值，返回 患者 x 天 矩阵（无记录为NaN）"""
+    data = _fetch_array(connection.execute(
+        select(
+            VitalsRollup.patient_id,
+            _epoch_days(VitalsRollup.bucket_start, connection.dialect.name),
+            VitalsRollup.sum_value / VitalsRollup.count,
+        ).where(*_daily_rollups(metric, patient_ids, first_day, days))
+    ), 3)
+    matrix = np.full((len(patient_ids), days), np.nan)
+    positions, selected = _positions(patient_ids, data[:, 0].astype(np.int64))
+    day_index = data[:, 1].astype(np.int64) - (first_day - _EPOCH).days
+    matrix[positions[selected], day_index[selected]] = data[selected, 2]
+    return matrix
+
+
+def analyze_vitals(connection: Connection, as_of: datetime.date,
+                   metrics: Sequence[VitalMetric] = tuple(VitalMetric), days: int = ANALYSIS_DAYS,
+                   chunk_size: int = ANALYSIS_CHUNK_PATIENTS) -> Dict[str, int]:
+    """分析全部在职患者截至 as_of 前一天的 days 天日均值并写入提示，每块患者提交一次，返回各类型新增的提示数"""
+    first_day = as_of - datetime.timedelta(days=days)
+    window_first_day = as_of - datetime.timedelta(days=WINDOW_DAYS)
+    patient_ids = np.fromiter(
+        connection.execute(select(Patient.id).where(Patient.is_active.is_(True)).order_by(Patient.id)).scalars(),
+        dtype=np.int64,
+    )
+    connection.commit()
+    table = VitalsFlag.__table__
+    statement = insert_ignoring_conflicts(table, connection.dialect.name).returning(table.c.flag_type)
+    created = {flag_type.value: 0 for flag_type in VitalsFlagType}
+    for start in range(0, len(patient_ids), chunk_size):
+        chunk = patient_ids[start:start + chunk_size]
+        rows = []
+        for metric in metrics:
+            baseline = load_baseline(connection, metric, chunk, first_day, days - RECENT_DAYS)
+            values = load_daily_means(connection, metric, chunk, window_first_day, WINDOW_DAYS)
+            for row, flag_type, day, value, score in detect_flags(values, baseline, metric):
+                rows.append({
+                    "patient_id": int(chunk[row]), "metric": metric, "flag_type": flag_type,
+                    "event_date": _event_date(flag_type, window_first_day + datetime.timedelta(days=int(day))),
+                    "value": float(value), "score": float(score),
+                })
+        if rows:
+            for flag_type in connection.execute(statement, rows).scalars():
+                created[flag_type.value] += 1
+        connection.commit()
+    return created
+
+
+def _event_date(flag_type: VitalsFlagType, day: datetime.date) -> datetime.date:
+    """趋势提示的日期取所在周的周一，同一趋势每周只提示一次"""
+    if flag_type in (VitalsFlagType.TREND_UP, VitalsFlagType.TREND_DOWN):
+        return day - datetime.timedelta(days=day.weekday())
+    return day
@@ -0,0 +1,314 @@
+"""
+生命体征汇总：按患者、指标与时间粒度（小时/天/周）维护 count/min/max/sum/最新值
+
+- 写入健康记录时先在内存中按(患者, 指标, 粒度, 时间段)合并一批记录，再用多行
+  INSERT ... ON CONFLICT DO UPDATE 累加到汇总表，不需要先读取已有汇总
+- 批量上报不在请求中累加：新记录登记到 vitals_rollup_queue，由 scripts/drain_vitals_rollups.py
+  在请求之外分批出队累加；趋势查询把队列中该患者的记录与汇总行合并，结果不受出队进度影响
+- min/max 无法增量扣减：记录修改或删除时删除该患者所在周的汇总（周内的天、小时时间段一并删除），
+  再从原始记录重新计算这一周
+- 趋势查询按请求的时间跨度与分辨率选择粒度，一年的日粒度趋势每个指标最多读取366行
+- 时间段按UTC划分，不带时区的记录时间视为UTC
+"""
+import datetime
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import and_, case, delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.health_record import HealthRecord
+from app.models.vitals_rollup import RollupBucket, VitalMetric, VitalsRollup, VitalsRollupQueue
+from app.utils.bulk_insert import dialect_insert
+from app.utils.timeutils import as_utc
+
+REBUILD_BATCH_SIZE = 5000
+# 每次出队累加的记录数
+DRAIN_BATCH_SIZE = 5000
+# 未指定分辨率时，选择时间段数不超过此值的最细粒度
+MAX_TREND_POINTS = 400
+
+BUCKET_WIDTHS = {
+    RollupBucket.HOUR: datetime.timedelta(hours=1),
+    RollupBucket.DAY: datetime.timedelta(days=1),
+    RollupBucket.WEEK: datetime.timedelta(weeks=1),
+}
+METRIC_COLUMNS = [getattr(HealthRecord, metric.value) for metric in VitalMetric]
+ROLLUP_COLUMNS = [
+    "patient_id", "metric", "bucket", "bucket_start", "count",
+    "min_value", "max_value", "sum_value", "last_value", "last_recorded_at",
+]
+
+
+def bucket_start(moment: datetime.datetime, bucket: RollupBucket) -> datetime.datetime:
+    """时间所在时间段的起点（UTC）"""
+    moment = as_utc(moment).replace(minute=0, second=0, microsecond=0)
+    if bucket is RollupBucket.HOUR:
+        return moment
+    day = moment.replace(hour=0)
+    if bucket is RollupBucket.DAY:
+        return day
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def _bucket_starts(moment: datetime.datetime) -> tuple:
+    """(粒度名, 时间段起点)，粒度名为数据库中存储的枚举名"""
+    hour = moment.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    return (
+        (RollupBucket.HOUR.name, hour),
+        (RollupBucket.DAY.name, day),
+        (RollupBucket.WEEK.name, day - datetime.timedelta(days=day.weekday())),
+    )
+
+
+def _aggregate(records: Iterable[Mapping]) -> Dict[tuple, list]:
+    """按(患者, 指标名, 粒度名, 时间段)合并记录：[count, min, max, sum, 最新值, 最新记录时间]"""
+    aggregates = {}
+    metrics = [(metric.name, metric.value) for metric in VitalMetric]
+    for record in records:
+        moment = as_utc(record["record_date"])
+        starts = _bucket_starts(moment)
+        for metric, column in metrics:
+            value = record[column]
+            if value is None:
+                continue
+            for bucket, start in starts:
+                key = (record["patient_id"], metric, bucket, start)
+                aggregate = aggregates.get(key)
+                if aggregate is None:
+                    aggregates[key] = [1, value, value, value, value, moment]
+                    continue
+                aggregate[0] += 1
+                if value < aggregate[1]:
+                    aggregate[1] = value
+                if value > aggregate[2]:
+                    aggregate[2] = value
+                aggregate[3] += value
+                if moment >= aggregate[5]:
+                    aggregate[4], aggregate[5] = value, moment
+    return aggregates
+
+
+def _upsert_statement(dialect_name: str):
+    table = VitalsRollup.__table__
+    statement = dialect_insert(table, dialect_name)
+    excluded = statement.excluded
+    least, greatest = (func.least, func.greatest) if dialect_name == "postgresql" else (func.min, func.max)
+    newer = excluded.last_recorded_at >= table.c.last_recorded_at
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.patient_id, table.c.metric, table.c.bucket, table.c.bucket_start],
+        set_={
+            "count": table.c.count + excluded.count,
+            "min_value": least(table.c.min_value, excluded.min_value),
+            "max_value": greatest(table.c.max_value, excluded.max_value),
+            "sum_value": table.c.sum_value + excluded.sum_value,
+            "last_value": case((newer, excluded.last_value), else_=table.c.last_value),
+            "last_recorded_at": case((newer, excluded.last_recorded_at), else_=table.c.last_recorded_at),
+        },
+    )
+
+
+def apply_rollups(connection, records: Iterable[Mapping]) -> int:
+    """将一批新写入的健康记录累加到汇总表（记录需包含 patient_id、record_date 与各指标列），返回更新的汇总行数"""
+    aggregates = _aggregate(records)
+    if not aggregates:
+        return 0
+    # 每条记录对应多达18个汇总行：跳过Core逐行处理参数，时间值按方言格式化一次后按驱动的参数格式直接批量执行
+    dialect = connection.dialect
+    compiled = _upsert_statement(dialect.name).compile(dialect=dialect)
+    process = VitalsRollup.__table__.c.bucket_start.type.dialect_impl(dialect).bind_processor(dialect)
+    formatted = {}
+
+    def bind_datetime(value):
+        if process is None:
+            return value
+        result = formatted.get(value)
+        if result is None:
+            result = formatted[value] = process(value)
+        return result
+
+    # 按主键顺序写入，并发批次以相同顺序加锁，避免死锁
+    rows = []
+    for key in sorted(aggregates):
+        count, low, high, total, last, last_at = aggregates[key]
+        rows.append((key[0], key[1], key[2], bind_datetime(key[3]), count, low, high, total, last,
+                     bind_datetime(last_at)))
+    if not compiled.positional:
+        rows = [dict(zip(ROLLUP_COLUMNS, row)) for row in rows]
+    elif compiled.positiontup != ROLLUP_COLUMNS:
+        order = [ROLLUP_COLUMNS.index(name) for name in compiled.positiontup]
+        rows = [tuple(row[index] for index in order) for row in rows]
+    connection.exec_driver_sql(compiled.string, rows)
+    return len(rows)
+
+
+def enqueue_rollups(connection, records: List[tuple]) -> None:
+    """登记新写入的健康记录（(编号, 记录时间)），带生命体征的记录出队时再累加到汇总表
+
+    登记由数据库按编号从刚写入的记录中复制，不逐行绑定参数；记录时间范围条件使分区表只查相关分区。
+    """
+    if not records:
+        return
+    moments = [moment for _, moment in records]
+    queue = VitalsRollupQueue.__table__
+    connection.execute(queue.insert().from_select(
+        ["record_id", "patient_id", "record_date"],
+        select(HealthRecord.id, HealthRecord.patient_id, HealthRecord.record_date).where(
+            HealthRecord.id.in_([record_id for record_id, _ in records]),
+            HealthRecord.record_date.between(min(moments), max(moments)),
+            or_(*[column.isnot(None) for column in METRIC_COLUMNS]),
+        ),
+    ))
+
+
+def drain_rollup_queue(connection, limit: int = DRAIN_BATCH_SIZE) -> int:
+    """从队列中取出最多 limit 条记录累加到汇总表，返回出队数（调用方提交事务）
+
+    PostgreSQL 上以 SKIP LOCKED 锁定队列行，多个进程可同时出队；修改记录时重新计算所在周的汇总也会
+    先锁定这些队列行，两者不会重复累加同一条记录。
+    """
+    queue = VitalsRollupQueue.__table__
+    statement = (
+        select(queue.c.record_id, HealthRecord.patient_id, HealthRecord.record_date, *METRIC_COLUMNS)
+        .select_from(queue)
+        .outerjoin(HealthRecord, and_(
+            HealthRecord.id == queue.c.record_id, HealthRecord.record_date == queue.c.record_date
+        ))
+        .limit(limit)
+    )
+    if connection.dialect.name == "postgresql":
+        statement = statement.with_for_update(of=queue, skip_locked=True)
+    rows = connection.execute(statement).mappings().all()
+    if not rows:
+        return 0
+    # 已删除的记录只出队，不累加
+    apply_rollups(connection, [row for row in rows if row["patient_id"] is not None])
+    connection.execute(delete(queue).where(queue.c.record_id.in_([row["record_id"] for row in rows])))
+    return len(rows)
+
+
+def drain_all(connection, batch_size: int = DRAIN_BATCH_SIZE) -> int:
+    """分批出队直到队列中没有可处理的记录，每批提交一次，返回出队总数"""
+    total = 0
+    while True:
+        count = drain_rollup_queue(connection, batch_size)
+        connection.commit()
+        total += count
+        if count < batch_size:
+            return total
+
+
+def queued_records(db: Session, patient_id: int, start: datetime.datetime, end: datetime.datetime) -> list:
+    """患者在 [start, end) 内尚未出队累加的记录"""
+    queue = VitalsRollupQueue.__table__
+    return db.execute(
+        select(HealthRecord.patient_id, HealthRecord.record_date, *METRIC_COLUMNS)
+        .select_from(queue)
+        .join(HealthRecord, and_(
+            HealthRecord.id == queue.c.record_id, HealthRecord.record_date == queue.c.record_date
+        ))
+        .where(queue.c.patient_id == patient_id, queue.c.record_date >= start, queue.c.record_date < end)
+    ).mappings().all()
+
+
+def refresh_rollups(connection, patient_id: int, moments: Iterable[datetime.datetime]) -> None:
+    """按原始记录重新计算患者在这些时间所在周的汇总（记录修改或删除后调用），计入的记录一并出队"""
+    queue = VitalsRollupQueue.__table__
+    weeks = {}
+    for week in sorted({bucket_start(moment, RollupBucket.WEEK) for moment in moments}):
+        weeks[week] = connection.execute(
+            select(HealthRecord.id, HealthRecord.patient_id, HealthRecord.record_date, *METRIC_COLUMNS).where(
+                HealthRecord.patient_id == patient_id,
+                HealthRecord.record_date >= week,
+                HealthRecord.record_date < week + BUCKET_WIDTHS[RollupBucket.WEEK],
+            )
+        ).mappings().all()
+    # 先让计入的记录出队（正在出队的进程持有这些队列行时等待其提交），再删除并重新计算各周的汇总；
+    # 与出队进程一样先锁队列行、后锁汇总行，避免死锁
+    record_ids = [record["id"] for records in weeks.values() for record in records]
+    if record_ids:
+        connection.execute(delete(queue).where(queue.c.record_id.in_(record_ids)))
+    for week, records in weeks.items():
+        connection.execute(delete(VitalsRollup).where(
+            VitalsRollup.patient_id == patient_id,
+            VitalsRollup.bucket_start >= week,
+            VitalsRollup.bucket_start < week + BUCKET_WIDTHS[RollupBucket.WEEK],
+        ))
+        apply_rollups(connection, records)
+
+
+def rebuild_rollups(connection) -> int:
+    """清空并按全部健康记录重建汇总表（修复时使用，队列一并清空），返回处理的记录数"""
+    connection.execute(delete(VitalsRollupQueue))
+    connection.execute(delete(VitalsRollup))
+    result = connection.execution_options(yield_per=REBUILD_BATCH_SIZE).execute(
+        select(HealthRecord.patient_id, HealthRecord.record_date, *METRIC_COLUMNS)
+        .where(or_(*[column.isnot(None) for column in METRIC_COLUMNS]))
+    )
+    total = 0
+    for batch in result.partitions():
+        apply_rollups(connection, [row._mapping for row in batch])
+        total += len(batch)
+    return total
+
+
+def choose_bucket(start: datetime.datetime, end: datetime.datetime,
+                  resolution: Optional[datetime.timedelta] = None) -> RollupBucket:
+    """选择趋势查询的粒度
+
+    指定分辨率时取宽度不超过分辨率的最粗粒度；未指定时取时间段数不超过 MAX_TREND_POINTS 的最细粒度。
+    """
+    buckets = list(RollupBucket)
+    if resolution is not None:
+        fitting = [bucket for bucket in buckets if BUCKET_WIDTHS[bucket] <= resolution]
+        return fitting[-1] if fitting else RollupBucket.HOUR
+    for bucket in buckets:
+        if (end - start) / BUCKET_WIDTHS[bucket] <= MAX_TREND_POINTS:
+            return bucket
+    return RollupBucket.WEEK
+
+
+def load_trends(db: Session, patient_id: int, metrics: List[VitalMetric], bucket: RollupBucket,
+                start: datetime.datetime, end: datetime.datetime) -> Dict[str, List[dict]]:
+    """读取患者各指标在 [start, end) 内的汇总（包含 start 所在的时间段），合并尚未出队的记录，按时间排序"""
+    first, end = bucket_start(start, bucket), as_utc(end)
+    result = db.execute(
+        select(
+            VitalsRollup.metric, VitalsRollup.bucket_start, VitalsRollup.count, VitalsRollup.min_value,
+            VitalsRollup.max_value, VitalsRollup.sum_value, VitalsRollup.last_value, VitalsRollup.last_recorded_at,
+        ).where(
+            VitalsRollup.patient_id == patient_id,
+            VitalsRollup.metric.in_(metrics),
+            VitalsRollup.bucket == bucket,
+            VitalsRollup.bucket_start >= first,
+            VitalsRollup.bucket_start < end,
+        )
+    )
+    buckets = {}
+    for metric, start_at, count, low, high, total, last, last_at in result:
+        buckets[(metric.name, as_utc(start_at))] = [count, low, high, total, last, as_utc(last_at)]
+
+    # 最后一个时间段可能延伸到 end 之后，队列中的记录多取一个时间段再按时间段起点过滤
+    names = {metric.name for metric in metrics}
+    pending = _aggregate(queued_records(db, patient_id, first, end + BUCKET_WIDTHS[bucket]))
+    for (_, metric, bucket_name, start_at), (count, low, high, total, last, last_at) in pending.items():
+        if bucket_name != bucket.name or metric not in names or start_at >= end:
+            continue
+        aggregate = buckets.get((metric, start_at))
+        if aggregate is None:
+            buckets[(metric, start_at)] = [count, low, high, total, last, last_at]
+            continue
+        aggregate[0] += count
+        aggregate[1] = min(aggregate[1], low)
+        aggregate[2] = max(aggregate[2], high)
+        aggregate[3] += total
+        if last_at >= aggregate[5]:
+            aggregate[4], aggregate[5] = last, last_at
+
+    trends = {metric.value: [] for metric in metrics}
+    for (metric, start_at), (count, low, high, total, last, _) in sorted(buckets.items()):
+        trends[VitalMetric[metric].value].append({
+            "bucket_start": start_at, "count": count, "min": low, "max": high,
+            "avg": total / count, "last": last,
+        })
+    return trends
@@ -0,0 +1,41 @@
+"""
+生命体征夜间分析
+
+先把汇总队列中的记录累加到汇总表，再读取全部在职患者最近一段时间（默认365天）的日粒度汇总，
+计算滚动均值、斜率、基线z分数与EWMA，将趋势、突变与水平变化提示写入 vitals_flags。按患者分块处理，每块提交一次；同一天重复运行不会产生重复提示。
+
+用法: python scripts/analyze_vitals.py [--date YYYY-MM-DD] [--days 365] [--chunk 5000] [--metric systolic_pressure ...]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.models.vitals_rollup import VitalMetric
+from app.utils.vitals_analytics import ANALYSIS_CHUNK_PATIENTS, ANALYSIS_DAYS, analyze_vitals
+from app.utils.vitals_rollup import drain_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生命体征夜间分析")
+    parser.add_argument("--date", type=datetime.date.fromisoformat, default=datetime.date.today(),
+                        help="分析截至该日期前一天的数据，默认今天")
+    parser.add_argument("--days", type=int, default=ANALYSIS_DAYS)
+    parser.add_argument("--chunk", type=int, default=ANALYSIS_CHUNK_PATIENTS, help="每批分析的患者数")
+    parser.add_argument("--metric", type=VitalMetric, action="append", help="只分析指定指标，可重复")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        drain_all(connection)
+        created = analyze_vitals(connection, args.date, args.metric or tuple(VitalMetric), args.days, args.chunk)
+    summary = "，".join(f"{flag_type} {count}" for flag_type, count in created.items())
+    print(f"分析完成（截至 {args.date}），新增提示: {summary}，耗时 {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+回填患者姓名拼音：为升级前已存在的患者生成全拼与首字母（新增/修改患者时由应用自动维护）
+
+按主键分批读取并更新，每批单独提交，可在服务运行期间执行，中断后重新执行会从未回填的患者继续。
+
+用法: python scripts/backfill_pinyin.py [--all] [--batch-size 1000]
+"""
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from sqlalchemy import bindparam, select, update
+
+
+def backfill_pinyin(engine, only_missing: bool = True, batch_size: int = 1000) -> int:
+    """按主键分批回填拼音，返回更新的患者数"""
+    from app.models.patient import Patient
+    from app.utils.pinyin import lazy_pinyin, name_pinyin
+
+    if lazy_pinyin is None:
+        raise RuntimeError("未安装 pypinyin，请先执行 pip install pypinyin")
+
+    statement = (
+        update(Patient.__table__)
+        .where(Patient.__table__.c.id == bindparam("patient_key"))
+        .values(name_pinyin=bindparam("pinyin"), name_initials=bindparam("initials"))
+    )
+    last_id = 0
+    total = 0
+    while True:
+        query = select(Patient.id, Patient.name).where(Patient.id > last_id)
+        if only_missing:
+            query = query.where(Patient.name_pinyin.is_(None))
+        with engine.begin() as connection:
+            rows = connection.execute(query.order_by(Patient.id).limit(batch_size)).all()
+            if not rows:
+                return total
+            params = []
+            for patient_key, name in rows:
+                pinyin, initials = name_pinyin(name)
+                params.append({"patient_key": patient_key, "pinyin": pinyin, "initials": initials})
+            connection.execute(statement, params)
+        last_id = rows[-1].id
+        total += len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回填患者姓名拼音")
+    parser.add_argument("--all", action="store_true", help="重新生成所有患者的拼音（默认只处理尚未生成的）")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from app.core.database import engine
+
+    started = time.perf_counter()
+    total = backfill_pinyin(engine, only_missing=not args.all, batch_size=args.batch_size)
+    print(f"已回填 {total} 名患者的拼音，耗时 {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+可预约时间段查询基准测试：--doctors 名医生、--days 天预约下 GET /api/appointments/availability 的延迟
+
+直接写入SQLite生成数据：医生平均分布在5个科室（每个科室2个专业），约20%的医生配置了自己的出诊时间，
+其余使用默认出诊时间；出诊时间内每个30分钟时段按 --occupancy 的概率已被预约（少数已取消或爽约，
+不占用时间段），最后一个科室在前4周全部排满。以下场景各请求 --requests 次：
+- 全部医生：最早的20个30分钟时间段
+- 按科室：最早的10个30分钟时间段
+- 按专业：最早的10个60分钟时间段
+- 排满的科室：从排满的最后一周中随机时刻开始查询两周，最早的空闲时间段在一周之后（扫描线需多次推进）
+查询开始时间为预约范围内的随机时刻（含夜间和周末）。检查返回的时间段都在出诊时间内、不与已有预约重叠。任一场景p95超过 --max-ms 或结果有误时以非零状态退出。
+
+用法: python scripts/bench_appointment_availability.py [--doctors 200] [--days 182] [--requests 200]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo
+
+from bench_common import ServerProcess, percentile, prepare_database
+
+FIRST_DAY = datetime.date(2030, 1, 7)  # 周一
+SLOT = datetime.timedelta(minutes=30)
+DEPARTMENTS = ("内科", "外科", "妇产科", "眼科", "儿科")
+FULL_DAYS = 28  # 最后一个科室全部排满的天数
+# 自定义出诊时间：周一、三、五 09:00-12:00、14:00-18:00
+CUSTOM_HOURS = [(weekday, start, end) for weekday in (0, 2, 4)
+                for start, end in (("09:00", "12:00"), ("14:00", "18:00"))]
+STATUSES = ("SCHEDULED",) * 6 + ("CONFIRMED", "COMPLETED", "CANCELLED", "NO_SHOW")
+
+
+def sqlite_time(moment: datetime.datetime) -> str:
+    return moment.astimezone(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.000000")
+
+
+def populate(path: str, doctors: int, days: int, occupancy: float, zone: ZoneInfo) -> list:
+    """写入医生、出诊时间与预约，返回 [(医生编号, 科室, 专业, 每周出诊时间)]"""
+    from app.utils.appointment_availability import default_weekly_hours, parse_hours
+
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("INSERT INTO patients (patient_id, name, gender, birth_date, is_active) "
+                 "VALUES ('P0000001', '患者1', 'OTHER', '1980-01-01', 1)")
+    defaults = default_weekly_hours()
+    custom = {}
+    for weekday, start, end in CUSTOM_HOURS:
+        custom.setdefault(weekday, []).append(parse_hours(f"{start}-{end}"))
+
+    created = []
+    for index in range(doctors):
+        department = DEPARTMENTS[index % len(DEPARTMENTS)]
+        specialty = f"{department}{index // len(DEPARTMENTS) % 2 + 1}组"
+        doctor_id = conn.execute(
+            "INSERT INTO users (username, email, hashed_password, full_name, role, is_active, is_verified, "
+            "department, specialty) VALUES (?, ?, '!', ?, 'DOCTOR', 1, 1, ?, ?)",
+            (f"doctor{index}", f"doctor{index}@bench.local", f"医生{index}", department, specialty),
+        ).lastrowid
+        hours = defaults
+        if index % 5 == 1:
+            hours = custom
+            conn.executemany(
+                "INSERT INTO doctor_working_hours (doctor_id, weekday, start_time, end_time) VALUES (?, ?, ?, ?)",
+                [(doctor_id, weekday, start + ":00.000000", end + ":00.000000") for weekday, start, end in CUSTOM_HOURS],
+            )
+        created.append((doctor_id, department, specialty, hours))
+
+        rows = []
+        for offset in range(days):
+            day = FIRST_DAY + datetime.timedelta(days=offset)
+            full = department == DEPARTMENTS[-1] and offset < FULL_DAYS
+            for start, end in hours.get(day.weekday(), ()):
+                moment = datetime.datetime.combine(day, start, zone)
+                window_end = datetime.datetime.combine(day, end, zone)
+                while moment + SLOT <= window_end:
+                    if full or rng.random() < occupancy:
+                        rows.append((doctor_id, rng.choice(STATUSES) if not full else "SCHEDULED",
+                                     sqlite_time(moment), sqlite_time(moment + SLOT)))
+                    moment += SLOT
+        conn.executemany(
+            "INSERT INTO appointments (patient_id, doctor_id, appointment_type, status, scheduled_start, "
+            "scheduled_end, title, reminder_sent) VALUES (1, ?, 'CONSULTATION', ?, ?, ?, '门诊', 0)",
+            rows,
+        )
+    conn.commit()
+    conn.close()
+    return created
+
+
+def check_slots(path: str, slots: list, hours: dict, duration: datetime.timedelta, zone: ZoneInfo) -> int:
+    """返回不在出诊时间内或与已占用时间段重叠的时间段数"""
+    conn = sqlite3.connect(path)
+    errors = 0
+    for slot in slots:
+        start = datetime.datetime.fromisoformat(slot["start"].replace("Z", "+00:00"))
+        end = datetime.datetime.fromisoformat(slot["end"].replace("Z", "+00:00"))
+        local_start, local_end = start.astimezone(zone), end.astimezone(zone)
+        inside = any(
+            window_start <= local_start.time() and local_end.time() <= window_end
+            and local_start.date() == local_end.date()
+            for window_start, window_end in hours[slot["doctor_id"]].get(local_start.weekday(), ())
+        )
+        overlap = conn.execute(
+            "SELECT COUNT(*) FROM appointments WHERE doctor_id = ? "
+            "AND status IN ('SCHEDULED', 'CONFIRMED', 'IN_PROGRESS', 'COMPLETED') "
+            "AND scheduled_start < ? AND scheduled_end > ?",
+            (slot["doctor_id"], sqlite_time(end), sqlite_time(start)),
+        ).fetchone()[0]
+        if not inside or overlap or end - start != duration:
+            errors += 1
+    conn.close()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="可预约时间段查询基准测试")
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--days", type=int, default=182, help="生成预约的天数（约6个月）")
+    parser.add_argument("--occupancy", type=float, default=0.8, help="出诊时段已被预约的比例")
+    parser.add_argument("--requests", type=int, default=200, help="每个场景的请求数")
+    parser.add_argument("--max-ms", type=float, default=50.0, help="各场景p95延迟上限（毫秒）")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "availability.db")
+    database_url = "sqlite:///" + path
+    prepare_database(database_url, users=[{"username": "bench_nurse", "password": "x", "role": "NURSE"}])
+    os.environ.update(DATABASE_URL=database_url, SQL_STATS_ENABLED="false")
+    from app.core.config import settings
+    zone = ZoneInfo(settings.clinic_timezone)
+
+    doctors = populate(path, args.doctors, args.days, args.occupancy, zone)
+    conn = sqlite3.connect(path)
+    bookings = conn.execute("SELECT COUNT(*) FROM appointments").fetchone()[0]
+    conn.close()
+    print(f"{len(doctors)} 名医生，{args.days} 天，{bookings} 个预约")
+    hours = {doctor_id: weekly for doctor_id, _, _, weekly in doctors}
+
+    # (说明, 过滤条件, 时长（分钟）, 时间段数, 排满的科室)
+    scenarios = [
+        ("全部医生", {}, 30, 20, False),
+        ("按科室", {"department": DEPARTMENTS[0]}, 30, 10, False),
+        ("按专业", {"specialty": doctors[0][2]}, 60, 10, False),
+        ("排满的科室", {"department": DEPARTMENTS[-1]}, 30, 10, True),
+    ]
+    # 排满的科室从排满的最后一周开始查询两周，最早的空闲时间段应在排满之后
+    first_free = datetime.datetime.combine(FIRST_DAY + datetime.timedelta(days=FULL_DAYS), datetime.time(), zone)
+    rng = random.Random(11)
+    failed = False
+    with ServerProcess(env={"DATABASE_URL": database_url, "SQL_STATS_ENABLED": "false"}) as server:
+        headers = server.login("bench_nurse", "x")
+        for name, filters, duration, limit, full in scenarios:
+            timings = []
+            errors = missing = 0
+            for _ in range(args.requests):
+                if full:
+                    start = first_free - datetime.timedelta(days=7) + datetime.timedelta(minutes=rng.randrange(7 * 24 * 60))
+                    query = dict(filters, end=(start + datetime.timedelta(days=14)).isoformat())
+                else:
+                    start = datetime.datetime.combine(FIRST_DAY, datetime.time(), zone) + datetime.timedelta(
+                        minutes=rng.randrange((args.days - 14) * 24 * 60))
+                    query = dict(filters)
+                query.update(start=start.isoformat(), duration=duration, limit=limit)
+                started = time.perf_counter()
+                status, body = server.request("GET", "/api/appointments/availability?" + urlencode(query),
+                                              headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    raise RuntimeError(f"查询失败: {status} {body!r}")
+                slots = json.loads(body)
+                if len(slots) < limit:
+                    missing += 1
+                errors += check_slots(path, slots, hours, datetime.timedelta(minutes=duration), zone)
+                if full:
+                    errors += sum(datetime.datetime.fromisoformat(slot["start"].replace("Z", "+00:00")) < first_free
+                                  for slot in slots)
+            p95 = percentile(timings, 95)
+            print(f"  {name:<6}: p50 {percentile(timings, 50):.2f}ms  p95 {p95:.2f}ms  "
+                  f"时间段不足 {missing} 次，错误时间段 {errors} 个")
+            if p95 > args.max_ms or errors or missing:
+                failed = True
+
+    from sqlalchemy.dialects import sqlite
+    from app.utils.appointment_availability import busy_query
+    start = datetime.datetime.combine(FIRST_DAY, datetime.time(), zone).astimezone(datetime.timezone.utc)
+    query = busy_query([doctor[0] for doctor in doctors], start, start + datetime.timedelta(days=1))
+    statement = query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    raw = sqlite3.connect(path)
+    plan = raw.execute("EXPLAIN QUERY PLAN " + str(statement)).fetchall()
+    raw.close()
+    print("读取占用时间段的执行计划: " + "; ".join(row[-1] for row in plan))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
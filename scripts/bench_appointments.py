@@ -0,0 +1,147 @@
+"""
+预约基准测试：医生历史预约数增长时的预约创建延迟，以及并发预约同一时间段的冲突检查
+
+1. 延迟：为同一名医生依次写入 --history 指定数量的历史预约（直接写入SQLite），每个规模下通过
+   POST /api/appointments/ 创建 --bookings 个互不重叠的新预约，统计p50/p95延迟；
+   并输出时间冲突检查语句的执行计划
+2. 并发：启动 --workers 个进程，每轮由 --concurrency 个线程同时预约同一医生的同一时间段，
+   每轮必须恰好一个成功、其余返回400
+最大规模的p50超过最小规模的 --max-growth 倍，或并发检查出现重复预约时以非零状态退出。
+
+用法: python scripts/bench_appointments.py [--history 0,1000,10000,50000] [--bookings 200] [--concurrency 20]
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from bench_common import ServerProcess, percentile, prepare_database
+
+SLOT = datetime.timedelta(minutes=30)
+HISTORY_END = datetime.datetime(2027, 12, 31, 8)  # 历史预约从这一天往前排
+BOOKING_START = datetime.datetime(2028, 1, 1, 8)
+RACE_START = datetime.datetime(2029, 1, 1, 8)
+STATUSES = ("COMPLETED", "COMPLETED", "COMPLETED", "CANCELLED", "NO_SHOW")
+
+
+def sqlite_time(moment: datetime.datetime) -> str:
+    return moment.strftime("%Y-%m-%d %H:%M:%S.000000")
+
+
+def add_history(path: str, doctor_id: int, first: int, last: int) -> None:
+    """为医生写入第 first 到 last-1 个历史预约（从 HISTORY_END 往前每天8个30分钟的时段，部分已取消或爽约）"""
+    conn = sqlite3.connect(path)
+    rows = []
+    for index in range(first, last):
+        start = HISTORY_END - datetime.timedelta(days=index // 8) + SLOT * (index % 8)
+        rows.append((1, doctor_id, "CONSULTATION", STATUSES[index % len(STATUSES)], sqlite_time(start),
+                     sqlite_time(start + SLOT), f"历史预约{index}", 0))
+    conn.executemany(
+        "INSERT INTO appointments (patient_id, doctor_id, appointment_type, status, scheduled_start, "
+        "scheduled_end, title, reminder_sent) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+
+
+def booking(doctor_id: int, start: datetime.datetime) -> dict:
+    return {"patient_id": 1, "doctor_id": doctor_id, "appointment_type": "consultation", "title": "复查",
+            "scheduled_start": start.isoformat() + "Z", "scheduled_end": (start + SLOT).isoformat() + "Z"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="预约基准测试")
+    parser.add_argument("--history", default="0,1000,10000,50000", help="逐步增加到的历史预约数，逗号分隔")
+    parser.add_argument("--bookings", type=int, default=200, help="每个规模下创建的预约数")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=20, help="每轮同时预约同一时间段的请求数")
+    parser.add_argument("--rounds", type=int, default=20, help="并发预约的轮数")
+    parser.add_argument("--max-growth", type=float, default=1.5, help="最大规模与最小规模p50之比的上限")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "appointments.db")
+    database_url = "sqlite:///" + path
+    prepare_database(database_url, users=[{"username": "bench_doctor", "password": "x"}])
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("INSERT INTO patients (patient_id, name, gender, birth_date, is_active) "
+                 "VALUES ('P0000001', '患者1', 'OTHER', '1980-01-01', 1)")
+    doctor_id = conn.execute("SELECT id FROM users WHERE username = 'bench_doctor'").fetchone()[0]
+    conn.commit()
+    conn.close()
+
+    env = {"DATABASE_URL": database_url, "SQL_STATS_ENABLED": "false"}
+    sizes = [int(size) for size in args.history.split(",")]
+    medians = []
+    booked = 0
+    with ServerProcess(env=env) as server:
+        headers = server.login("bench_doctor", "x")
+        written = 0
+        print(f"预约创建延迟（每个规模 {args.bookings} 次）")
+        for size in sizes:
+            add_history(path, doctor_id, written, size)
+            written = size
+            timings = []
+            for _ in range(args.bookings):
+                start = BOOKING_START + SLOT * booked
+                booked += 1
+                started = time.perf_counter()
+                status, body = server.request("POST", "/api/appointments/", booking(doctor_id, start), headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    raise RuntimeError(f"预约失败: {status} {body!r}")
+            medians.append(percentile(timings, 50))
+            print(f"  历史预约 {size:>7}: p50 {percentile(timings, 50):.2f}ms  p95 {percentile(timings, 95):.2f}ms")
+
+    os.environ["DATABASE_URL"] = database_url
+    from sqlalchemy.dialects import sqlite
+    from app.utils.appointment_booking import overlap_query
+    start = BOOKING_START.replace(tzinfo=datetime.timezone.utc)
+    statement = overlap_query(doctor_id, start, start + SLOT).compile(
+        dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    raw = sqlite3.connect(path)
+    plan = raw.execute("EXPLAIN QUERY PLAN " + str(statement)).fetchall()
+    raw.close()
+    print("时间冲突检查的执行计划: " + "; ".join(row[-1] for row in plan))
+
+    failed_rounds = 0
+    with ServerProcess(env=env, workers=args.workers) as server:
+        headers = server.login("bench_doctor", "x")
+        for round_index in range(args.rounds):
+            payload = booking(doctor_id, RACE_START + SLOT * round_index)
+            statuses = []
+            barrier = threading.Barrier(args.concurrency)
+
+            def attempt():
+                barrier.wait()
+                statuses.append(server.request("POST", "/api/appointments/", payload, headers)[0])
+
+            threads = [threading.Thread(target=attempt) for _ in range(args.concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            if statuses.count(200) != 1 or statuses.count(400) != args.concurrency - 1:
+                failed_rounds += 1
+                print(f"  第{round_index + 1}轮: 状态码 {sorted(statuses)}")
+        status, body = server.request(
+            "GET", f"/api/appointments/?doctor_id={doctor_id}&scheduled_start_from={RACE_START.isoformat()}"
+            f"&limit=1000", headers=headers)
+        stored = len(json.loads(body))
+    print(f"并发预约: {args.rounds} 轮 x {args.concurrency} 个请求（{args.workers} 个进程），"
+          f"保存 {stored} 个预约，{args.rounds - failed_rounds} 轮恰好一个成功")
+
+    growth = medians[-1] / medians[0]
+    print(f"p50 增长: {growth:.2f} 倍（{sizes[0]} -> {sizes[-1]} 条历史预约）")
+    if growth > args.max_growth or failed_rounds or stored != args.rounds:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
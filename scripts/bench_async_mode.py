@@ -0,0 +1,99 @@
+"""
+同步/异步数据库模式吞吐量对比
+
+在SQLite上通过语句跟踪回调为每条SQL注入固定延迟，模拟慢数据库。
+延迟发生在驱动执行线程中（同步模式为线程池线程，异步模式为aiosqlite工作线程），
+与真实数据库的网络等待行为一致。
+
+用法: python scripts/bench_async_mode.py --concurrency 1000 --db-latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# 作为uvicorn工厂模块导入时也能找到bench_common
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_common import ServerProcess, percentile, prepare_database
+
+
+def create_app():
+    """uvicorn工厂函数：为数据库连接注入延迟后返回应用"""
+    import sqlite3
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app.main import app
+
+    delay = float(os.environ.get("BENCH_DB_LATENCY_MS", "0")) / 1000.0
+
+    def slow_statement(_statement):
+        time.sleep(delay)
+
+    @event.listens_for(Engine, "connect")
+    def _install_delay(dbapi_connection, _record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            dbapi_connection.set_trace_callback(slow_statement)
+        else:
+            # aiosqlite：回调需要在其专用线程中注册
+            inner = dbapi_connection._connection
+            dbapi_connection.await_(inner._execute(inner._conn.set_trace_callback, slow_statement))
+
+    return app
+
+
+async def _storm(server, path, headers, concurrency, total):
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = await server.async_get(path, headers)
+            except OSError:
+                status = 0
+            if status != 200:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def run_mode(db_async: bool, args, database_url: str) -> None:
+    env = {
+        "DATABASE_URL": database_url,
+        "DB_ASYNC": "true" if db_async else "false",
+        "BENCH_DB_LATENCY_MS": str(args.db_latency_ms),
+        "DEBUG": "false",
+    }
+    with ServerProcess(env, app="scripts.bench_async_mode:create_app", factory=True) as server:
+        headers = server.login("bench", "bench123")
+        elapsed, latencies, errors = asyncio.run(
+            _storm(server, "/api/patients/?limit=10", headers, args.concurrency, args.requests)
+        )
+    print(f"{'异步' if db_async else '同步'}模式: {args.requests / elapsed:.1f} 请求/秒, "
+          f"p50={percentile(latencies, 50):.0f}ms p99={percentile(latencies, 99):.0f}ms, 失败 {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="同步/异步数据库模式吞吐量对比")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--db-latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    prepare_database(database_url, [{"username": "bench", "password": "bench123"}])
+    print(f"并发 {args.concurrency}, 请求数 {args.requests}, 每条SQL延迟 {args.db_latency_ms}ms")
+    run_mode(False, args, database_url)
+    run_mode(True, args, database_url)
+
+
+if __name__ == "__main__":
+    main()
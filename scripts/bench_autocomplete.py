@@ -0,0 +1,81 @@
+"""
+姓名自动补全基准测试：统计汉字、全拼、首字母前缀补全的耗时
+
+在SQLite上生成指定数量的患者（默认100万），用 backfill_pinyin 回填拼音后，
+在进程内按用户逐字输入的方式执行自动补全，统计p50/p99。整体p99超过 --p99-target-ms 时以非零状态退出。
+
+用法: python scripts/bench_autocomplete.py [--patients 1000000] [--p99-target-ms 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bench_common import percentile, prepare_database
+from bench_patient_search import populate
+
+
+def build_workload(samples: list) -> list:
+    """模拟逐字输入：(形态, 输入文本)"""
+    from app.utils.pinyin import name_pinyin
+
+    workload = []
+    for _, _, name, _, _ in samples:
+        pinyin, initials = name_pinyin(name)
+        workload += [("汉字", name[:length]) for length in range(1, len(name) + 1)]
+        if pinyin:
+            workload += [("全拼", pinyin[:length]) for length in range(2, len(pinyin) + 1, 2)]
+            workload += [("首字母", initials[:length]) for length in range(1, len(initials) + 1)]
+    random.Random(7).shuffle(workload)
+    return workload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="姓名自动补全基准测试")
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=10, help="每次补全返回的最大条数")
+    parser.add_argument("--p99-target-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "autocomplete.db")
+    database_url = "sqlite:///" + path
+    os.environ["DATABASE_URL"] = database_url
+    prepare_database(database_url)
+    samples = populate(path, args.patients)
+
+    from backfill_pinyin import backfill_pinyin
+    from app.core.database import SessionLocal, engine
+    from app.utils.pinyin import autocomplete_patients
+
+    started = time.perf_counter()
+    backfill_pinyin(engine, batch_size=20000)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    print(f"拼音回填耗时 {time.perf_counter() - started:.0f}s")
+
+    latencies = {}
+    db = SessionLocal()
+    try:
+        for shape, text in build_workload(samples):
+            started = time.perf_counter()
+            autocomplete_patients(db, text, args.limit)
+            latencies.setdefault(shape, []).append((time.perf_counter() - started) * 1000)
+    finally:
+        db.close()
+
+    for shape, values in latencies.items():
+        print(f"  {shape:6s} p50={percentile(values, 50):6.2f}ms p99={percentile(values, 99):6.2f}ms")
+    overall = [value for values in latencies.values() for value in values]
+    p99 = percentile(overall, 99)
+    print(f"  整体   p50={percentile(overall, 50):6.2f}ms p99={p99:6.2f}ms")
+
+    print(f"\n患者数 {args.patients}, p99目标 {args.p99_target_ms:.0f}ms")
+    if p99 > args.p99_target_ms:
+        print("超出p99目标")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+批量分配基准测试：比较逐个患者调用分配接口与一次批量分配的耗时
+
+在SQLite上生成指定数量的患者（默认5000），启动独立的uvicorn进程，先对其中 --sample 名患者逐个调用
+POST /api/patient-health-plans/ 并按平均耗时推算全部患者所需时间，再用 POST /api/patient-health-plans/bulk
+一次为全部患者分配另一方案。批量分配结果与预期不符时以非零状态退出。
+
+用法: python scripts/bench_bulk_assign.py [--patients 5000] [--sample 200]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bench_common import ServerProcess, prepare_database
+
+
+def populate(path: str, count: int) -> None:
+    """直接写入SQLite生成患者与两个公开方案"""
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO patients (id, patient_id, name, gender, birth_date, is_active) "
+        "VALUES (?, ?, ?, 'OTHER', '1970-01-01', 1)",
+        [(i, f"P{i:07d}", f"糖尿病患者{i}") for i in range(1, count + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO health_plans (id, title, plan_type, status, instructions, created_by, is_template, is_public) "
+        "VALUES (?, ?, 'DIET', 'ACTIVE', '控制碳水化合物摄入', 1, 1, 1)",
+        [(1, "糖尿病饮食管理方案"), (2, "糖尿病运动管理方案")],
+    )
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量分配基准测试")
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--sample", type=int, default=200, help="逐个分配的抽样患者数")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    database_url = "sqlite:///" + os.path.join(directory, "bulk.db")
+    prepare_database(database_url, users=[{"username": "bench_doctor", "password": "bench-password"}])
+    populate(os.path.join(directory, "bulk.db"), args.patients)
+
+    env = {"DATABASE_URL": database_url, "SQL_STATS_ENABLED": "false"}
+    with ServerProcess(env=env) as server:
+        headers = server.login("bench_doctor", "bench-password")
+
+        started = time.perf_counter()
+        for patient_id in range(1, args.sample + 1):
+            status, body = server.request("POST", "/api/patient-health-plans/", headers=headers, body={
+                "patient_id": patient_id, "health_plan_id": 1, "start_date": "2026-01-01",
+            })
+            if status != 200:
+                print(f"分配失败: {status} {body!r}")
+                sys.exit(1)
+        single = (time.perf_counter() - started) / args.sample
+
+        started = time.perf_counter()
+        status, body = server.request("POST", "/api/patient-health-plans/bulk", headers=headers, body={
+            "health_plan_id": 2, "patient_ids": list(range(1, args.patients + 1)), "start_date": "2026-01-01",
+        })
+        bulk = time.perf_counter() - started
+
+    result = json.loads(body)
+    print(f"患者数 {args.patients}")
+    print(f"  逐个分配: 平均 {single * 1000:.1f}ms/人，推算全部 {single * args.patients:.1f}s")
+    print(f"  批量分配: {bulk:.2f}s（状态 {status}，分配 {result.get('assigned')} 人）")
+    if status != 200 or result["assigned"] != args.patients:
+        print("批量分配结果与预期不符")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
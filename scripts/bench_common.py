@@ -0,0 +1,126 @@
+"""
+基准测试公共工具：启动独立的uvicorn进程并发送HTTP请求
+"""
+import asyncio
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+
+def percentile(values, pct: float) -> float:
+    """计算百分位数（毫秒等任意单位）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def free_port() -> int:
+    """获取一个空闲端口"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(database_url: str, users=()) -> None:
+    """在独立子进程中建表并创建用户，避免污染当前进程的配置"""
+    code = (
+        "import sys, json; sys.path.append(%r)\n"
+        "from app.core.database import Base, engine, SessionLocal\n"
+        "import app.models\n"
+        "from app.models.user import User, UserRole\n"
+        "from app.core.security import get_password_hash\n"
+        "Base.metadata.create_all(bind=engine)\n"
+        "db = SessionLocal()\n"
+        "for u in json.loads(sys.argv[1]):\n"
+        "    if not db.query(User).filter(User.username == u['username']).first():\n"
+        "        db.add(User(username=u['username'], email=u['username'] + '@bench.local',\n"
+        "                    full_name=u['username'], role=UserRole[u.get('role', 'DOCTOR')],\n"
+        "                    hashed_password=get_password_hash(u['password'])))\n"
+        "db.commit()\n"
+    ) % PROJECT_ROOT
+    env = dict(os.environ, DATABASE_URL=database_url)
+    subprocess.run([sys.executable, "-c", code, json.dumps(list(users))], env=env, check=True)
+
+
+class ServerProcess:
+    """以子进程方式运行应用，退出上下文时终止"""
+
+    def __init__(self, env: Optional[Dict[str, str]] = None, workers: int = 1,
+                 app: str = "app.main:app", factory: bool = False):
+        self.port = free_port()
+        self.env = dict(os.environ, **(env or {}))
+        self.workers = workers
+        self.app = app
+        self.factory = factory
+        self.process = None
+
+    def __enter__(self) -> "ServerProcess":
+        command = [sys.executable, "-m", "uvicorn", self.app,
+                   "--host", "127.0.0.1", "--port", str(self.port),
+                   "--workers", str(self.workers), "--log-level", "warning"]
+        if self.factory:
+            command.append("--factory")
+        self.process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=self.env)
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                status, _ = self.request("GET", "/health")
+                if status == 200:
+                    return self
+            except OSError:
+                time.sleep(0.1)
+        self.__exit__(None, None, None)
+        raise RuntimeError("服务器启动超时")
+
+    def __exit__(self, *exc) -> None:
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+
+    def request(self, method: str, path: str, body=None, headers=None, form=None) -> Tuple[int, bytes]:
+        """发送一次同步HTTP请求，返回(状态码, 响应体)"""
+        headers = dict(headers or {})
+        if form is not None:
+            body = urlencode(form)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif body is not None and not isinstance(body, (bytes, str)):
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def login(self, username: str, password: str) -> Dict[str, str]:
+        """登录并返回认证请求头"""
+        status, body = self.request("POST", "/api/auth/login",
+                                    form={"username": username, "password": password})
+        if status != 200:
+            raise RuntimeError(f"登录失败: {status} {body!r}")
+        return {"Authorization": "Bearer " + json.loads(body)["access_token"]}
+
+    async def async_get(self, path: str, headers=None) -> int:
+        """使用asyncio原始连接发送GET请求，用于高并发场景"""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        lines = [f"GET {path} HTTP/1.1", "Host: 127.0.0.1", "Connection: close"]
+        lines += [f"{key}: {value}" for key, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        writer.close()
+        return int(status_line.split()[1])
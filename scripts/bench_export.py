@@ -0,0 +1,115 @@
+"""
+流式导出基准测试：统计导出耗时、首字节时间与服务进程内存峰值
+
+在SQLite上生成指定数量的患者（默认100万），启动独立的uvicorn进程，
+通过 GET /api/patients/export 分别以CSV、NDJSON与gzip压缩的CSV流式读取全部患者，
+核对导出行数并读取服务进程的内存峰值（/proc/<pid>/status 的 VmHWM）。
+内存峰值超过 --max-rss-mb 或行数不符时以非零状态退出。
+
+用法: python scripts/bench_export.py [--patients 1000000] [--max-rss-mb 150]
+"""
+import argparse
+import datetime
+import http.client
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+
+from bench_common import ServerProcess, prepare_database
+
+VARIANTS = (("csv", "format=csv"), ("ndjson", "format=ndjson"), ("csv+gzip", "format=csv&gzip=true"))
+
+
+def populate(path: str, count: int) -> None:
+    """直接写入SQLite生成患者"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    start = datetime.datetime(2020, 1, 1)
+    batch_size = 50000
+    for first in range(1, count + 1, batch_size):
+        rows = [
+            (i, f"P{i:07d}", f"患者{i}", f"13{i:09d}", f"11010119{i:09d}X", "北京市东城区某某街道",
+             (start + datetime.timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"))
+            for i in range(first, min(first + batch_size, count + 1))
+        ]
+        conn.executemany(
+            "INSERT INTO patients (id, patient_id, name, gender, birth_date, phone, id_card, address, "
+            "height, weight, is_active, created_at) "
+            "VALUES (?, ?, ?, 'OTHER', '1980-01-01', ?, ?, ?, 170.5, 65.0, 1, ?)",
+            rows,
+        )
+        conn.commit()
+    conn.close()
+
+
+def peak_rss_mb(pid: int) -> float:
+    """进程内存峰值（MB）"""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def export(server: ServerProcess, query: str, headers) -> tuple:
+    """流式读取导出内容，返回(状态码, 行数, 字节数, 首字节耗时, 总耗时)"""
+    compressed = "gzip=true" in query
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=600)
+    started = time.perf_counter()
+    first_byte = None
+    lines = size = 0
+    try:
+        conn.request("GET", "/api/patients/export?" + query, headers=headers)
+        response = conn.getresponse()
+        while True:
+            chunk = response.read1(64 * 1024)
+            if not chunk:
+                break
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            size += len(chunk)
+            lines += (decompressor.decompress(chunk) if compressed else chunk).count(b"\n")
+        return response.status, lines, size, first_byte or 0.0, time.perf_counter() - started
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式导出基准测试")
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--max-rss-mb", type=float, default=150, help="服务进程内存峰值上限")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "export.db")
+    database_url = "sqlite:///" + path
+    prepare_database(database_url, users=[{"username": "bench_doctor", "password": "bench-password"}])
+    populate(path, args.patients)
+
+    failed = False
+    env = {"DATABASE_URL": database_url, "SQL_STATS_ENABLED": "false"}
+    with ServerProcess(env=env) as server:
+        headers = server.login("bench_doctor", "bench-password")
+        print(f"患者数 {args.patients}，启动后内存峰值 {peak_rss_mb(server.process.pid):.0f}MB")
+        print(f"  {'格式':<10s} {'行数':>9s} {'大小':>9s} {'首字节':>9s} {'耗时':>8s} {'行/秒':>9s} {'内存峰值':>9s}")
+        for name, query in VARIANTS:
+            status, lines, size, first_byte, elapsed = export(server, query, headers)
+            rows = lines - 1 if name.startswith("csv") else lines
+            rss = peak_rss_mb(server.process.pid)
+            print(f"  {name:<10s} {rows:>9d} {size / 1e6:>8.1f}M {first_byte * 1000:>7.1f}ms "
+                  f"{elapsed:>7.1f}s {rows / elapsed:>9.0f} {rss:>8.0f}MB")
+            if status != 200 or rows != args.patients:
+                print(f"  导出失败或行数不符（状态 {status}）")
+                failed = True
+        if rss > args.max_rss_mb:
+            print(f"服务进程内存峰值 {rss:.0f}MB 超出上限 {args.max_rss_mb:.0f}MB")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+健康记录批量上报基准测试：统计单个工作进程的持续写入速度
+
+在SQLite上生成患者与方案分配，启动独立的uvicorn进程（单工作进程），以 --batch-size 条一批调用
+POST /api/health-records/batch 上报共 --records 条带幂等键的生命体征记录，统计每秒写入条数；
+随后重发前 --retry-batches 批，确认全部计为重复。
+
+上报请求只写入记录并登记汇总队列；服务停止后在本进程中出队累加到生命体征汇总（3个指标 x 小时/天/周），
+统计出队速度并核对日粒度汇总的记录数。每批记录分散在1000名患者上，汇总行几乎无法在批内合并，
+是汇总写入最多的情况。上报或出队速度低于 --min-records-per-sec（出队进程需跟上持续上报）
+或计数不符时以非零状态退出。
+
+用法: python scripts/bench_health_record_ingest.py [--records 200000] [--batch-size 1000] [--min-records-per-sec 10000]
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bench_common import ServerProcess, prepare_database
+
+PATIENTS = 1000
+
+
+def populate(path: str) -> None:
+    """直接写入SQLite生成患者、方案，并为每个患者分配方案"""
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO patients (id, patient_id, name, gender, birth_date, is_active) "
+        "VALUES (?, ?, ?, 'OTHER', '1970-01-01', 1)",
+        [(i, f"P{i:07d}", f"患者{i}") for i in range(1, PATIENTS + 1)],
+    )
+    conn.execute(
+        "INSERT INTO health_plans (id, title, plan_type, status, instructions, created_by, is_public) "
+        "VALUES (1, '高血压监测方案', 'LIFESTYLE', 'ACTIVE', '每日测量血压', 1, 1)"
+    )
+    conn.executemany(
+        "INSERT INTO patient_health_plans (id, patient_id, health_plan_id, assigned_by, status, start_date) "
+        "VALUES (?, ?, 1, 1, 'IN_PROGRESS', '2026-01-01')",
+        [(i, i) for i in range(1, PATIENTS + 1)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def make_batch(number: int, size: int, rng: random.Random) -> list:
+    """生成一批记录，幂等键由批号与序号决定（重发同一批时键相同）"""
+    start = datetime.datetime(2026, 10, 1)
+    records = []
+    for index in range(size):
+        patient_id = rng.randint(1, PATIENTS)
+        records.append({
+            "patient_id": patient_id,
+            "patient_health_plan_id": patient_id,
+            "record_type": "vital_signs",
+            "title": "血压心率",
+            "systolic_pressure": rng.randint(100, 160),
+            "diastolic_pressure": rng.randint(60, 100),
+            "heart_rate": rng.randint(55, 110),
+            "record_date": (start + datetime.timedelta(seconds=number * size + index)).isoformat(),
+            "idempotency_key": f"bench-{number}-{index}",
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="健康记录批量上报基准测试")
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--retry-batches", type=int, default=5)
+    parser.add_argument("--min-records-per-sec", type=float, default=10000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "ingest.db")
+    database_url = "sqlite:///" + path
+    prepare_database(database_url, users=[{"username": "bench_nurse", "password": "bench-password", "role": "NURSE"}])
+    populate(path)
+
+    rng = random.Random(42)
+    batches = [json.dumps(make_batch(number, args.batch_size, rng)) for number in range(args.records // args.batch_size)]
+    failed = False
+    env = {"DATABASE_URL": database_url, "SQL_STATS_ENABLED": "false"}
+    with ServerProcess(env=env) as server:
+        headers = dict(server.login("bench_nurse", "bench-password"), **{"Content-Type": "application/json"})
+
+        created = 0
+        started = time.perf_counter()
+        for body in batches:
+            status, response = server.request("POST", "/api/health-records/batch", body=body, headers=headers)
+            if status != 200:
+                print(f"上报失败: {status} {response[:200]!r}")
+                sys.exit(1)
+            created += json.loads(response)["created"]
+        elapsed = time.perf_counter() - started
+
+        duplicates = 0
+        for body in batches[:args.retry_batches]:
+            status, response = server.request("POST", "/api/health-records/batch", body=body, headers=headers)
+            duplicates += json.loads(response)["duplicates"]
+
+    rate = created / elapsed
+    print(f"上报 {len(batches)} 批 x {args.batch_size} 条: 新增 {created} 条，耗时 {elapsed:.1f}s，{rate:.0f} 条/秒")
+    print(f"重发 {args.retry_batches} 批: 重复 {duplicates} 条")
+    if created != len(batches) * args.batch_size or duplicates != args.retry_batches * args.batch_size:
+        print("新增或重复条数与预期不符")
+        failed = True
+    if rate < args.min_records_per_sec:
+        print("低于写入速度目标")
+        failed = True
+
+    os.environ.update(env)
+    from sqlalchemy import func, select
+    from app.core.database import engine
+    from app.models.vitals_rollup import RollupBucket, VitalMetric, VitalsRollup
+    from app.utils.vitals_rollup import drain_all
+
+    with engine.connect() as connection:
+        started = time.perf_counter()
+        drained = drain_all(connection)
+        drain_elapsed = time.perf_counter() - started
+        counted = connection.execute(select(func.sum(VitalsRollup.count)).where(
+            VitalsRollup.metric == VitalMetric.HEART_RATE, VitalsRollup.bucket == RollupBucket.DAY
+        )).scalar()
+    drain_rate = drained / drain_elapsed
+    print(f"汇总出队 {drained} 条，耗时 {drain_elapsed:.1f}s，{drain_rate:.0f} 条/秒；心率日汇总计入 {counted} 条")
+    if drained != created or counted != created:
+        print("出队或汇总条数与预期不符")
+        failed = True
+    if drain_rate < args.min_records_per_sec:
+        print("出队速度低于写入速度目标")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+健康记录按月分区基准测试（模拟）：单表与按月分表的患者时间范围查询及整月删除耗时
+
+本机没有5亿条记录规模的PostgreSQL，本脚本在SQLite上按缩小的规模模拟两种存储方式：
+- 单表：全部记录一张表，(patient_id, record_date) 索引，与未分区的 health_records 相同
+- 按月分表：每月一张表，索引相同；查询层只查询与时间范围重叠的月份表并 UNION ALL 合并，模拟分区裁剪
+
+分别测量随机患者最近1个月与3个月记录查询的延迟，以及删除最早一个月数据的耗时（单表 DELETE，分表 DROP TABLE），
+再按 --target-rows（默认5亿）推算：查询代价随索引B树层数（按每页索引项数估算）增长，
+DELETE 耗时随该月记录数线性增长；PostgreSQL 删除分区只修改系统表并删除数据文件，与记录数无关
+（SQLite 的 DROP TABLE 需要释放页面，测得的耗时仅供对比）。
+
+用法: python scripts/bench_health_record_partitions.py [--months 24] [--rows-per-month 50000] [--target-rows 500000000]
+"""
+import argparse
+import datetime
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from bench_common import percentile
+
+COLUMNS = "id INTEGER PRIMARY KEY, patient_id INTEGER NOT NULL, record_date TEXT NOT NULL, systolic REAL"
+FIRST_MONTH = datetime.date(2024, 11, 1)
+
+
+def add_months(month: datetime.date, count: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def month_table(month: datetime.date) -> str:
+    return f"records_{month.year:04d}_{month.month:02d}"
+
+
+def generate(month: datetime.date, count: int, patients: int, first_id: int, rng: random.Random):
+    """生成某月的记录行（记录时间在该月内均匀分布）"""
+    seconds = (add_months(month, 1) - month).days * 86400
+    start = datetime.datetime.combine(month, datetime.time())
+    for offset in range(count):
+        moment = start + datetime.timedelta(seconds=rng.randrange(seconds))
+        yield first_id + offset, rng.randint(1, patients), moment.isoformat(sep=" "), rng.uniform(100, 160)
+
+
+def build(path: str, months: list, rows_per_month: int, patients: int, partitioned: bool) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    rng = random.Random(7)
+    tables = [month_table(month) for month in months] if partitioned else ["records"]
+    for name in tables:
+        conn.execute(f"CREATE TABLE {name} ({COLUMNS})")
+        conn.execute(f"CREATE INDEX ix_{name}_patient_date ON {name} (patient_id, record_date)")
+    for index, month in enumerate(months):
+        name = month_table(month) if partitioned else "records"
+        conn.executemany(
+            f"INSERT INTO {name} VALUES (?, ?, ?, ?)",
+            generate(month, rows_per_month, patients, index * rows_per_month + 1, rng),
+        )
+        conn.commit()
+    conn.close()
+
+
+def query_single(conn, patient_id: int, lower: str, upper: str) -> list:
+    return conn.execute(
+        "SELECT id, record_date, systolic FROM records "
+        "WHERE patient_id = ? AND record_date >= ? AND record_date < ? ORDER BY record_date",
+        (patient_id, lower, upper),
+    ).fetchall()
+
+
+def query_partitioned(conn, months: list, patient_id: int, lower: str, upper: str) -> list:
+    """查询层：只查询与 [lower, upper) 重叠的月份表"""
+    selected = [
+        month_table(month) for month in months
+        if month.isoformat() < upper and add_months(month, 1).isoformat() > lower
+    ]
+    sql = " UNION ALL ".join(
+        f"SELECT id, record_date, systolic FROM {name} WHERE patient_id = ? AND record_date >= ? AND record_date < ?"
+        for name in selected
+    )
+    return conn.execute(sql + " ORDER BY record_date", (patient_id, lower, upper) * len(selected)).fetchall()
+
+
+def measure_queries(run, patients: int, last_month: datetime.date, window_days: int, count: int) -> list:
+    rng = random.Random(window_days)
+    end = datetime.datetime.combine(add_months(last_month, 1), datetime.time())
+    lower = (end - datetime.timedelta(days=window_days)).isoformat(sep=" ")
+    upper = end.isoformat(sep=" ")
+    timings = []
+    for _ in range(count):
+        patient_id = rng.randint(1, patients)
+        started = time.perf_counter()
+        run(patient_id, lower, upper)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def btree_depth(rows: float, fanout: int) -> int:
+    return max(1, math.ceil(math.log(max(rows, 2)) / math.log(fanout)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="健康记录按月分区基准测试（模拟）")
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--rows-per-month", type=int, default=50_000)
+    parser.add_argument("--patients", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--target-rows", type=int, default=500_000_000)
+    parser.add_argument("--index-fanout", type=int, default=200, help="每个索引页的索引项数（8KB页、约40字节索引项）")
+    args = parser.parse_args()
+
+    months = [add_months(FIRST_MONTH, offset) for offset in range(args.months)]
+    directory = tempfile.mkdtemp()
+    single_path = os.path.join(directory, "single.db")
+    partitioned_path = os.path.join(directory, "partitioned.db")
+    started = time.perf_counter()
+    build(single_path, months, args.rows_per_month, args.patients, partitioned=False)
+    build(partitioned_path, months, args.rows_per_month, args.patients, partitioned=True)
+    total = args.months * args.rows_per_month
+    print(f"模拟规模: {args.months} 个月 x {args.rows_per_month} 条 = {total} 条，"
+          f"{args.patients} 名患者（生成耗时 {time.perf_counter() - started:.0f}s）")
+
+    single = sqlite3.connect(single_path)
+    partitioned = sqlite3.connect(partitioned_path)
+    last = months[-1]
+    results = {}
+    for window in (30, 90):
+        for label, run in (
+            ("单表", lambda p, lo, hi: query_single(single, p, lo, hi)),
+            ("按月分表", lambda p, lo, hi: query_partitioned(partitioned, months, p, lo, hi)),
+        ):
+            timings = measure_queries(run, args.patients, last, window, args.queries)
+            results[(label, window)] = timings
+            print(f"  最近{window}天 {label}: p50 {percentile(timings, 50):.3f}ms  p95 {percentile(timings, 95):.3f}ms")
+
+    oldest = months[0]
+    lower, upper = oldest.isoformat(), add_months(oldest, 1).isoformat()
+    started = time.perf_counter()
+    deleted = single.execute("DELETE FROM records WHERE record_date >= ? AND record_date < ?", (lower, upper)).rowcount
+    single.commit()
+    delete_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    partitioned.execute(f"DROP TABLE {month_table(oldest)}")
+    partitioned.commit()
+    drop_seconds = time.perf_counter() - started
+    print(f"  删除最早一个月（{deleted} 条）: 单表 DELETE {delete_seconds:.3f}s，分表 DROP TABLE {drop_seconds:.3f}s")
+    single.close()
+    partitioned.close()
+
+    # 按目标规模推算
+    target_per_month = args.target_rows / args.months
+    depth_sample_single = btree_depth(total, args.index_fanout)
+    depth_sample_month = btree_depth(args.rows_per_month, args.index_fanout)
+    depth_single = btree_depth(args.target_rows, args.index_fanout)
+    depth_month = btree_depth(target_per_month, args.index_fanout)
+    print(f"推算至 {args.target_rows} 条（每月 {target_per_month:.0f} 条）:")
+    for window in (30, 90):
+        touched = math.ceil(window / 30)
+        single_ms = percentile(results[("单表", window)], 50) * depth_single / depth_sample_single
+        month_ms = percentile(results[("按月分表", window)], 50) * depth_month / depth_sample_month
+        print(f"  最近{window}天 p50: 单表约 {single_ms:.3f}ms（索引 {depth_single} 层），"
+              f"分区约 {month_ms:.3f}ms（裁剪后 {touched} 个分区，每个索引 {depth_month} 层）")
+    rate = deleted / delete_seconds if delete_seconds else float("inf")
+    print(f"  删除一个月: 单表 DELETE 约 {target_per_month / rate:.0f}s（{rate:.0f} 条/秒，不含VACUUM与索引膨胀），"
+          f"分区 DETACH + DROP 只修改系统表并删除数据文件，与记录数无关")
+
+
+if __name__ == "__main__":
+    main()
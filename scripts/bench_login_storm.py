@@ -0,0 +1,67 @@
+"""
+登录风暴基准测试：并发登录的同时测量非认证接口的延迟
+
+用法: python scripts/bench_login_storm.py --concurrency 64 --duration 10
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from bench_common import ServerProcess, percentile, prepare_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="登录风暴基准测试")
+    parser.add_argument("--concurrency", type=int, default=64, help="并发登录线程数")
+    parser.add_argument("--duration", type=float, default=10.0, help="测试时长（秒）")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    env = {"DATABASE_URL": database_url, "BCRYPT_ROUNDS": str(args.bcrypt_rounds), "DEBUG": "false"}
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    prepare_database(database_url, [{"username": "bench", "password": "bench123"}])
+
+    with ServerProcess(env) as server:
+        headers = server.login("bench", "bench123")
+        stop = threading.Event()
+        counts = {"ok": 0, "rejected": 0, "error": 0}
+        counts_lock = threading.Lock()
+        probe_latencies = []
+
+        def login_worker():
+            while not stop.is_set():
+                status, _ = server.request("POST", "/api/auth/login",
+                                           form={"username": "bench", "password": "bench123"})
+                key = "ok" if status == 200 else "rejected" if status in (429, 503) else "error"
+                with counts_lock:
+                    counts[key] += 1
+
+        def probe_worker():
+            while not stop.is_set():
+                started = time.perf_counter()
+                server.request("GET", "/api/patients/?limit=10", headers=headers)
+                probe_latencies.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=login_worker) for _ in range(args.concurrency)]
+        threads.append(threading.Thread(target=probe_worker))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    print(f"并发登录线程: {args.concurrency}, bcrypt rounds: {args.bcrypt_rounds}")
+    print(f"成功登录: {counts['ok'] / args.duration:.1f} 次/秒")
+    print(f"快速拒绝(429/503): {counts['rejected']}, 其他错误: {counts['error']}")
+    print(f"非认证接口延迟 p50={percentile(probe_latencies, 50):.1f}ms "
+          f"p99={percentile(probe_latencies, 99):.1f}ms (样本 {len(probe_latencies)})")
+
+
+if __name__ == "__main__":
+    main()
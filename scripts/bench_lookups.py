@@ -0,0 +1,112 @@
+"""
+单行查询基准测试：比较按主键查询的两种写法，以及单条记录GET接口每次请求的Python CPU时间
+
+1. ORM层：分别用 query().filter(id == ?).first()、session.get() 与预构建语句（app.utils.lookups.get_by_id）
+   按主键读取用户、患者、方案、分配记录，统计每次查询的CPU时间（每次查询后清空会话，保证都访问数据库）
+2. 接口层：在进程内（TestClient）请求 GET /api/patients/{id}、/api/health-plans/{id}、
+   /api/patient-health-plans/{id}，统计每次请求的CPU时间（包含框架与序列化开销）
+最后输出接口请求期间主库引擎的SQL编译缓存命中率。
+
+用法: python scripts/bench_lookups.py [--rows 1000] [--requests 3000]
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from bench_common import prepare_database
+
+
+def cpu_per_call(fn, count: int) -> float:
+    """每次调用的CPU时间（微秒，包含所有线程）"""
+    started = time.process_time()
+    for _ in range(count):
+        fn()
+    return (time.process_time() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单行查询基准测试")
+    parser.add_argument("--rows", type=int, default=1000, help="每张表生成的记录数")
+    parser.add_argument("--lookups", type=int, default=20000, help="ORM层每种写法的查询次数")
+    parser.add_argument("--requests", type=int, default=3000, help="接口层每个接口的请求次数")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "lookups.db")
+    database_url = "sqlite:///" + path
+    os.environ.update(DATABASE_URL=database_url, SQL_STATS_ENABLED="false")
+    prepare_database(database_url, users=[{"username": "bench_doctor", "password": "x"}])
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.core.statement_cache import registered_caches
+    from app.models.health_plan import HealthPlan, PlanType
+    from app.models.patient import Gender, Patient
+    from app.models.patient_health_plan import PatientHealthPlan
+    from app.models.user import User
+    from app.utils.lookups import get_by_id
+
+    db = SessionLocal()
+    user = db.query(User).filter(User.username == "bench_doctor").one()
+    user_id, username = user.id, user.username
+    for index in range(1, args.rows + 1):
+        db.add(Patient(id=index, patient_id=f"P{index:07d}", name=f"患者{index}", gender=Gender.OTHER,
+                       birth_date=datetime.date(1980, 1, 1)))
+        db.add(HealthPlan(id=index, title=f"方案{index}", plan_type=PlanType.DIET, instructions="低盐饮食",
+                          created_by=user_id, is_public=True))
+        db.add(PatientHealthPlan(id=index, patient_id=index, health_plan_id=index, assigned_by=user_id,
+                                 start_date=datetime.date(2026, 1, 1)))
+    db.commit()
+    db.close()
+
+    rng = random.Random(42)
+    models = [("用户", User, [user_id]), ("患者", Patient, None), ("方案", HealthPlan, None),
+              ("分配记录", PatientHealthPlan, None)]
+
+    print(f"ORM层按主键查询（{args.lookups}次，CPU时间/次）")
+    db = SessionLocal()
+    for label, model, ids in models:
+        ids = ids or range(1, args.rows + 1)
+        styles = {
+            "query().first()": lambda: db.query(model).filter(model.id == rng.choice(ids)).first(),
+            "session.get()": lambda: db.get(model, rng.choice(ids)),
+            "get_by_id()": lambda: get_by_id(db, model, rng.choice(ids)),
+        }
+        results = {}
+        for style, lookup in styles.items():
+            def call():
+                lookup()
+                db.expunge_all()
+
+            call()
+            results[style] = cpu_per_call(call, args.lookups)
+        baseline = results["query().first()"]
+        print(f"  {label:6s} " + "  ".join(
+            f"{style} {us:6.1f}us ({(us / baseline - 1) * 100:+.0f}%)" for style, us in results.items()
+        ))
+    db.close()
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": username, "uid": user_id})}
+    print(f"\n接口层单条记录GET（{args.requests}次，CPU时间/请求）")
+    before = registered_caches["primary"].snapshot()
+    with TestClient(app) as client:
+        for path in ("/api/patients/{}", "/api/health-plans/{}", "/api/patient-health-plans/{}"):
+            def request():
+                response = client.get(path.format(rng.randint(1, args.rows)), headers=headers)
+                assert response.status_code == 200, response.text
+
+            for _ in range(50):
+                request()
+            print(f"  GET {path:32s} {cpu_per_call(request, args.requests):7.1f}us")
+
+    after = registered_caches["primary"].snapshot()
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    print(f"\n接口请求期间编译缓存: 命中 {hits}, 未命中 {misses}, 命中率 {hits / max(1, hits + misses):.4f}")
+
+
+if __name__ == "__main__":
+    main()
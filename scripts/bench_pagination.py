@@ -0,0 +1,115 @@
+"""
+列表分页基准测试：比较偏移分页与游标分页在不同页码上的耗时
+
+在SQLite上生成指定数量的在册患者（默认60万），按 created_at 排序分别用 skip/limit 与游标读取
+第1、100、1000、10000页（每页50条），统计各页的p50耗时。游标分页第10000页的耗时超过第1页的
+--max-ratio 倍时以非零状态退出。
+
+用法: python scripts/bench_pagination.py [--patients 600000] [--page-size 50]
+"""
+import argparse
+import datetime
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bench_common import percentile, prepare_database
+
+PAGES = (1, 100, 1000, 10000)
+
+
+def populate(path: str, count: int) -> None:
+    """直接写入SQLite生成患者，created_at 按每秒若干条递增（同一秒内有多条，验证 id 作为次序键）"""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    start = datetime.datetime(2020, 1, 1)
+    batch_size = 50000
+    for first in range(1, count + 1, batch_size):
+        rows = [
+            (i, f"P{i:07d}", f"患者{i}", (start + datetime.timedelta(seconds=i // 3)).strftime("%Y-%m-%d %H:%M:%S"))
+            for i in range(first, min(first + batch_size, count + 1))
+        ]
+        conn.executemany(
+            "INSERT INTO patients (id, patient_id, name, gender, birth_date, is_active, created_at) "
+            "VALUES (?, ?, ?, 'OTHER', '1980-01-01', 1, ?)",
+            rows,
+        )
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def timed(fn, repeat: int) -> float:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return percentile(latencies, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表分页基准测试")
+    parser.add_argument("--patients", type=int, default=600_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-ratio", type=float, default=3.0, help="游标分页深页与首页耗时之比的上限")
+    args = parser.parse_args()
+    if args.patients < PAGES[-1] * args.page_size:
+        parser.error(f"患者数至少需要 {PAGES[-1] * args.page_size}")
+
+    path = os.path.join(tempfile.mkdtemp(), "pagination.db")
+    database_url = "sqlite:///" + path
+    os.environ["DATABASE_URL"] = database_url
+    prepare_database(database_url)
+    populate(path, args.patients)
+
+    from fastapi import Response
+    from app.core.database import SessionLocal
+    from app.models.patient import Patient
+    from app.utils.pagination import NEXT_CURSOR_HEADER, paginate
+
+    sort_keys = {"created_at": Patient.created_at}
+    db = SessionLocal()
+
+    def page(cursor=None, skip=0):
+        response = Response()
+        query = db.query(Patient).filter(Patient.is_active.is_(True))
+        rows = paginate(db, query, response, sort_keys=sort_keys, sort="created_at", id_column=Patient.id,
+                        cursor=cursor, skip=skip, limit=args.page_size)
+        db.expunge_all()
+        return rows, response.headers.get(NEXT_CURSOR_HEADER)
+
+    # 沿游标翻到各目标页，记录进入该页所用的游标
+    cursors = {1: None}
+    cursor = None
+    for number in range(1, PAGES[-1]):
+        rows, cursor = page(cursor)
+        if number + 1 in PAGES:
+            cursors[number + 1] = cursor
+            # 游标分页与偏移分页在同一页应得到相同的数据
+            expected = [patient.id for patient in page(skip=number * args.page_size)[0]]
+            assert [patient.id for patient in page(cursor)[0]] == expected
+
+    print(f"患者数 {args.patients}, 每页 {args.page_size} 条（p50）")
+    print(f"  {'页码':>6s} {'偏移分页':>10s} {'游标分页':>10s}")
+    results = {}
+    for number in PAGES:
+        offset_ms = timed(lambda: page(skip=(number - 1) * args.page_size), args.repeat)
+        cursor_ms = timed(lambda: page(cursors[number]), args.repeat)
+        results[number] = cursor_ms
+        print(f"  {number:>8d} {offset_ms:>10.2f}ms {cursor_ms:>10.2f}ms")
+    db.close()
+
+    ratio = results[PAGES[-1]] / results[1]
+    print(f"\n游标分页第{PAGES[-1]}页/第1页耗时比 {ratio:.2f}")
+    if ratio > args.max_ratio:
+        print("游标分页深页耗时超出预期")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
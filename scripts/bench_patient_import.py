@@ -0,0 +1,140 @@
+"""
+患者批量导入基准测试：统计导入吞吐量与内存峰值
+
+生成指定行数的CSV（默认20万行，含少量编号重复与校验失败的行），通过导入接口 POST /api/patients/import
+流式上传并统计每秒导入行数与进程内存峰值；导入后出队写入搜索gram索引并确认能搜到导入的患者。
+导入吞吐量低于 --min-rows-per-sec 时以非零状态退出。
+
+默认使用临时SQLite文件；--database-url 指定空的PostgreSQL库时在其上测试（患者表中不能已有 B 开头编号的患者）。
+每秒2万行的目标以PostgreSQL为准（默认门槛20000）。SQLite上导入时不写gram索引，实测约1.6~2万行/秒，
+瓶颈在患者表的多个索引与逐行校验，默认门槛为12000（防止回退）。
+
+用法: python scripts/bench_patient_import.py [--rows 200000] [--database-url postgresql://...] [--min-rows-per-sec 20000]
+"""
+import argparse
+import csv
+import datetime
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from bench_common import prepare_database
+
+# 各数据库的默认吞吐量门槛（行/秒）
+MIN_ROWS_PER_SEC = {"postgresql": 20000, "sqlite": 12000}
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗"
+GIVEN = "伟芳娜秀英敏静丽强磊军洋勇艳杰娟涛明超兰霞平刚桂"
+FIELDS = ["patient_id", "name", "gender", "birth_date", "phone", "id_card", "address", "height", "weight"]
+
+
+def write_csv(path: str, rows: int, seed: int = 42) -> int:
+    """生成CSV，返回预期导入成功的行数"""
+    rng = random.Random(seed)
+    expected = 0
+    with open(path, "w", encoding="utf-8", newline="") as target:
+        writer = csv.writer(target)
+        writer.writerow(FIELDS)
+        for index in range(1, rows + 1):
+            code = f"B{index:08d}"
+            birth = datetime.date(1940, 1, 1) + datetime.timedelta(days=rng.randint(0, 25000))
+            gender = rng.choice(("male", "female"))
+            if index % 1000 == 0:
+                gender = "unknown"             # 校验失败
+            elif index % 1000 == 2:
+                code = f"B{index - 1:08d}"     # 与上一行编号重复
+            else:
+                expected += 1
+            writer.writerow([
+                code,
+                rng.choice(SURNAMES) + "".join(rng.choice(GIVEN) for _ in range(rng.choice((1, 2)))),
+                gender,
+                birth.isoformat(),
+                f"13{rng.randint(0, 999999999):09d}",
+                f"11010119{index:09d}X",
+                "北京市东城区某某街道",
+                round(rng.uniform(150, 190), 1),
+                round(rng.uniform(45, 95), 1),
+            ])
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="患者批量导入基准测试")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--database-url", default=None, help="数据库URL（默认使用临时SQLite文件）")
+    parser.add_argument("--min-rows-per-sec", type=float, default=None, help="吞吐量门槛（默认按数据库类型）")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    database_url = args.database_url or "sqlite:///" + os.path.join(directory, "import.db")
+    dialect = "sqlite" if database_url.startswith("sqlite") else "postgresql"
+    min_rate = args.min_rows_per_sec or MIN_ROWS_PER_SEC[dialect]
+    os.environ.update(DATABASE_URL=database_url, SQL_STATS_ENABLED="false")
+    prepare_database(database_url, users=[{"username": "bench_admin", "password": "x", "role": "ADMIN"}])
+
+    source = os.path.join(directory, "patients.csv")
+    expected = write_csv(source, args.rows)
+    print(f"生成 {args.rows} 行CSV（{os.path.getsize(source) / 1e6:.1f}MB），预期导入 {expected} 行")
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.core.security import create_access_token
+
+    token = create_access_token({"sub": "bench_admin"})
+    headers = {"Authorization": "Bearer " + token, "Content-Type": "text/csv"}
+
+    def chunks():
+        with open(source, "rb") as stream:
+            while True:
+                chunk = stream.read(64 * 1024)
+                if not chunk:
+                    return
+                yield chunk
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        response = client.post("/api/patients/import", content=chunks(), headers=headers)
+        elapsed = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        report = response.json()
+        rate = report["received"] / elapsed
+        print(f"状态 {response.status_code}: 共 {report['received']} 行，导入 {report['imported']} 行，"
+              f"失败 {report['failed']} 行")
+        print(f"耗时 {elapsed:.1f}s，{rate:.0f} 行/秒，内存峰值 {rss_before:.0f}MB -> {rss_after:.0f}MB")
+
+        from app.core.database import engine
+        from app.utils.patient_search import drain_all
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            indexed = drain_all(connection)
+        index_elapsed = time.perf_counter() - started
+        print(f"搜索索引出队 {indexed} 名患者，耗时 {index_elapsed:.1f}s，{indexed / max(index_elapsed, 1e-9):.0f} 名/秒")
+
+        # 最后导入的患者应能按编号与身份证号片段搜到
+        index = max(i for i in range(max(1, args.rows - 3), args.rows + 1) if i % 1000 not in (0, 2))
+        code = f"B{index:08d}"
+        found = [
+            client.get("/api/patients/search/", params={"query": text}, headers=headers).json()
+            for text in (code, f"{index:09d}X")
+        ]
+
+    failed = False
+    if report["imported"] != expected or indexed != expected:
+        print("导入或写入索引的患者数与预期不符")
+        failed = True
+    if not all(any(patient["patient_id"] == code for patient in result) for result in found):
+        print(f"导入后搜索不到患者 {code}")
+        failed = True
+    if rate < min_rate:
+        print(f"低于吞吐量门槛 {min_rate:.0f} 行/秒（达到 {rate / min_rate:.0%}）")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+患者搜索基准测试：按查询形态统计搜索耗时，并与原先的四字段ILIKE扫描对比
+
+在SQLite上生成指定数量的患者（默认100万）及其n-gram索引，随后在进程内执行
+手机号、身份证号、患者编号前缀、姓名、手机尾号等常见搜索，统计p50/p99。
+整体p99超过 --p99-target-ms 时以非零状态退出。
+
+用法: python scripts/bench_patient_search.py [--patients 1000000] [--p99-target-ms 50]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from bench_common import percentile, prepare_database
+
+SURNAMES = "王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈"
+GIVEN_CHARS = "伟芳娜秀英敏静丽强磊军洋勇艳杰娟涛明超秀兰霞平刚桂英华玉萍红娥玲芬燕彬鹏辉建国志文斌宇浩然"
+
+
+def fake_patient(index: int, rng: random.Random) -> tuple:
+    name = rng.choice(SURNAMES) + "".join(rng.choice(GIVEN_CHARS) for _ in range(rng.choice((1, 2))))
+    phone = "1" + rng.choice("3456789") + "".join(rng.choice("0123456789") for _ in range(9))
+    id_card = "".join(rng.choice("0123456789") for _ in range(17)) + rng.choice("0123456789X")
+    return (index, f"P{index:07d}", name, phone, id_card)
+
+
+def populate(path: str, count: int, seed: int = 42) -> list:
+    """直接写入SQLite生成患者与gram索引，返回生成的患者样本用于构造查询"""
+    from app.utils.patient_search import patient_grams
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    samples = []
+    batch_size = 20000
+    started = time.perf_counter()
+    for start in range(1, count + 1, batch_size):
+        patients = [fake_patient(i, rng) for i in range(start, min(start + batch_size, count + 1))]
+        conn.executemany(
+            "INSERT INTO patients (id, patient_id, name, gender, birth_date, phone, id_card, is_active) "
+            "VALUES (?, ?, ?, 'OTHER', '1980-01-01', ?, ?, 1)",
+            patients,
+        )
+        grams = sorted(
+            (gram, patient[0])
+            for patient in patients
+            for gram in patient_grams((patient[2], patient[1], patient[3], patient[4]))
+        )
+        conn.executemany("INSERT INTO patient_search_grams (gram, patient_id) VALUES (?, ?)", grams)
+        conn.commit()
+        samples.extend(rng.sample(patients, min(len(patients), 20)))
+        print(f"\r已生成 {min(start + batch_size - 1, count)}/{count} 名患者 "
+              f"({time.perf_counter() - started:.0f}s)", end="", flush=True)
+    print()
+    conn.execute("ANALYZE")
+    conn.close()
+    return samples
+
+
+def build_workload(samples: list, rng: random.Random) -> list:
+    """按查询形态构造查询：(形态, 查询文本)"""
+    workload = []
+    for _, code, name, phone, id_card in samples:
+        workload += [
+            ("手机号", phone),
+            ("身份证号", id_card),
+            ("患者编号前缀", code[:6]),
+            ("姓名", name),
+            ("姓氏", name[0]),
+            ("手机尾号", phone[-4:]),
+            ("身份证片段", id_card[6:14]),
+            ("无匹配", "无此患者" + str(rng.randint(0, 999))),
+        ]
+    rng.shuffle(workload)
+    return workload
+
+
+def legacy_search(db, text: str, limit: int):
+    """原实现：四个字段的前导通配ILIKE"""
+    from sqlalchemy import or_
+    from app.models.patient import Patient
+
+    return db.query(Patient).filter(
+        or_(
+            Patient.name.ilike(f"%{text}%"),
+            Patient.patient_id.ilike(f"%{text}%"),
+            Patient.phone.ilike(f"%{text}%"),
+            Patient.id_card.ilike(f"%{text}%"),
+        ),
+        Patient.is_active.is_(True),
+    ).limit(limit).all()
+
+
+def planned_search(db, text: str, limit: int):
+    from app.models.patient import Patient
+    from app.utils.patient_search import apply_patient_search
+
+    query = db.query(Patient).filter(Patient.is_active.is_(True))
+    return apply_patient_search(query, db, text).limit(limit).all()
+
+
+def run(db, search, workload: list, limit: int) -> dict:
+    latencies = {}
+    for shape, text in workload:
+        started = time.perf_counter()
+        search(db, text, limit)
+        latencies.setdefault(shape, []).append((time.perf_counter() - started) * 1000)
+        db.expunge_all()
+    return latencies
+
+
+def report(title: str, latencies: dict) -> float:
+    print(f"\n{title}")
+    for shape, values in latencies.items():
+        print(f"  {shape:8s} p50={percentile(values, 50):8.2f}ms p99={percentile(values, 99):8.2f}ms")
+    overall = [value for values in latencies.values() for value in values]
+    p99 = percentile(overall, 99)
+    print(f"  整体     p50={percentile(overall, 50):8.2f}ms p99={p99:8.2f}ms")
+    return p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="患者搜索基准测试")
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50, help="每次搜索返回的最大条数")
+    parser.add_argument("--legacy-queries", type=int, default=40, help="原实现执行的查询数（全表扫描较慢）")
+    parser.add_argument("--p99-target-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "search.db")
+    database_url = "sqlite:///" + path
+    os.environ["DATABASE_URL"] = database_url
+    prepare_database(database_url)
+    samples = populate(path, args.patients)
+
+    from app.core.database import SessionLocal
+
+    rng = random.Random(7)
+    workload = build_workload(samples, rng)
+    db = SessionLocal()
+    try:
+        p99 = report("n-gram索引与查询形态路由", run(db, planned_search, workload, args.limit))
+        report("原四字段ILIKE扫描", run(db, legacy_search, workload[:args.legacy_queries], args.limit))
+    finally:
+        db.close()
+
+    print(f"\n患者数 {args.patients}, p99目标 {args.p99_target_ms:.0f}ms")
+    if p99 > args.p99_target_ms:
+        print("超出p99目标")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+健康方案全文检索基准测试：在指定规模的方案库上统计检索耗时
+
+在SQLite上生成指定数量的方案（默认10万，由常见病症、饮食、运动、监测条目组合而成）并建立倒排索引，
+随后分别以管理员与普通医生（带可见性过滤）身份执行常见检索，统计p50/p99。
+整体p99超过 --p99-target-ms 时以非零状态退出。
+
+用法: python scripts/bench_plan_search.py [--plans 100000] [--p99-target-ms 10]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bench_common import percentile, prepare_database
+
+CONDITIONS = [
+    "2型糖尿病", "高血压", "冠心病", "高脂血症", "肥胖", "骨质疏松", "慢性阻塞性肺疾病", "脑卒中",
+    "痛风", "脂肪肝", "慢性肾病", "失眠", "焦虑", "颈椎病", "腰椎间盘突出", "妊娠期糖尿病",
+]
+DIET = [
+    "低升糖指数饮食", "低盐饮食，每日食盐不超过5克", "控制总热量摄入", "增加膳食纤维摄入", "限制饱和脂肪",
+    "保证优质蛋白摄入", "少量多餐", "戒烟限酒", "避免高嘌呤食物", "多吃新鲜蔬菜水果", "补充钙和维生素D",
+]
+EXERCISE = [
+    "每日快走30分钟", "每周3次太极拳", "游泳或骑自行车", "循序渐进的抗阻训练", "八段锦", "中等强度有氧运动",
+    "餐后散步", "拉伸与平衡训练", "呼吸功能锻炼", "避免剧烈运动",
+]
+MONITORING = [
+    "监测空腹血糖和餐后血糖", "每周测量血压并记录", "记录饮食日记", "定期复查血脂", "每月监测体重和腰围",
+    "每三个月复查糖化血红蛋白", "按时服药", "出现胸闷胸痛及时就医", "保持规律作息",
+]
+PLAN_TYPES = ["DIET", "EXERCISE", "MEDICATION", "LIFESTYLE", "REHABILITATION"]
+QUERIES = [
+    "低升糖", "冠心病", "高血压 运动", "糖化血红蛋白", "太极拳", "痛风 饮食", "骨质疏松 补钙",
+    "呼吸功能锻炼", "控制总热量", "失眠", "八段锦 颈椎病", "妊娠期糖尿病 监测血糖", "不存在的病症",
+]
+
+
+def fake_plan(index: int, rng: random.Random) -> dict:
+    conditions = rng.sample(CONDITIONS, rng.choice((1, 2)))
+    instructions = rng.sample(DIET, 3) + rng.sample(EXERCISE, 2) + rng.sample(MONITORING, 3)
+    return {
+        "id": index,
+        "title": f"{conditions[0]}{rng.choice(('管理', '干预', '康复', '调理'))}方案{index}",
+        "description": f"适用于{'、'.join(conditions)}患者的综合健康管理方案",
+        "plan_type": rng.choice(PLAN_TYPES),
+        "objectives": rng.choice(MONITORING) + "，" + rng.choice(DIET),
+        "instructions": "；".join(instructions),
+        "target_conditions": "、".join(conditions),
+        "is_public": rng.random() < 0.3,
+        "created_by": rng.randint(1, 200),
+    }
+
+
+def populate(count: int, seed: int = 42) -> None:
+    """写入方案并建立倒排索引"""
+    from sqlalchemy import insert
+    from app.core.database import engine
+    from app.models.health_plan import HealthPlan
+    from app.utils.plan_search import index_plans
+
+    rng = random.Random(seed)
+    batch_size = 5000
+    started = time.perf_counter()
+    for start in range(1, count + 1, batch_size):
+        plans = [fake_plan(i, rng) for i in range(start, min(start + batch_size, count + 1))]
+        with engine.begin() as connection:
+            connection.execute(insert(HealthPlan), [dict(plan, status="ACTIVE") for plan in plans])
+            index_plans(connection, plans)
+        print(f"\r已生成 {min(start + batch_size - 1, count)}/{count} 个方案 "
+              f"({time.perf_counter() - started:.0f}s)", end="", flush=True)
+    print()
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="健康方案全文检索基准测试")
+    parser.add_argument("--plans", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20, help="每个查询执行的次数")
+    parser.add_argument("--p99-target-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "plans.db")
+    database_url = "sqlite:///" + path
+    os.environ["DATABASE_URL"] = database_url
+    prepare_database(database_url)
+
+    from app.core.database import SessionLocal
+    from app.utils.plan_search import jieba, search_plans
+
+    print("分词方式: " + ("jieba" if jieba is not None else "双字切分"))
+    populate(args.plans)
+
+    latencies = {}
+    db = SessionLocal()
+    try:
+        # 先执行一遍加载文档频率缓存（缓存期内的常态）
+        for text in QUERIES:
+            search_plans(db, text, None, args.limit)
+        for role, user_id in (("管理员", None), ("医生", 7)):
+            for _ in range(args.rounds):
+                for text in QUERIES:
+                    started = time.perf_counter()
+                    search_plans(db, text, user_id, args.limit)
+                    latencies.setdefault((role, text), []).append((time.perf_counter() - started) * 1000)
+    finally:
+        db.close()
+
+    for (role, text), values in latencies.items():
+        print(f"  {role} {text:14s} p50={percentile(values, 50):7.2f}ms p99={percentile(values, 99):7.2f}ms")
+    overall = [value for values in latencies.values() for value in values]
+    p99 = percentile(overall, 99)
+    print(f"  整体 p50={percentile(overall, 50):7.2f}ms p99={p99:7.2f}ms")
+
+    print(f"\n方案数 {args.plans}, p99目标 {args.p99_target_ms:.0f}ms")
+    if p99 > args.p99_target_ms:
+        print("超出p99目标")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+生命体征夜间分析基准测试：NumPy向量化分析与逐患者Python循环的对比
+
+在SQLite上为 --patients 名患者生成 --days 天、--metrics 个指标的日粒度汇总（约90%的日期有记录，
+少数患者注入单日突变、水平变化与持续上升），然后：
+1. 向量化：运行 app.utils.vitals_analytics.analyze_vitals，统计总耗时
+2. 逐患者循环：抽取 --naive-sample 名患者，每名患者每个指标单独查询日均值，用纯Python循环按相同规则检测
+两种方式检测出的提示（抽样患者部分）必须一致；再按每个患者-指标的耗时推算 --target-patients 名患者、
+全部6个指标的夜间分析耗时。推算的向量化耗时超过 --max-minutes 或结果不一致时以非零状态退出。
+
+用法: python scripts/bench_vitals_analytics.py [--patients 20000] [--metrics 2] [--target-patients 100000]
+"""
+import argparse
+import datetime
+import math
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench_common import prepare_database
+
+AS_OF = datetime.date(2026, 10, 17)
+
+
+def populate(path: str, patients: int, metrics: list, days: int) -> None:
+    """直接写入SQLite生成患者与日粒度汇总"""
+    from app.utils.vitals_analytics import RECENT_DAYS, TREND_WEEKS
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.executemany(
+        "INSERT INTO patients (id, patient_id, name, gender, birth_date, is_active) "
+        "VALUES (?, ?, ?, 'OTHER', '1980-01-01', 1)",
+        [(i, f"P{i:07d}", f"患者{i}") for i in range(1, patients + 1)],
+    )
+    first_day = AS_OF - datetime.timedelta(days=days)
+    starts = [(first_day + datetime.timedelta(days=day)).strftime("%Y-%m-%d 00:00:00.000000") for day in range(days)]
+    levels = {"SYSTOLIC_PRESSURE": (130, 8), "DIASTOLIC_PRESSURE": (80, 5), "HEART_RATE": (72, 5),
+              "TEMPERATURE": (36.6, 0.2), "BLOOD_GLUCOSE": (6, 0.6), "WEIGHT": (70, 0.4)}
+    rng = np.random.default_rng(7)
+    batch = 1000
+    for metric in metrics:
+        level, noise = levels[metric]
+        for first in range(1, patients + 1, batch):
+            count = min(batch, patients + 1 - first)
+            values = rng.normal(level, noise, (count, 1)) + rng.normal(0, noise / 3, (count, days))
+            kinds = rng.random(count)
+            recent = days - RECENT_DAYS
+            spikes = kinds < 0.02
+            values[spikes, recent + rng.integers(0, RECENT_DAYS, spikes.sum())] += 8 * noise
+            shifts = (kinds >= 0.02) & (kinds < 0.04)
+            values[shifts, recent + 2:] += 3 * noise
+            trends = (kinds >= 0.04) & (kinds < 0.06)
+            trend_days = TREND_WEEKS * 7
+            values[trends, days - trend_days:] += np.linspace(0, 3 * noise, trend_days)
+            values = np.round(values, 2)
+            present = rng.random((count, days)) < 0.9
+            rows = [
+                (first + row, metric, "DAY", starts[day], 1, value, value, value, value,
+                 starts[day].replace("00:00:00", "08:00:00"))
+                for row in range(count)
+                for day, value in zip(np.nonzero(present[row])[0].tolist(), values[row, present[row]].tolist())
+            ]
+            conn.executemany("INSERT INTO vitals_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.commit()
+    conn.close()
+
+
+def naive_detect(series: dict, days: int, metric) -> list:
+    """逐患者的参考实现：按天循环，规则与 detect_flags 相同，返回(类型, 日期列号)"""
+    from app.models.vitals_flag import VitalsFlagType
+    from app.utils.vitals_analytics import (EWMA_ALPHA, EWMA_LIMIT, METRIC_THRESHOLDS, MIN_BASELINE_DAYS,
+                                            MIN_WEEK_READINGS, RECENT_DAYS, SPIKE_Z, TREND_WEEKS)
+
+    min_rise, min_std = METRIC_THRESHOLDS[metric]
+    recent_start = days - RECENT_DAYS
+    flags = []
+    baseline = [series[day] for day in range(recent_start) if day in series]
+    if len(baseline) >= MIN_BASELINE_DAYS:
+        mean = sum(baseline) / len(baseline)
+        std = max(math.sqrt(sum((value - mean) ** 2 for value in baseline) / len(baseline)), min_std)
+        z = [(series[day] - mean) / std if day in series else None for day in range(recent_start, days)]
+        for index, score in enumerate(z):
+            for sign in (1, -1):
+                if score is None or sign * score < SPIKE_Z:
+                    continue
+                neighbours = [z[j] for j in (index - 1, index + 1) if 0 <= j < len(z) and z[j] is not None]
+                if not any(sign * other >= SPIKE_Z for other in neighbours):
+                    flags.append((VitalsFlagType.SPIKE, recent_start + index))
+        sigma = std * math.sqrt(EWMA_ALPHA / (2 - EWMA_ALPHA))
+        current, previous = mean, False
+        for index in range(RECENT_DAYS):
+            crossed = False
+            if z[index] is not None:
+                current = EWMA_ALPHA * series[recent_start + index] + (1 - EWMA_ALPHA) * current
+                deviation = (current - mean) / sigma
+                sign = (deviation > 0) - (deviation < 0)
+                crossed = abs(deviation) >= EWMA_LIMIT and z[index] * sign >= 1
+            if crossed and previous:
+                flags.append((VitalsFlagType.CHANGE_POINT, recent_start + index - 1))
+                break
+            previous = crossed
+
+    weekly = []
+    for week in reversed(range(TREND_WEEKS)):
+        end = days - 1 - 7 * week
+        window = [series[day] for day in range(end - 6, end + 1) if day in series]
+        if len(window) < MIN_WEEK_READINGS:
+            return flags
+        weekly.append(sum(window) / len(window))
+    min_step = min_rise / (2 * (TREND_WEEKS - 1))
+    steps = [later - earlier for earlier, later in zip(weekly, weekly[1:])]
+    if all(step >= min_step for step in steps) and weekly[-1] - weekly[0] >= min_rise:
+        flags.append((VitalsFlagType.TREND_UP, days - 1))
+    if all(step <= -min_step for step in steps) and weekly[0] - weekly[-1] >= min_rise:
+        flags.append((VitalsFlagType.TREND_DOWN, days - 1))
+    return flags
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生命体征夜间分析基准测试")
+    parser.add_argument("--patients", type=int, default=20_000)
+    parser.add_argument("--metrics", type=int, default=2, help="生成的指标数（1-6）")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--naive-sample", type=int, default=500, help="逐患者循环抽样的患者数")
+    parser.add_argument("--target-patients", type=int, default=100_000)
+    parser.add_argument("--max-minutes", type=float, default=10.0, help="推算的向量化分析耗时上限")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "vitals_analytics.db")
+    database_url = "sqlite:///" + path
+    os.environ.update(DATABASE_URL=database_url, SQL_STATS_ENABLED="false")
+    prepare_database(database_url)
+
+    from sqlalchemy import select
+    from app.core.database import engine
+    from app.models.vitals_flag import VitalsFlag
+    from app.models.vitals_rollup import RollupBucket, VitalMetric, VitalsRollup
+    from app.utils.vitals_analytics import _event_date, analyze_vitals
+
+    metrics = list(VitalMetric)[:args.metrics]
+    started = time.perf_counter()
+    populate(path, args.patients, [metric.name for metric in metrics], args.days)
+    print(f"生成 {args.patients} 名患者 x {args.days} 天 x {len(metrics)} 个指标的日粒度汇总"
+          f"（耗时 {time.perf_counter() - started:.0f}s）")
+
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        created = analyze_vitals(connection, AS_OF, metrics, args.days)
+    vectorized_seconds = time.perf_counter() - started
+    print(f"向量化分析: {vectorized_seconds:.1f}s，新增提示 {created}")
+
+    sample = np.linspace(1, args.patients, min(args.naive_sample, args.patients)).astype(int).tolist()
+    first_day = AS_OF - datetime.timedelta(days=args.days)
+    start = datetime.datetime.combine(first_day, datetime.time(), datetime.timezone.utc)
+    end = start + datetime.timedelta(days=args.days)
+    naive = set()
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        for patient_id in sample:
+            for metric in metrics:
+                rows = connection.execute(
+                    select(VitalsRollup.bucket_start, VitalsRollup.sum_value, VitalsRollup.count).where(
+                        VitalsRollup.patient_id == patient_id, VitalsRollup.metric == metric,
+                        VitalsRollup.bucket == RollupBucket.DAY,
+                        VitalsRollup.bucket_start >= start, VitalsRollup.bucket_start < end,
+                    )
+                )
+                series = {(moment.date() - first_day).days: total / count for moment, total, count in rows}
+                for flag_type, day in naive_detect(series, args.days, metric):
+                    naive.add((patient_id, metric, flag_type,
+                               _event_date(flag_type, first_day + datetime.timedelta(days=day))))
+    naive_seconds = time.perf_counter() - started
+
+    with engine.connect() as connection:
+        vectorized = set(connection.execute(
+            select(VitalsFlag.patient_id, VitalsFlag.metric, VitalsFlag.flag_type, VitalsFlag.event_date)
+            .where(VitalsFlag.patient_id.in_(sample))
+        ).all())
+    print(f"逐患者循环: {len(sample)} 名患者 {naive_seconds:.1f}s；抽样患者的提示 向量化 {len(vectorized)} 条，"
+          f"循环 {len(naive)} 条，{'一致' if vectorized == naive else '不一致'}")
+
+    pairs = args.patients * len(metrics)
+    scale = args.target_patients * len(VitalMetric)
+    vectorized_target = vectorized_seconds / pairs * scale
+    naive_target = naive_seconds / (len(sample) * len(metrics)) * scale
+    print(f"推算 {args.target_patients} 名患者 x {len(VitalMetric)} 个指标 x {args.days} 天: "
+          f"向量化约 {vectorized_target / 60:.1f} 分钟，逐患者循环约 {naive_target / 60:.1f} 分钟"
+          f"（{naive_target / vectorized_target:.0f} 倍）")
+    if vectorized != naive or vectorized_target > args.max_minutes * 60:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
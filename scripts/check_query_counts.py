@@ -0,0 +1,160 @@
+"""
+接口SQL条数检查：确认常用接口每次请求执行的SQL不超过预算，且没有疑似N+1查询
+
+对迁移到最新版本（alembic upgrade head）的数据库逐个请求接口，用 assert_max_queries 统计每个请求
+执行的SQL条数。超出预算，或同一请求中同一语句执行次数达到 SQL_N_PLUS_ONE_THRESHOLD 时以非零状态退出，
+可用于CI回归检查。认证用户缓存预热后再开始统计（稳定状态下的条数）。
+
+用法: python scripts/check_query_counts.py [--database-url postgresql://...]
+未指定数据库时使用临时SQLite文件。
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+# 种子数据中患者1被分配的方案数，列表接口若逐条加载关联对象会表现为重复语句
+ASSIGNMENTS = 10
+
+# (说明, 角色, 方法, 请求路径, 请求体, SQL条数上限)
+CASES = [
+    ("患者列表", "DOCTOR", "GET", "/api/patients/", None, 1),
+    ("患者详情", "DOCTOR", "GET", "/api/patients/1", None, 1),
+    # 子串搜索先按每个n-gram探测选择度（3条），再取结果
+    ("患者搜索", "DOCTOR", "GET", "/api/patients/search/?query=check", None, 4),
+    ("方案列表", "DOCTOR", "GET", "/api/health-plans/", None, 1),
+    ("方案全文检索", "DOCTOR", "GET", "/api/health-plans/search/?q=%E9%A5%AE%E9%A3%9F", None, 6),
+    ("分配列表", "DOCTOR", "GET", "/api/patient-health-plans/?patient_id=1", None, 1),
+    ("分配列表（附带关联对象）", "DOCTOR", "GET",
+     "/api/patient-health-plans/?patient_id=1&include=patient,health_plan,assigned_doctor", None, 1),
+    ("患者的健康方案", "DOCTOR", "GET", "/api/patient-health-plans/patient/1", None, 2),
+    ("患者的健康方案（附带方案）", "DOCTOR", "GET",
+     "/api/patient-health-plans/patient/1?include=health_plan", None, 2),
+    ("分配详情", "DOCTOR", "GET", "/api/patient-health-plans/1", None, 1),
+    ("分配详情（附带关联对象）", "DOCTOR", "GET",
+     "/api/patient-health-plans/1?include=patient,health_plan,assigned_doctor", None, 1),
+    # 导出在服务端游标上分批读取，与行数无关
+    ("患者导出", "DOCTOR", "GET", "/api/patients/export", None, 1),
+    ("方案导出", "DOCTOR", "GET", "/api/health-plans/export?format=ndjson", None, 1),
+    ("分配导出", "DOCTOR", "GET", "/api/patient-health-plans/export?patient_id=1&gzip=true", None, 1),
+    ("分配方案", "DOCTOR", "POST", "/api/patient-health-plans/",
+     {"patient_id": 2, "health_plan_id": 1, "start_date": "2026-01-01"}, 5),
+    # 批量分配：方案校验1条，每批患者存在性、进行中分配、写入各1条，与患者数无关
+    ("批量分配", "DOCTOR", "POST", "/api/patient-health-plans/bulk",
+     {"health_plan_id": 2, "patient_ids": [1, 2], "start_date": "2026-01-01"}, 4),
+    ("按条件批量分配", "DOCTOR", "POST", "/api/patient-health-plans/bulk",
+     {"health_plan_id": 3, "patient_filter": {"is_active": True}, "start_date": "2026-01-01"}, 5),
+    # 批量上报：引用校验1条、写入1条、登记汇总队列1条，与记录数无关
+    ("健康记录批量上报", "DOCTOR", "POST", "/api/health-records/batch", [
+        {"patient_id": patient_id, "patient_health_plan_id": 1 if patient_id == 1 else None,
+         "record_type": "vital_signs", "title": "血压", "systolic_pressure": 120,
+         "record_date": "2026-01-01T08:00:00", "idempotency_key": f"check-{patient_id}"}
+        for patient_id in (1, 2, 1, 2)
+    ], 3),
+    ("健康记录列表", "DOCTOR", "GET", "/api/health-records/?patient_id=1", None, 1),
+    # 趋势：患者校验1条、读取汇总1条、读取汇总队列中的记录1条，与指标数和记录数无关
+    ("生命体征趋势", "DOCTOR", "GET",
+     "/api/health-records/trends?patient_id=1&start=2025-01-01T00:00:00&end=2026-01-01T00:00:00", None, 3),
+    ("生命体征提示", "DOCTOR", "GET", "/api/health-records/flags?patient_id=1", None, 1),
+    # 创建预约：患者、医生校验各1条，写入1条，时间冲突检查1条（部分索引上的有界范围），返回前刷新1条
+    ("创建预约", "DOCTOR", "POST", "/api/appointments/",
+     {"patient_id": 1, "doctor_id": 2, "appointment_type": "consultation", "title": "复查",
+      "scheduled_start": "2026-03-01T09:00:00Z", "scheduled_end": "2026-03-01T09:30:00Z"}, 5),
+    ("预约列表", "DOCTOR", "GET", "/api/appointments/?doctor_id=2", None, 1),
+    # 可预约时间段：医生、出诊时间各1条，扫描线每推进一次读取1条预约（单名医生找满10个时间段推进3次：2、4、8小时）
+    ("可预约时间段", "DOCTOR", "GET",
+     "/api/appointments/availability?doctor_id=2&start=2030-03-04T00:00:00%2B08:00&limit=10", None, 5),
+    ("更新分配", "DOCTOR", "PUT", "/api/patient-health-plans/1", {"completion_percentage": 50}, 3),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="接口SQL条数检查")
+    parser.add_argument("--database-url", default=None, help="数据库URL（默认使用临时SQLite文件）")
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "counts.db")
+    os.environ.update(DATABASE_URL=database_url, DB_ASYNC="false", DATABASE_REPLICA_URLS="[]")
+
+    from alembic import command
+    from alembic.config import Config
+    from fastapi.testclient import TestClient
+
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    command.upgrade(config, "head")
+
+    from app.main import app
+    from app.core.config import settings
+    from app.core.database import SessionLocal
+    from app.core.query_stats import assert_max_queries
+    from app.core.security import create_access_token
+    from app.models.health_plan import HealthPlan, PlanType
+    from app.models.patient import Gender, Patient
+    from app.models.patient_health_plan import PatientHealthPlan
+    from app.models.user import User, UserRole
+
+    db = SessionLocal()
+    headers = {}
+    for role in (UserRole.ADMIN, UserRole.DOCTOR):
+        username = "count_check_" + role.name.lower()
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            user = User(username=username, email=username + "@check.local", full_name=username,
+                        role=role, hashed_password="!")
+            db.add(user)
+            db.commit()
+        token = create_access_token({"sub": user.username, "uid": user.id})
+        headers[role.name] = {"Authorization": "Bearer " + token}
+    if db.query(Patient).first() is None:
+        for index in (1, 2):
+            db.add(Patient(patient_id=f"P{index:04d}", name=f"count_check{index}", gender=Gender.OTHER,
+                           birth_date=datetime.date(2000, 1, 1)))
+        for index in range(ASSIGNMENTS):
+            plan = HealthPlan(title=f"饮食方案{index}", plan_type=PlanType.DIET, instructions="低盐饮食",
+                              created_by=user.id, is_public=True)
+            db.add(plan)
+            db.flush()
+            db.add(PatientHealthPlan(patient_id=1, health_plan_id=plan.id, assigned_by=user.id,
+                                     start_date=datetime.date(2026, 1, 1)))
+        db.commit()
+    db.close()
+
+    failures = 0
+    with TestClient(app) as client:
+        # 预热认证用户缓存
+        for role_headers in headers.values():
+            client.get("/api/patients/", headers=role_headers)
+        for description, role, method, path, body, limit in CASES:
+            try:
+                with assert_max_queries(limit) as stats:
+                    response = client.request(method, path, json=body, headers=headers[role])
+            except AssertionError as error:
+                failures += 1
+                print(f"[超出预算] {description}: {method} {path}\n{error}")
+                continue
+            if response.status_code != 200:
+                failures += 1
+                print(f"[错误] {description}: {method} {path} 返回 {response.status_code}")
+                continue
+            repeated = stats.repeated(settings.sql_n_plus_one_threshold)
+            if repeated:
+                failures += 1
+                print(f"[疑似N+1] {description}: {method} {path}")
+                for statement, count in repeated:
+                    print(f"  [{count}次] " + " ".join(statement.split()))
+                continue
+            print(f"[通过] {description}: {method} {path} {stats.count}/{limit} 条SQL")
+
+    if failures:
+        print(f"\n{failures} 个接口未通过SQL条数检查")
+        sys.exit(1)
+    print("\n所有接口SQL条数均在预算内")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+列表接口查询计划检查：确认各列表接口的常用过滤条件都能走索引
+
+对迁移到最新版本（alembic upgrade head）的数据库逐个请求列表接口，捕获实际执行的SELECT语句，
+用 EXPLAIN QUERY PLAN（SQLite）或 EXPLAIN（PostgreSQL，关闭顺序扫描后）检查执行计划，
+出现全表扫描时以非零状态退出，可用于CI回归检查。
+
+用法: python scripts/check_query_plans.py [--database-url postgresql://...]
+未指定数据库时使用临时SQLite文件。
+"""
+import argparse
+import datetime
+import os
+import re
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+# (说明, 角色, 请求路径)；不带过滤条件的全量分页查询本身就是顺序读取，不在检查范围内
+CASES = [
+    ("在册患者列表", "DOCTOR", "/api/patients/"),
+    ("在册患者列表（按创建时间降序）", "DOCTOR", "/api/patients/?sort=-created_at"),
+    ("按姓名子串筛选患者", "DOCTOR", "/api/patients/?name=check"),
+    ("患者搜索：手机号", "DOCTOR", "/api/patients/search/?query=13800138000"),
+    ("患者搜索：身份证号", "DOCTOR", "/api/patients/search/?query=11010119900101123X"),
+    ("患者搜索：患者编号前缀", "DOCTOR", "/api/patients/search/?query=P00"),
+    ("患者搜索：子串", "DOCTOR", "/api/patients/search/?query=plan"),
+    ("姓名自动补全：汉字", "DOCTOR", "/api/patients/autocomplete/?q=%E5%BC%A0"),
+    ("姓名自动补全：拼音", "DOCTOR", "/api/patients/autocomplete/?q=zs"),
+    ("模板方案（按类型）", "ADMIN", "/api/health-plans/?is_template=true&is_public=true&plan_type=DIET"),
+    ("按创建者查询方案", "ADMIN", "/api/health-plans/?created_by=1"),
+    ("方案全文检索（管理员）", "ADMIN", "/api/health-plans/search/?q=%E4%BD%8E%E5%8D%87%E7%B3%96"),
+    ("方案全文检索（可见性过滤）", "DOCTOR", "/api/health-plans/search/?q=%E4%BD%8E%E5%8D%87%E7%B3%96"),
+    ("非管理员方案列表（公开或本人创建）", "DOCTOR", "/api/health-plans/"),
+    ("非管理员模板列表", "DOCTOR", "/api/health-plans/templates/"),
+    ("按患者查询分配", "DOCTOR", "/api/patient-health-plans/?patient_id=1"),
+    ("按患者和状态查询分配", "DOCTOR", "/api/patient-health-plans/?patient_id=1&status=ASSIGNED"),
+    ("按方案查询分配", "DOCTOR", "/api/patient-health-plans/?health_plan_id=1"),
+    ("按分配医生查询分配", "DOCTOR", "/api/patient-health-plans/?assigned_by=1"),
+    ("按患者查询分配（附带关联对象）", "DOCTOR",
+     "/api/patient-health-plans/?patient_id=1&include=patient,health_plan,assigned_doctor"),
+    ("患者的健康方案", "DOCTOR", "/api/patient-health-plans/patient/1?status=ASSIGNED"),
+    ("按患者查询健康记录", "DOCTOR", "/api/health-records/?patient_id=1"),
+    ("按患者和时间范围查询健康记录", "DOCTOR",
+     "/api/health-records/?patient_id=1&record_date_from=2026-01-01T00:00:00&record_date_to=2026-02-01T00:00:00"),
+    ("按方案分配查询健康记录", "DOCTOR", "/api/health-records/?patient_health_plan_id=1"),
+    ("按记录者查询健康记录", "DOCTOR", "/api/health-records/?recorded_by=1"),
+    ("生命体征趋势", "DOCTOR",
+     "/api/health-records/trends?patient_id=1&metric=systolic_pressure&start=2025-01-01T00:00:00&end=2026-01-01T00:00:00"),
+    ("按患者查询生命体征提示", "DOCTOR", "/api/health-records/flags?patient_id=1"),
+    ("按日期查询生命体征提示", "DOCTOR", "/api/health-records/flags?event_date_from=2026-01-01"),
+    ("按医生查询预约", "DOCTOR", "/api/appointments/?doctor_id=1"),
+    ("按患者和时间范围查询预约", "DOCTOR",
+     "/api/appointments/?patient_id=1&scheduled_start_from=2026-01-01T00:00:00&scheduled_start_to=2026-02-01T00:00:00"),
+    ("按时间范围查询预约", "DOCTOR", "/api/appointments/?scheduled_start_from=2026-01-01T00:00:00"),
+    ("按状态查询预约", "DOCTOR", "/api/appointments/?status=scheduled"),
+    ("按方案分配查询预约", "DOCTOR", "/api/appointments/?patient_health_plan_id=1"),
+    ("按科室查询可预约时间段", "DOCTOR", "/api/appointments/availability?department=check&start=2030-03-04T00:00:00Z"),
+    ("按科室和专业查询可预约时间段", "DOCTOR",
+     "/api/appointments/availability?department=check&specialty=check&start=2030-03-04T00:00:00Z"),
+]
+
+# 预期内的全表读取：表名 -> 原因
+ALLOWED_SCANS = {
+    "plan_search_documents": "BM25语料统计（文档总数与平均长度），结果在进程内缓存",
+    "patient_search_queue": "批量导入后待写入gram索引的患者，由出队进程持续清空，搜索时按子串逐行匹配",
+}
+
+READS_TABLE = re.compile(r"\s*SELECT\b.*\bFROM\b", re.IGNORECASE | re.DOTALL)
+SQLITE_SCAN = re.compile(r"\bSCAN (\w+)(?!.*\bUSING\b)")
+
+
+def explain(connection, statement, parameters, tables):
+    """返回语句的执行计划文本行，以及是否包含数据表的全表扫描（子查询结果与预期内的扫描不算）"""
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        lines = [row[-1] for row in rows]
+        scanned = (SQLITE_SCAN.search(line) for line in lines)
+        return lines, any(
+            match and match.group(1) in tables and match.group(1) not in ALLOWED_SCANS for match in scanned
+        )
+    connection.exec_driver_sql("SET enable_seqscan = off")
+    rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+    lines = [row[0] for row in rows]
+    return lines, any(
+        "Seq Scan" in line and not any(f" on {table} " in line + " " for table in ALLOWED_SCANS)
+        for line in lines
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表接口查询计划检查")
+    parser.add_argument("--database-url", default=None, help="数据库URL（默认使用临时SQLite文件）")
+    args = parser.parse_args()
+
+    database_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "plans.db")
+    os.environ.update(DATABASE_URL=database_url, DB_ASYNC="false", DATABASE_REPLICA_URLS="[]")
+
+    from alembic import command
+    from alembic.config import Config
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    command.upgrade(config, "head")
+
+    from app.main import app
+    from app.core.database import Base, SessionLocal, engine
+    from app.core.security import create_access_token
+    from app.utils.pagination import encode_cursor
+    from app.models.health_plan import HealthPlan, PlanType
+    from app.models.patient import Gender, Patient
+    from app.models.user import User, UserRole
+
+    db = SessionLocal()
+    headers = {}
+    for role in (UserRole.ADMIN, UserRole.DOCTOR):
+        username = "plan_check_" + role.name.lower()
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            user = User(username=username, email=username + "@check.local", full_name=username,
+                        role=role, hashed_password="!", department="check", specialty="check")
+            db.add(user)
+            db.commit()
+        token = create_access_token({"sub": user.username, "uid": user.id})
+        headers[role.name] = {"Authorization": "Bearer " + token}
+    if db.query(HealthPlan).first() is None:
+        db.add(HealthPlan(title="低升糖饮食方案", plan_type=PlanType.DIET, instructions="低升糖指数饮食",
+                          created_by=user.id, is_public=True))
+        db.commit()
+    if db.query(Patient).first() is None:
+        db.add(Patient(patient_id="P0001", name="plan_check", gender=Gender.OTHER,
+                       birth_date=datetime.date(2000, 1, 1), phone="13800138000"))
+        db.commit()
+    db.close()
+
+    # 游标分页：各列表的下一页
+    cursor = encode_cursor("created_at", [datetime.datetime(2000, 1, 1), 1])
+    cases = CASES + [
+        ("游标分页：在册患者", "DOCTOR", "/api/patients/?cursor=" + cursor),
+        ("游标分页：方案列表", "ADMIN", "/api/health-plans/?cursor=" + cursor),
+        ("游标分页：分配列表", "DOCTOR", "/api/patient-health-plans/?cursor=" + cursor),
+        ("游标分页：健康记录", "DOCTOR", "/api/health-records/?sort=-record_date&cursor="
+         + encode_cursor("-record_date", [datetime.datetime(2030, 1, 1), 1])),
+    ]
+
+    tables = set(Base.metadata.tables)
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        # 只检查读取数据表的语句（忽略连接预热与探活的 SELECT 1）
+        if READS_TABLE.match(statement):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    failures = 0
+    with TestClient(app) as client:
+        for description, role, path in cases:
+            captured.clear()
+            response = client.get(path, headers=headers[role])
+            if response.status_code != 200:
+                print(f"[错误] {description}: {path} 返回 {response.status_code}")
+                failures += 1
+                continue
+            case_ok = True
+            with engine.connect() as connection:
+                for statement, parameters in list(captured):
+                    lines, full_scan = explain(connection, statement, parameters, tables)
+                    if full_scan:
+                        case_ok = False
+                        failures += 1
+                        print(f"[全表扫描] {description}: {path}")
+                        print("    " + " ".join(statement.split()))
+                        for line in lines:
+                            print("    " + line)
+            if case_ok:
+                print(f"[通过] {description}: {path}")
+    event.remove(engine, "before_cursor_execute", capture)
+
+    if failures:
+        print(f"\n{failures} 条查询未使用索引")
+        sys.exit(1)
+    print("\n所有列表查询均使用索引")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+患者搜索索引出队
+
+把批量导入登记在 patient_search_queue 中的患者分批写入搜索gram索引，每批一个事务。默认处理完当前队列后退出；
+--interval 指定时持续运行，队列为空时等待该秒数再检查（部署时作为独立进程运行，见 docker-compose.yml）。
+PostgreSQL 上可同时运行多个进程。
+
+用法: python scripts/drain_patient_search_index.py [--batch-size 2000] [--interval 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.utils.patient_search import DRAIN_BATCH_SIZE, drain_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description="患者搜索索引出队")
+    parser.add_argument("--batch-size", type=int, default=DRAIN_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, default=None, help="持续运行，队列为空时等待的秒数")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        while True:
+            started = time.perf_counter()
+            total = drain_all(connection, args.batch_size)
+            if total or args.interval is None:
+                print(f"已为 {total} 名患者写入搜索索引，耗时 {time.perf_counter() - started:.1f}s", flush=True)
+            if args.interval is None:
+                return
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+生命体征汇总出队
+
+把批量上报登记在 vitals_rollup_queue 中的健康记录分批累加到汇总表，每批一个事务。默认处理完当前队列后退出；
+--interval 指定时持续运行，队列为空时等待该秒数再检查（部署时作为独立进程运行，见 docker-compose.yml）。
+PostgreSQL 上可同时运行多个进程。
+
+用法: python scripts/drain_vitals_rollups.py [--batch-size 5000] [--interval 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.utils.vitals_rollup import DRAIN_BATCH_SIZE, drain_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生命体征汇总出队")
+    parser.add_argument("--batch-size", type=int, default=DRAIN_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, default=None, help="持续运行，队列为空时等待的秒数")
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        while True:
+            started = time.perf_counter()
+            total = drain_all(connection, args.batch_size)
+            if total or args.interval is None:
+                print(f"已汇总 {total} 条健康记录，耗时 {time.perf_counter() - started:.1f}s", flush=True)
+            if args.interval is None:
+                return
+            time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
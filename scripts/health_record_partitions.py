@@ -0,0 +1,59 @@
+"""
+健康记录月份分区维护（PostgreSQL 分区表）
+
+- list: 列出已有的月份分区
+- create [--ahead N]: 确保当月及之后N个月的分区存在（应用启动时也会执行，可配合定时任务）
+- detach YYYY-MM: 将某月分区分离为独立表 health_records_YYYY_MM，数据保留以便归档
+- drop YYYY-MM: 删除某月的全部健康记录（分区表上为分离并删除分区；未分区的数据库上为按日期 DELETE）
+
+用法: python scripts/health_record_partitions.py create --ahead 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.partitions import (
+    detach_partition, drop_month, ensure_partitions, is_partitioned, list_partitions, parse_month
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="健康记录月份分区维护")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list")
+    create = commands.add_parser("create")
+    create.add_argument("--ahead", type=int, default=settings.health_record_partitions_ahead)
+    for name in ("detach", "drop"):
+        commands.add_parser(name).add_argument("month", type=parse_month, help="月份，如 2025-01")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            print("health_records 未分区（非PostgreSQL或未执行分区迁移）")
+            if args.command != "drop":
+                return
+        if args.command == "list":
+            for name in list_partitions(connection):
+                print(name)
+        elif args.command == "create":
+            created = ensure_partitions(connection, args.ahead)
+            print("新建分区: " + (", ".join(created) if created else "无"))
+        elif args.command == "detach":
+            if not detach_partition(connection, args.month):
+                print("该月分区不存在")
+                sys.exit(1)
+            print("已分离")
+        else:
+            deleted = drop_month(connection, args.month)
+            print("已删除分区" if deleted < 0 else f"已删除 {deleted} 条记录")
+    print(f"耗时 {time.perf_counter() - started:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+批量导入患者：从CSV或NDJSON文件流式导入（与 POST /api/patients/import 使用同一导入逻辑）
+
+CSV首行为字段名，字段与创建患者接口一致（patient_id, name, gender, birth_date, phone, id_card ...）；
+NDJSON每行一个JSON对象。格式默认按扩展名判断。每批单独提交，中断后重新执行时已导入的行会报"患者编号已存在"。
+导入完成后为新患者写入搜索索引；--skip-index 时留给搜索索引出队进程（scripts/drain_patient_search_index.py）。
+
+用法: python scripts/import_patients.py patients.csv [--format csv|ndjson] [--batch-size 5000] [--errors errors.csv] [--skip-index]
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导入患者")
+    parser.add_argument("path", help="CSV或NDJSON文件")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None, help="文件格式（默认按扩展名判断）")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--errors", default=None, help="将错误行写入此CSV文件")
+    parser.add_argument("--skip-index", action="store_true", help="导入后不写入搜索索引")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal, engine
+    from app.utils.patient_import import IMPORT_BATCH_SIZE, READERS, import_patients
+    from app.utils.patient_search import drain_all
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        with open(args.path, encoding="utf-8-sig", newline="") as source:
+            report = import_patients(db, READERS[file_format](source), args.batch_size or IMPORT_BATCH_SIZE)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+
+    print(f"共 {report.received} 行，导入 {report.imported} 行，失败 {report.failed} 行，"
+          f"耗时 {elapsed:.1f}s（{report.received / max(elapsed, 1e-9):.0f} 行/秒）")
+    if report.imported and not args.skip_index:
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            indexed = drain_all(connection)
+        print(f"已为 {indexed} 名患者写入搜索索引，耗时 {time.perf_counter() - started:.1f}s")
+    if args.errors and report.errors:
+        with open(args.errors, "w", encoding="utf-8", newline="") as target:
+            writer = csv.DictWriter(target, fieldnames=["line", "patient_id", "error"])
+            writer.writeheader()
+            writer.writerows(report.errors)
+        print(f"错误明细已写入 {args.errors}" + ("（仅前 %d 行）" % len(report.errors) if report.failed > len(report.errors) else ""))
+    else:
+        for error in report.errors[:20]:
+            print(f"  第{error['line']}行 {error['patient_id'] or ''}: {error['error']}")
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,13 +8,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine
+from app.core.database import SessionLocal
 from app.core.security import get_password_hash
 from app.models.user import User, UserRole
-from app.core.database import Base
-
-# 创建数据库表
-Base.metadata.create_all(bind=engine)
+from init_db import init_db
 
 def create_admin_user():
     """创建默认管理员用户"""
@@ -98,6 +95,7 @@ def create_sample_doctor():
 
 if __name__ == "__main__":
     print("正在初始化用户...")
+    init_db()
     create_admin_user()
     create_sample_doctor()
     print("用户初始化完成!")
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+初始化数据库表结构脚本（开发环境使用；生产环境请使用 alembic upgrade head）
+"""
+import sys
+import os
+
+# 添加项目根目录到Python路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PROJECT_ROOT)
+
+from alembic import command
+from alembic.config import Config
+
+from app.core.database import Base, engine
+import app.models  # noqa: F401  注册所有模型
+
+
+def init_db():
+    """根据模型创建所有数据库表，并将迁移版本标记为最新，之后的迁移可直接 upgrade"""
+    Base.metadata.create_all(bind=engine)
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "alembic"))
+    command.stamp(config, "head")
+
+
+if __name__ == "__main__":
+    print("正在创建数据库表...")
+    init_db()
+    print("数据库表创建完成!")
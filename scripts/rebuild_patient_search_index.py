@@ -0,0 +1,26 @@
+"""
+重建患者搜索gram索引
+
+修复索引时使用：清空gram表与出队队列，按当前患者数据重新写入。重建在单个事务中完成。
+
+用法: python scripts/rebuild_patient_search_index.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.utils.patient_search import rebuild_search_index
+
+
+def main():
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        total = rebuild_search_index(connection)
+    print(f"已写入 {total} 条gram记录，耗时 {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+重建健康方案全文检索索引
+
+安装或卸载 jieba（分词方式改变）后需要重建，使已有方案的索引词项与查询分词一致；
+也可用于修复索引。重建在单个事务中完成。
+
+用法: python scripts/rebuild_plan_search_index.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.utils.plan_search import jieba, rebuild_plan_index
+
+
+def main():
+    print("分词方式: " + ("jieba" if jieba is not None else "双字切分"))
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        total = rebuild_plan_index(connection)
+    print(f"已写入 {total} 条倒排记录，耗时 {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+重建生命体征汇总表
+
+按全部健康记录重新计算小时/天/周汇总，用于修复汇总或直接写库导入记录之后回填。重建在单个事务中完成。
+
+用法: python scripts/rebuild_vitals_rollups.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.utils.vitals_rollup import rebuild_rollups
+
+
+def main():
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        total = rebuild_rollups(connection)
+    print(f"已汇总 {total} 条健康记录，耗时 {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+启动耗时报告：各模块导入耗时与首个请求就绪时间
+
+用法: python scripts/startup_report.py [--top 20] [--budget-ms 3000]
+指定 --budget-ms 时，冷启动（进程启动到 /ready 返回200）超出预算则以非零状态退出，可用于CI回归检查。
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_common import PROJECT_ROOT, ServerProcess, prepare_database
+
+
+def import_times(top: int):
+    """使用 -X importtime 统计导入 app.main 时各模块的累计耗时（微秒）"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, env=os.environ.copy(),
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    total = next((cumulative for name, _, cumulative in rows if name == "app.main"), 0)
+    app_modules = {}
+    for row in rows:
+        if row[0] == "app" or row[0].startswith("app."):
+            app_modules[row[0]] = max(row, app_modules.get(row[0], row), key=lambda item: item[2])
+    app_modules = sorted(app_modules.values(), key=lambda row: -row[2])
+    slowest = sorted(rows, key=lambda row: -row[1])[:top]
+    return total, app_modules, slowest
+
+
+def time_to_first_request(env) -> float:
+    """从启动进程到 /ready 返回200 的耗时（秒）"""
+    server = ServerProcess(env)
+    started = time.perf_counter()
+    with server:
+        while True:
+            status, _ = server.request("GET", "/ready")
+            if status == 200:
+                return time.perf_counter() - started
+            time.sleep(0.02)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动耗时报告")
+    parser.add_argument("--top", type=int, default=20, help="显示自身耗时最高的模块数")
+    parser.add_argument("--budget-ms", type=float, default=None, help="冷启动耗时预算（毫秒）")
+    args = parser.parse_args()
+
+    database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "startup.db")
+    os.environ["DATABASE_URL"] = database_url
+    prepare_database(database_url)
+
+    total, app_modules, slowest = import_times(args.top)
+    print(f"导入 app.main 总耗时: {total / 1000:.1f}ms")
+    print("\n应用模块（累计耗时）:")
+    for name, self_us, cumulative_us in app_modules:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+    print(f"\n自身耗时最高的 {args.top} 个模块:")
+    for name, self_us, cumulative_us in slowest:
+        print(f"  {self_us / 1000:8.1f}ms  {name}")
+
+    cold_start = time_to_first_request({"DATABASE_URL": database_url, "DEBUG": "false"})
+    print(f"\n冷启动到就绪: {cold_start * 1000:.0f}ms")
+
+    if args.budget_ms is not None and cold_start * 1000 > args.budget_ms:
+        print(f"超出冷启动预算 {args.budget_ms:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()